@@ -0,0 +1,19 @@
+import asyncio
+import os
+from lapsepy.lapse import AsyncLapse
+
+
+async def main():
+    async with AsyncLapse(refresh_token=os.getenv("REFRESH_TOKEN"), max_concurrency=16) as lapse:
+        user = await lapse.get_current_user()
+
+        # Fetch every friend's profile at the same time.
+        profile = await lapse.get_profile_by_id(user.user_id, friends_limit=50)
+        friends = await asyncio.gather(*[lapse.get_profile_by_id(friend.user_id) for friend in profile.friends])
+
+        for friend in friends:
+            print(friend.username, friend.kudos)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,18 @@
+import os
+from lapsepy.lapse import Lapse
+
+if __name__ == '__main__':
+    lapse = Lapse(refresh_token=os.getenv("REFRESH_TOKEN"))
+
+    usernames = input("Usernames (comma separated): ").split(",")
+    profiles = [lapse.get_profile_by_username(username.strip()) for username in usernames]
+
+    # Every kudos is sent in the same request.
+    with lapse.batch(raise_errors=False) as batch:
+        results = [batch.send_kudos(profile) for profile in profiles]
+
+    for profile, result in zip(profiles, results):
+        if result.ok:
+            print(f"Sent kudos to {profile.username}")
+        else:
+            print(f"Failed sending kudos to {profile.username}: {result.error}")
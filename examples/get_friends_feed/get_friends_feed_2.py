@@ -0,0 +1,8 @@
+import os
+from lapsepy.lapse import Lapse
+
+if __name__ == '__main__':
+    lapse = Lapse(refresh_token=os.getenv("REFRESH_TOKEN"))
+
+    for node in lapse.iter_friends_feed(page_size=20, limit=100):
+        print(node.profile.username, node.timestamp, len(node.entries))
@@ -0,0 +1,15 @@
+import os
+from lapsepy.lapse import Lapse
+
+if __name__ == '__main__':
+    lapse = Lapse(refresh_token=os.getenv("REFRESH_TOKEN"))
+
+    album_id = input("Album ID: ")
+
+    if not os.path.isdir("./out"):
+        os.mkdir("./out")
+
+    # The next two pages are fetched in the background while the current one is saved.
+    for media in lapse.iter_album_media(album_id, page_size=50, prefetch=2):
+        im = media.load()
+        im.save(f"./out/{media.id}.jpeg", format="jpeg")
@@ -0,0 +1,22 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from lapsepy.lapse import LapsePool
+
+if __name__ == '__main__':
+    # One refresh token per line.
+    with open(os.getenv("REFRESH_TOKENS_FILE", "./refresh_tokens.txt")) as f:
+        refresh_tokens = [line.strip() for line in f if line.strip()]
+
+    with LapsePool(pool_maxsize=16) as pool:
+        for i, refresh_token in enumerate(refresh_tokens):
+            pool.add(refresh_token, key=f"account{i}")
+
+        def get_username(key):
+            return key, pool[key].get_current_user().username
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            for key, username in executor.map(get_username, pool):
+                print(f"{key}: {username}")
+
+        print(pool.metrics()["total"])
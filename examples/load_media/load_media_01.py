@@ -0,0 +1,19 @@
+import os
+from lapsepy.lapse import Lapse
+
+if __name__ == '__main__':
+    lapse = Lapse(refresh_token=os.getenv("REFRESH_TOKEN"))
+
+    album_id = input("Album ID: ")
+
+    album = lapse.get_album_by_id(album_id, last=200)
+
+    if not os.path.isdir("./out"):
+        os.mkdir("./out")
+
+    for result in lapse.load_media(album.media, quality=100, workers=10):
+        if not result.ok:
+            print(f"Failed loading {result.item.id}: {result.error}")
+            continue
+
+        result.value.save(f"./out/{result.item.id}.jpeg", format="jpeg")
@@ -0,0 +1,10 @@
+import os
+from lapsepy.lapse import Lapse
+from lapsepy.auth.token_store import FileTokenStore
+
+if __name__ == '__main__':
+    # Running this twice within the access token's lifetime only contacts the auth server the first time.
+    store = FileTokenStore("./tokens.json")
+    lapse = Lapse(refresh_token=os.getenv("REFRESH_TOKEN"), token_store=store)
+
+    print(lapse.get_current_user().username)
@@ -7,4 +7,4 @@ __version__ = '1.2.0'
 
 from .journal import Journal
 from .auth.refresher import refresh
-from .lapse import Lapse
+from .lapse import Lapse, AsyncLapse, LapsePool
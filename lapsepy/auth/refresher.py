@@ -2,22 +2,45 @@
 Author: Quintin Dunn
 Date: 10/22/23
 """
+import base64
+import json
+
 import requests
 from lapsepy.journal.common.exceptions import AuthTokenError
 
 REFRESH_URL = "https://auth.production.journal-api.lapse.app/refresh"
 
 
-def refresh(refresh_token: str):
+def refresh(refresh_token: str, transport=None):
     """
     Sends API call to auth.production.journal-api.lapse.app/refresh to refresh your auth token.
     :param refresh_token: Token gotten from Lapse to refresh your access token.
+    :param transport: Transport to send the request over, leave as None to use a new connection.
     :return:
     """
-    request = requests.post(REFRESH_URL, json={"refreshToken": refresh_token})
+    request = (transport or requests).post(REFRESH_URL, json={"refreshToken": refresh_token})
     if request.status_code != 200:
         raise AuthTokenError("Invalid refresh token")
 
     access_token = request.json().get("accessToken")
 
     return access_token
+
+
+def get_token_expiry(access_token: str | None) -> float | None:
+    """
+    Reads when an access token expires from the "exp" claim of the JWT, the signature is not verified.
+    :param access_token: Access token gotten from refresh.
+    :return: Unix timestamp of when the token expires, None if it can't be read.
+    """
+    if not access_token:
+        return None
+
+    try:
+        payload = access_token.removeprefix("Bearer ").split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+    return float(exp) if isinstance(exp, (int, float)) else None
@@ -0,0 +1,118 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+logger = logging.getLogger("lapsepy.auth.scheduler.py")
+
+
+class ScheduledRefresh:
+    """
+    Handle to a callback scheduled on a RefreshScheduler.
+    """
+
+    def __init__(self, when: float, callback: Callable[[], None]):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class RefreshScheduler:
+    """
+    Runs token refreshes shortly before the tokens expire. A single background thread keeps track of every scheduled
+    refresh, so one scheduler can serve any amount of Lapse clients.
+    """
+
+    def __init__(self, workers: int = 4):
+        """
+        :param workers: How many refreshes can run at the same time.
+        """
+        self.workers = workers
+
+        self._heap: list[tuple[float, int, ScheduledRefresh]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    def schedule(self, when: float, callback: Callable[[], None]) -> ScheduledRefresh:
+        """
+        Schedules callback to be called at when.
+        :param when: Unix timestamp to run the callback at, timestamps in the past run right away.
+        :param callback: Function to call, it runs on a worker thread.
+        :return: ScheduledRefresh handle that can be used to cancel the callback.
+        """
+        scheduled = ScheduledRefresh(when=when, callback=callback)
+
+        with self._condition:
+            heapq.heappush(self._heap, (when, next(self._counter), scheduled))
+
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="lapsepy-refresh")
+                self._thread = threading.Thread(target=self._run, name="lapsepy-refresh-scheduler", daemon=True)
+                self._thread.start()
+
+            self._condition.notify()
+
+        return scheduled
+
+    def __len__(self):
+        with self._condition:
+            return sum(not scheduled.cancelled for _, _, scheduled in self._heap)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+
+                when, _, scheduled = self._heap[0]
+
+                if scheduled.cancelled:
+                    heapq.heappop(self._heap)
+                    continue
+
+                delay = when - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+
+                heapq.heappop(self._heap)
+
+            self._executor.submit(self._call, scheduled)
+
+    @staticmethod
+    def _call(scheduled: ScheduledRefresh):
+        if scheduled.cancelled:
+            return
+
+        try:
+            scheduled.callback()
+        except Exception as e:
+            logger.error(f"Scheduled token refresh failed: {e!r}")
+
+
+_default_scheduler: RefreshScheduler | None = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_default_scheduler() -> RefreshScheduler:
+    """
+    Gets the process wide RefreshScheduler used by Lapse clients that weren't given one.
+    :return: RefreshScheduler object.
+    """
+    global _default_scheduler
+
+    if _default_scheduler is None:
+        with _default_scheduler_lock:
+            if _default_scheduler is None:
+                _default_scheduler = RefreshScheduler()
+
+    return _default_scheduler
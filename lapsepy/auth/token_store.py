@@ -0,0 +1,206 @@
+import abc
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from lapsepy.auth.refresher import get_token_expiry
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+logger = logging.getLogger("lapsepy.auth.token_store.py")
+
+
+def _token_key(refresh_token: str) -> str:
+    # Refresh tokens can't be revoked, so they're never written to disk, only their hash is.
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+class BaseTokenStore(abc.ABC):
+    """
+    Base class for access token caches that can be shared between processes. Lapse consults its token store before
+    asking the auth server for a new access token, and saves every token it gets into it.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @abc.abstractmethod
+    def get(self, refresh_token: str) -> str | None:
+        """
+        :param refresh_token: Refresh token the access token was gotten with.
+        :return: The stored access token, None if there isn't one.
+        """
+
+    @abc.abstractmethod
+    def set(self, refresh_token: str, access_token: str):
+        """
+        Stores an access token.
+        :param refresh_token: Refresh token the access token was gotten with.
+        :param access_token: Access token to store.
+        :return: None
+        """
+
+    def get_valid(self, refresh_token: str, margin: float = 0) -> str | None:
+        """
+        :param refresh_token: Refresh token the access token was gotten with.
+        :param margin: How many seconds the access token has to stay valid for.
+        :return: The stored access token if it's valid for at least margin more seconds, otherwise None.
+        """
+        access_token = self.get(refresh_token)
+        expiry = get_token_expiry(access_token)
+
+        if expiry is None or expiry - time.time() <= margin:
+            return None
+
+        return access_token
+
+    @contextlib.contextmanager
+    def lock(self):
+        """
+        Holds an exclusive lock on the store, across threads and processes. Used so only one of many workers starting
+        at the same time refreshes the token while the rest wait and reuse it. The lock is reentrant within a thread.
+        """
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            self._acquire()
+
+        self._local.depth = depth + 1
+        try:
+            yield self
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                self._release()
+
+    @abc.abstractmethod
+    def _acquire(self):
+        """
+        Takes the store's lock, see lock.
+        """
+
+    @abc.abstractmethod
+    def _release(self):
+        """
+        Releases the lock taken by _acquire.
+        """
+
+
+class FileTokenStore(BaseTokenStore):
+    """
+    Token store backed by a JSON file, locked with a sidecar ".lock" file.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Path of the JSON file to store the tokens in, it's created when missing.
+        """
+        super().__init__()
+
+        self.path = os.path.abspath(path)
+        self.lock_path = self.path + ".lock"
+
+    def _acquire(self):
+        self._local.lock_file = open(self.lock_path, "a+b")
+
+        if os.name == "nt":
+            self._local.lock_file.seek(0)
+            msvcrt.locking(self._local.lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(self._local.lock_file.fileno(), fcntl.LOCK_EX)
+
+    def _release(self):
+        lock_file = self._local.lock_file
+
+        if os.name == "nt":
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+        lock_file.close()
+        self._local.lock_file = None
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning(f"Token store {self.path} is corrupt, ignoring it.")
+            return {}
+
+    def get(self, refresh_token: str) -> str | None:
+        with self.lock():
+            return self._read().get(_token_key(refresh_token))
+
+    def set(self, refresh_token: str, access_token: str):
+        with self.lock():
+            tokens = self._read()
+            tokens[_token_key(refresh_token)] = access_token
+
+            # Write to a temporary file first so readers never see a half written store.
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=".tokens-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(tokens, f)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+
+
+class SQLiteTokenStore(BaseTokenStore):
+    """
+    Token store backed by a sqlite database, locked with sqlite's own write lock.
+    """
+
+    def __init__(self, path: str, timeout: float = 30):
+        """
+        :param path: Path of the sqlite database, it's created when missing.
+        :param timeout: How many seconds to wait for another process holding the lock.
+        """
+        super().__init__()
+
+        self.path = path
+        self.timeout = timeout
+
+        if path != ":memory:" and not os.path.exists(path):
+            # The database holds access tokens, so like FileTokenStore's file only the owner can read it. sqlite gives
+            # its journal files the same permissions.
+            os.close(os.open(path, os.O_WRONLY | os.O_CREAT, 0o600))
+
+        with contextlib.closing(self._connect()) as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS tokens (key TEXT PRIMARY KEY, access_token TEXT NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    def _acquire(self):
+        self._local.connection = self._connect()
+        self._local.connection.execute("BEGIN IMMEDIATE")
+
+    def _release(self):
+        self._local.connection.execute("COMMIT")
+        self._local.connection.close()
+        self._local.connection = None
+
+    def get(self, refresh_token: str) -> str | None:
+        with self.lock():
+            row = self._local.connection.execute("SELECT access_token FROM tokens WHERE key = ?",
+                                                 (_token_key(refresh_token),)).fetchone()
+        return row[0] if row else None
+
+    def set(self, refresh_token: str, access_token: str):
+        with self.lock():
+            self._local.connection.execute("INSERT OR REPLACE INTO tokens (key, access_token) VALUES (?, ?)",
+                                           (_token_key(refresh_token), access_token))
@@ -3,6 +3,9 @@ Author: Quintin Dunn
 Date: 10/22/23
 """
 from .journal import Journal
+from .async_journal import AsyncJournal, AsyncBatch
+from .batch import Batch, BatchResult
+from .upload_queue import UploadQueue, QueuedUpload
 from .common import exceptions
 
 from .factory.friends_factory import FriendsFeedItemsGQL
@@ -0,0 +1,638 @@
+import asyncio
+import logging
+import uuid
+
+from datetime import datetime
+from typing import AsyncIterator, Iterable
+from uuid import uuid4
+
+import requests
+
+from PIL import Image
+
+from .journal import Journal, AWS_HEADERS
+from .batch import Batch, BatchResult
+from .common.async_transport import AsyncTransport
+from .common.bulk import BulkResult, bulk_map_async
+from .common.exceptions import SyncJournalException, AuthTokenExpired
+from .common.media import MediaOutput, render_media
+from .common.pagination import walk_items_async
+from .common.tracing import RequestTrace
+from .common.upload import UploadSource, EncodePool, encode_jpeg, open_upload
+from .common.utils import format_iso_time
+from .factory.friends_factory import FriendsFeedItemsGQL, ProfileDetailsGQL, SendKudosGQL, SearchUsersGQL
+from .factory.media_factory import ImageUploadURLGQL, StatusUpdateGQL, RemoveFriendsFeedItemGQL, AddReactionGQL, \
+    RemoveReactionGQL, SendCommentGQL, DeleteCommentGQL, ReviewMediaGQL, DarkroomGQL
+from .factory.profile_factory import SaveBioGQL, SaveDisplayNameGQL, SaveUsernameGQL, SaveEmojisGQL, SaveDOBGQL, \
+    CurrentUserGQL, SaveMusicGQL, BlockProfileGQL, UnblockProfileGQL
+from .factory.album_factory import AlbumMediaGQL
+from .structures import Profile, FriendsFeed, FriendNode, DarkRoomMedia, ReviewMediaPartition, SearchUser, Album, \
+    AlbumMedia, Snap
+
+logger = logging.getLogger("lapsepy.journal.async_journal.py")
+
+
+class AsyncBatch(Batch):
+    """
+    Batch for an AsyncJournal, used with async with:
+
+        async with lapse.batch() as batch:
+            for msg_id in msg_ids:
+                batch.add_reaction(msg_id, "👍")
+
+    Queuing operations doesn't make any requests so those methods are the same as Batch's, only flush is awaited.
+    """
+
+    def __init__(self, journal: "AsyncJournal", max_operations: int = 25, raise_errors: bool = True):
+        """
+        :param journal: AsyncJournal to send the operations with.
+        :param max_operations: Maximum amount of operations merged into a single request.
+        :param raise_errors: Whether leaving the async with block raises a BatchError when any operation failed.
+        """
+        super().__init__(journal.journal, max_operations=max_operations, raise_errors=raise_errors)
+        self.async_journal = journal
+
+    async def flush(self) -> list[BatchResult]:
+        """
+        Sends every queued operation, see Batch.flush.
+        :return: The results of the operations that were sent.
+        """
+        pending, self.pending = self.pending, []
+
+        for results in self._groups(pending):
+            query = self._merge(results)
+
+            try:
+                response = await self.async_journal._journal_call(query.to_dict(), raise_errors=False)
+            except (SyncJournalException, requests.exceptions.RequestException) as e:
+                for result in results:
+                    result._fail(e)
+                continue
+
+            self._split(results, query, response)
+
+        return pending
+
+    def __enter__(self):
+        raise TypeError("Use async with on an AsyncBatch.")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            # Don't send half of what the caller meant to do.
+            self.pending.clear()
+            return
+
+        await self.flush()
+        self._raise_errors()
+
+
+class AsyncJournal:
+    """
+    asyncio client for the Lapse GraphQL API, every method mirrors the method of the same name on Journal.
+
+    GraphQL calls, AWS uploads, and media downloads are made on the event loop with an AsyncTransport (aiohttp), whose
+    connector and semaphore cap how many requests are in flight. Calls go through the Journal's codec, response cache,
+    tracer, metrics, and persisted queries, so the two share all of them.
+
+    Getting an access token still runs the Journal's blocking refresher, on the event loop's default thread pool and
+    only once for every call waiting on it, and Pillow images are encoded on that pool or in an EncodePool.
+    """
+
+    def __init__(self, journal: Journal, transport: AsyncTransport | None = None, max_concurrency: int = 64):
+        """
+        :param journal: Journal whose settings and access token the calls use.
+        :param transport: AsyncTransport to make the requests with, pass the same one to several clients to share its
+        connections and concurrency limit. Leave as None to create one, using the Journal's timeout and image cache.
+        :param max_concurrency: Maximum amount of requests in flight, only used when transport is None.
+        """
+        self.journal = journal
+
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = AsyncTransport(max_concurrency=max_concurrency, timeout=journal.transport.timeout,
+                                       store_cookies=journal.transport.store_cookies,
+                                       image_cache=journal.transport.image_cache)
+        self.transport = transport
+
+        self._auth_lock = asyncio.Lock()
+
+    async def _refresh(self, auth_token: str | None):
+        """
+        Gets the Journal a new access token, unless another caller already replaced auth_token while this one waited.
+        :param auth_token: The access token the caller used.
+        :return: None
+        """
+        async with self._auth_lock:
+            if self.journal.auth_token == auth_token:
+                logger.debug("Refreshing access token.")
+                await asyncio.get_running_loop().run_in_executor(None, self.journal.refresher)
+
+    async def authenticate(self):
+        """
+        Gets a new access token with the Journal's refresher.
+        :return: None
+        """
+        await self._refresh(self.journal.auth_token)
+
+    async def _journal_call(self, query: dict, reauth=True, raise_errors=True, retries: int = 0,
+                            send_document: bool = False) -> dict:
+        """
+        Makes an API call to the sync-service graphql API, see Journal._sync_journal_call.
+        :return: dict of the HTTP response.
+        """
+        journal = self.journal
+
+        if journal.auth_token is None and journal.refresher is not None:
+            await self._refresh(None)
+
+        logger.debug(f"Making request to {journal.request_url}")
+
+        cache_key, cached = journal._cached_response(query)
+        if cached is not None:
+            return cached
+
+        auth_token = journal.auth_token
+
+        sampled = journal.tracer.sample()
+        trace = None
+        if sampled or journal.metrics is not None:
+            trace = RequestTrace(operation_name=query.get("operationName"), url=journal.request_url, retries=retries)
+
+        error = None
+
+        try:
+            headers, body = journal._encode_call(query, auth_token=auth_token, send_document=send_document)
+            request = await self.transport.post(journal.request_url, headers=headers, data=body)
+
+            if trace is not None:
+                trace.record(status=request.status_code, bytes_sent=len(body), bytes_received=len(request.content))
+
+            if request.status_code >= 400:
+                raise requests.exceptions.HTTPError(request.text)
+
+            response, error = journal._decode_call(request.content)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            journal._finish_call(query, trace=trace, sampled=sampled, error=error, cache_key=cache_key)
+
+        if cache_key is not None and error is None:
+            journal.cache.set(cache_key, request.content)
+
+        if error is not None:
+            retry = journal._retry_call(error, reauth=reauth, send_document=send_document)
+            if retry is not None:
+                if isinstance(error, AuthTokenExpired):
+                    await self._refresh(auth_token)
+
+                return await self._journal_call(query=query, raise_errors=raise_errors, retries=retries + 1, **retry)
+
+            if raise_errors or isinstance(error, AuthTokenExpired):
+                logger.error(f"Got error from request to {journal.request_url} with query {query}.")
+                raise error
+
+        return response
+
+    async def _mutate(self, query: dict, field: str, error_message: str):
+        """
+        Sends a mutation and checks that it succeeded.
+        :param query: The mutation.
+        :param field: Field of the response whose "success" flag has to be set.
+        :param error_message: Message of the SyncJournalException raised when it isn't.
+        :return: None
+        """
+        response = await self._journal_call(query)
+
+        if not response.get("data", {}).get(field, {}).get("success"):
+            raise SyncJournalException(error_message)
+
+    async def _upload_image_to_aws(self, im: UploadSource, upload_url: str):
+        """
+        Uploads an image to the Lapse AWS server, see Journal._upload_image_to_aws.
+        :return: None
+        """
+        if isinstance(im, Image.Image):
+            im = await asyncio.get_running_loop().run_in_executor(None, encode_jpeg, im)
+
+        logger.debug("Uploading image to AWS server.")
+        with open_upload(im) as body:
+            # requests doesn't send a Content-Type with the image either.
+            aws_request = await self.transport.put(upload_url, headers=AWS_HEADERS, data=body,
+                                                   skip_auto_headers=("Content-Type",))
+        aws_request.raise_for_status()
+
+    async def image_upload_url_call(self, file_uuid: str, is_instant: bool = False) -> str:
+        """
+        Creates an API call to the sync-service graphql API to start the image upload process
+        :param file_uuid: uuid of image to upload.
+        :param is_instant: Whether the image being uploaded is for an instant
+        :return: AWS URL the PUT the image on.
+        """
+        query = ImageUploadURLGQL(file_uuid=file_uuid, is_instant=is_instant).to_dict()
+        return (await self._journal_call(query=query)).get("data").get("imageUploadURL")
+
+    async def upload_photo(self, im: UploadSource, develop_in: int, file_uuid: str | None = None,
+                           taken_at: datetime | None = None, color_temperature: float = 6000,
+                           exposure_value: float = 9, flash: bool = False,
+                           timezone: str = "America/New_York") -> DarkRoomMedia:
+        """
+        Upload an image to your Lapse darkroom, see Journal.upload_photo.
+        """
+        return await self._upload_photo(im=im, develop_in=develop_in, file_uuid=file_uuid, taken_at=taken_at,
+                                        color_temperature=color_temperature, exposure_value=exposure_value,
+                                        flash=flash, timezone=timezone)
+
+    async def _upload_photo(self, im: UploadSource, develop_in: int, file_uuid: str | None = None,
+                            taken_at: datetime | None = None, color_temperature: float = 6000,
+                            exposure_value: float = 9, flash: bool = False, timezone: str = "America/New_York",
+                            encode_pool: EncodePool | None = None) -> DarkRoomMedia:
+        if file_uuid is None:
+            # UUID in testing always started with "01HDBZ" with a total length of 26 chars.
+            file_uuid = "01HDBZ" + str(uuid4()).upper().replace("-", "")[:20]
+
+        if taken_at is None:
+            taken_at = datetime.utcnow()
+
+        # Start encoding so it overlaps with getting the upload url.
+        encoding = None
+        if isinstance(im, Image.Image):
+            if encode_pool is not None and encode_pool.processes != 0:
+                encoding = asyncio.wrap_future(encode_pool.submit(im))
+            else:
+                encoding = asyncio.get_running_loop().run_in_executor(None, encode_jpeg, im)
+
+        try:
+            logger.debug("Getting AWS url from Lapse API.")
+            upload_url = await self.image_upload_url_call(file_uuid=file_uuid)
+
+            body = im if encoding is None else await encoding
+        finally:
+            if encoding is not None:
+                encoding.cancel()
+
+        await self._upload_image_to_aws(im=body, upload_url=upload_url)
+
+        logger.debug("Registering image in Lapse darkroom.")
+        query = Journal._register_photo_query(file_uuid=file_uuid, develop_in=develop_in, taken_at=taken_at,
+                                              color_temperature=color_temperature, exposure_value=exposure_value,
+                                              flash=flash, timezone=timezone)
+        await self._journal_call(query=query)
+        logger.debug(f"Finished uploading image {file_uuid}.")
+
+        return DarkRoomMedia(im=im if isinstance(im, Image.Image) else None, media_id=file_uuid, taken_at=taken_at,
+                             develop_in=develop_in, transport=self.journal.transport)
+
+    async def query_darkroom(self) -> list[DarkRoomMedia]:
+        """
+        Queries your darkroom and returns the media inside it.
+        :return:
+        """
+        response = await self._journal_call(DarkroomGQL().to_dict())
+        return self.journal._parse_darkroom(response)
+
+    async def review_snaps(self, archived: list["ReviewMediaPartition"] | None = None,
+                           deleted: list["ReviewMediaPartition"] | None = None,
+                           shared: list["ReviewMediaPartition"] | None = None):
+        """
+        Reviews snaps from the darkroom, see Journal.review_snaps.
+        """
+        query = ReviewMediaGQL(archived=archived or [], deleted=deleted or [], shared=shared or []).to_dict()
+        await self._mutate(query, "reviewMedia", "Error reviewing media.")
+
+    async def upload_instant(self, im: UploadSource, user_id: str, file_uuid: str | None = None,
+                             im_id: str | None = None, caption: str | None = None, time_limit: int = 10):
+        """
+        Uploads an instant and sends it to a user, see Journal.upload_instant.
+        """
+        await self.send_instants(im=im, user_ids=[user_id], file_uuid=file_uuid,
+                                 im_ids=None if im_id is None else [im_id], caption=caption, time_limit=time_limit)
+
+    async def send_instants(self, im: UploadSource, user_ids: Iterable[str], file_uuid: str | None = None,
+                            im_ids: Iterable[str] | None = None, caption: str | None = None, time_limit: int = 10,
+                            max_destinations: int = 25) -> dict[str, str]:
+        """
+        Uploads an instant once and sends it to many users, see Journal.send_instants.
+        """
+        instants, file_uuid, queries = Journal._instant_queries(user_ids=user_ids, file_uuid=file_uuid,
+                                                                im_ids=im_ids, caption=caption,
+                                                                time_limit=time_limit,
+                                                                max_destinations=max_destinations)
+        if not instants:
+            return {}
+
+        upload_url = await self.image_upload_url_call(file_uuid=file_uuid, is_instant=True)
+
+        await self._upload_image_to_aws(im=im, upload_url=upload_url)
+
+        for query in queries:
+            await self._mutate(query, "sendInstants", "Error sending instants.")
+
+        return instants
+
+    async def create_status_update(self, text: str, msg_id: str | None):
+        """
+        Creates a status update on your Journal, see Journal.create_status_update.
+        """
+        if msg_id is None:
+            msg_id = f"STATUS_UPDATE:{uuid.uuid4()}"
+        query = StatusUpdateGQL(text=text, msg_id=msg_id).to_dict()
+        await self._mutate(query, "createStatusUpdate", "Error create new status.")
+
+    async def remove_status_update(self, msg_id: str, removed_at: datetime | None):
+        """
+        Removes a status update, see Journal.remove_status_update.
+        """
+        if removed_at is None:
+            removed_at = datetime.now()
+
+        query = RemoveFriendsFeedItemGQL(msg_id=msg_id, iso_string=format_iso_time(removed_at)).to_dict()
+        await self._mutate(query, "removeFriendsFeedItem", "Failed removing status.")
+
+    async def send_kudos(self, user_id: str):
+        """
+        Sends kudos (vibes) to a given user
+        :param user_id: id of the user to send kudos to.
+        :return:
+        """
+        query = SendKudosGQL(user_id=user_id).to_dict()
+        await self._mutate(query, "sendKudos", "Error sending kudos, could you already have reached your daily limit?")
+
+    async def get_friends_feed(self, count: int = 10, profile: str = "full") -> FriendsFeed:
+        """
+        Gets your friend upload feed.
+        :param count: How many collection to grab.
+        :param profile: How much of each feed item to request, "full", "media-only", or "ids-only", see
+        Journal.get_friends_feed.
+        :return: A list of profiles
+        """
+        response = await self._journal_call(FriendsFeedItemsGQL(last=count, profile=profile).to_dict())
+        return self.journal._parse_friends_feed(response)
+
+    async def get_current_user(self) -> Profile:
+        """
+        Gets the current user information
+        :return: dict of current user information
+        """
+        response = await self._journal_call(CurrentUserGQL().to_dict())
+        return self.journal._parse_current_user(response)
+
+    async def get_profile_by_id(self, user_id: str, album_limit: int = 6, friends_limit: int = 10,
+                                profile: str = "full") -> Profile:
+        """
+        Get a Profile object
+        :param user_id: ID the user of the profile you want to query.
+        :param album_limit: Max amount of albums to get.
+        :param friends_limit: Max amount of friends to get.
+        :param profile: How much of the profile to request, "full", "media-only", or "ids-only", see
+        Journal.get_profile_by_id.
+        :return:
+        """
+        query = ProfileDetailsGQL(user_id=user_id, album_limit=album_limit, friends_limit=friends_limit,
+                                  mutual_limit=1, popular_limit=1, profile=profile).to_dict()
+        return self.journal._parse_profile(await self._journal_call(query))
+
+    async def modify_bio(self, bio: str):
+        """
+        Modifies your Lapse bio.
+        :param bio: Lapse bio to change to.
+        :return: None
+        """
+        await self._mutate(SaveBioGQL(bio=bio).to_dict(), "saveBio", "Error saving bio.")
+
+    async def modify_display_name(self, display_name: str):
+        """
+        Modifies your lapse display name.
+        :param display_name: Lapse display name to change to.
+        :return: None
+        """
+        await self._mutate(SaveDisplayNameGQL(display_name=display_name).to_dict(), "saveDisplayName",
+                           "Error saving display name")
+
+    async def modify_username(self, username: str):
+        """
+        Modifies your lapse username.
+        :param username: Lapse username to change to.
+        :return: None
+        """
+        await self._mutate(SaveUsernameGQL(username=username).to_dict(), "saveUsername", "Error saving username.")
+
+    async def modify_emojis(self, emojis: list[str]):
+        """
+        Modifies your Lapse emojis
+        :param emojis: list with a max len of 5 with emojis or text.
+        :return: None
+        """
+        await self._mutate(SaveEmojisGQL(emojis=emojis).to_dict(), "saveEmojis", "Error saving emojis.")
+
+    async def modify_dob(self, dob: str | datetime):
+        """
+        Modifies your Lapse date of birth
+        :param dob: Date of birth (yyyy-mm-dd)
+        :return: None
+        """
+        if isinstance(dob, datetime):
+            dob = dob.strftime("%Y-%m-%d")
+
+        await self._mutate(SaveDOBGQL(dob=dob).to_dict(), "saveDateOfBirth", "Error saving date of birth.")
+
+    async def modify_music(self, artist: str, artwork_url: str, duration: int, song_title: str, song_url: str):
+        """
+        Modifies your Lapse profile's music, see Journal.modify_music.
+        """
+        query = SaveMusicGQL(artist=artist, artwork_url=artwork_url, duration=duration, song_title=song_title,
+                             song_url=song_url).to_dict()
+        await self._mutate(query, "saveMusic", "Error saving Music.")
+
+    async def add_reaction(self, msg_id: str, reaction: str):
+        """
+        Adds a reaction to a message
+        :param msg_id: ID of msg to send reaction to.
+        :param reaction: Reaction to send.
+        :return:
+        """
+        query = AddReactionGQL(msg_id=msg_id, reaction=reaction).to_dict()
+        await self._mutate(query, "addMediaReaction", "Error adding reaction.")
+
+    async def remove_reaction(self, msg_id: str, reaction: str):
+        """
+        removes a reaction from a message
+        :param msg_id: ID of msg to remove reaction from.
+        :param reaction: Reaction to remove.
+        :return:
+        """
+        query = RemoveReactionGQL(msg_id=msg_id, reaction=reaction).to_dict()
+        await self._mutate(query, "removeMediaReaction", "Error removing reaction.")
+
+    async def create_comment(self, msg_id: str, text: str, comment_id: str | None = None):
+        """
+        Adds a comment to a post
+        :param comment_id: id of the comment, leave as None unless you know what you're doing
+        :param msg_id: id of the message
+        :param text: text to send in the comment
+        :return:
+        """
+        if comment_id is None:
+            comment_id = "01HEH" + str(uuid4()).upper().replace("-", "")[:20]
+        query = SendCommentGQL(comment_id=comment_id, msg_id=msg_id, text=text).to_dict()
+        await self._mutate(query, "sendMediaComment", "Error sending comment.")
+
+    async def delete_comment(self, msg_id: str, comment_id: str):
+        """
+        Deletes a comment from a lapsepy post
+        :param msg_id: ID of the post
+        :param comment_id: ID of the comment
+        :return:
+        """
+        query = DeleteCommentGQL(msg_id=msg_id, comment_id=comment_id).to_dict()
+        await self._mutate(query, "deleteMediaComment", "Error deleting comment.")
+
+    async def search_for_user(self, term: str, first: int = 10) -> list[SearchUser]:
+        """
+        Searches for a User using Lapse API
+        :param term: Term to search for
+        :param first: How many results to get at maximum (Not used)
+        :return:
+        """
+        response = await self._journal_call(SearchUsersGQL(term=term, first=first).to_dict())
+        return self.journal._parse_search_users(response.get("data", {}).get("searchUsers", {}).get("edges"))
+
+    async def block_user(self, user_id: str):
+        """
+        Send a user blocking API call
+        :param user_id: ID of the user to block
+        :return:
+        """
+        await self._mutate(BlockProfileGQL(user_id=user_id).to_dict(), "blockProfile",
+                           f"Error blocking user {user_id}.")
+
+    async def unblock_user(self, user_id: str):
+        """
+        Send a user unblocking API call
+        :param user_id: ID of the user to unblock
+        :return:
+        """
+        await self._mutate(UnblockProfileGQL(user_id=user_id).to_dict(), "unblockProfile",
+                           f"Error unblocking user {user_id}.")
+
+    async def get_album_by_id(self, album_id: str, last: int, profile: str = "full") -> Album:
+        """
+        Gets an album by its ID.
+        :param album_id: ID of the album
+        :param last: How many items to query from the album.
+        :param profile: How much of each item to request, see Journal.get_album_by_id.
+        :return:
+        """
+        response = await self._journal_call(AlbumMediaGQL(album_id=album_id, last=last, profile=profile).to_dict())
+        return self.journal._parse_album(response, album_id=album_id)
+
+    def iter_friends_feed(self, page_size: int = 10, limit: int | None = None, prefetch: int = 0,
+                          profile: str = "full") -> AsyncIterator[FriendNode]:
+        """
+        Walks your friends feed page by page, see Journal.iter_friends_feed. Prefetched pages are fetched by a task
+        instead of a thread.
+        :return: Async generator of FriendNodes.
+        """
+        async def fetch_page(first: int, after: str | None) -> tuple[list[FriendNode], dict]:
+            query = FriendsFeedItemsGQL(last=None, first=first, after=after, profile=profile).to_dict()
+            return self.journal._parse_friends_feed_page(await self._journal_call(query))
+
+        return walk_items_async(fetch_page, page_size=page_size, limit=limit, prefetch=prefetch)
+
+    def iter_search_users(self, term: str, page_size: int = 10, limit: int | None = None,
+                          prefetch: int = 0) -> AsyncIterator[SearchUser]:
+        """
+        Walks the search results for a term page by page, see Journal.iter_search_users.
+        :return: Async generator of SearchUsers.
+        """
+        async def fetch_page(first: int, after: str | None) -> tuple[list[SearchUser], dict]:
+            query = SearchUsersGQL(term=term, first=first, after=after).to_dict()
+            return self.journal._parse_search_users_page(await self._journal_call(query))
+
+        return walk_items_async(fetch_page, page_size=page_size, limit=limit, prefetch=prefetch)
+
+    def iter_album_media(self, album_id: str, page_size: int = 20, limit: int | None = None, prefetch: int = 0,
+                         profile: str = "full") -> AsyncIterator[AlbumMedia]:
+        """
+        Walks an album's media page by page, see Journal.iter_album_media.
+        :return: Async generator of AlbumMedia.
+        """
+        async def fetch_page(first: int, after: str | None) -> tuple[list[AlbumMedia], dict]:
+            query = AlbumMediaGQL(album_id=album_id, last=None, first=first, after=after, profile=profile).to_dict()
+            return self.journal._parse_album_media_page(await self._journal_call(query))
+
+        return walk_items_async(fetch_page, page_size=page_size, limit=limit, prefetch=prefetch)
+
+    async def _load_media_item(self, media: Snap | AlbumMedia | DarkRoomMedia | Profile, quality: int,
+                               fl_keep_iptc: bool, output: str = "image") -> MediaOutput | None:
+        if isinstance(media, Snap):
+            if media.filtered_id is not None:
+                url, key = media._filtered_url(quality, fl_keep_iptc)
+            elif media.original_id is not None:
+                url, key = media._original_url(quality, fl_keep_iptc)
+            else:
+                return None
+        elif isinstance(media, (AlbumMedia, DarkRoomMedia)):
+            url, key = media._url(quality, fl_keep_iptc)
+        elif isinstance(media, Profile):
+            url, key = media._picture_url(quality, None)
+        else:
+            raise TypeError(f"Cannot load media of type {type(media).__name__}.")
+
+        logger.debug(f"Getting image from \"{url}\"")
+
+        # Pillow only reads the image's header here, the pixels are decoded when the image is first used.
+        return render_media(await self.transport.get_media(url, key), output)
+
+    def load_media(self, media: Iterable[Snap | AlbumMedia | DarkRoomMedia | Profile], quality: int = 65,
+                   fl_keep_iptc: bool = True, workers: int = 8, ordered: bool = False,
+                   output: str = "image") -> AsyncIterator[BulkResult]:
+        """
+        Downloads the images of many media at once, see Journal.load_media.
+        :param workers: How many images to download at once, they also count towards the transport's concurrency limit.
+        :return: Async generator of BulkResults.
+        """
+        async def load(item):
+            return await self._load_media_item(item, quality=quality, fl_keep_iptc=fl_keep_iptc, output=output)
+
+        return bulk_map_async(load, media, workers=workers, ordered=ordered)
+
+    async def upload_photos(self, images: Iterable[UploadSource], develop_in: int, workers: int = 8,
+                            encode_processes: int | None = None, ordered: bool = False,
+                            color_temperature: float = 6000, exposure_value: float = 9, flash: bool = False,
+                            timezone: str = "America/New_York") -> AsyncIterator[BulkResult]:
+        """
+        Uploads many images to your Lapse darkroom at once, see Journal.upload_photos. With encode_processes=0 the
+        images are encoded on the event loop's default thread pool.
+        :return: Async generator of BulkResults.
+        """
+        encode_pool = EncodePool(processes=encode_processes)
+
+        async def upload(im):
+            return await self._upload_photo(im=im, develop_in=develop_in, color_temperature=color_temperature,
+                                            exposure_value=exposure_value, flash=flash, timezone=timezone,
+                                            encode_pool=encode_pool)
+
+        with encode_pool:
+            async for result in bulk_map_async(upload, images, workers=workers, ordered=ordered):
+                yield result
+
+    def batch(self, max_operations: int = 25, raise_errors: bool = True) -> AsyncBatch:
+        """
+        Collects mutations and sends them merged into as few requests as possible, see AsyncBatch.
+        :param max_operations: Maximum amount of operations merged into a single request.
+        :param raise_errors: Whether leaving the async with block raises a BatchError when any operation failed.
+        :return: AsyncBatch to use as an async context manager.
+        """
+        return AsyncBatch(self, max_operations=max_operations, raise_errors=raise_errors)
+
+    async def close(self):
+        """
+        Closes the AsyncTransport if this client created it.
+        :return: None
+        """
+        if self._owns_transport:
+            await self.transport.close()
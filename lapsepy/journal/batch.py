@@ -0,0 +1,233 @@
+from uuid import uuid4
+
+import requests
+
+from .common.exceptions import sync_journal_exception_router, SyncJournalException, BatchError
+from .factory.factory import BaseGQL
+from .factory.batch_factory import BatchGQL, split_document
+from .factory.friends_factory import SendKudosGQL
+from .factory.media_factory import AddReactionGQL, RemoveReactionGQL, SendCommentGQL, DeleteCommentGQL
+from .factory.profile_factory import BlockProfileGQL, UnblockProfileGQL
+from .structures import Profile
+
+import logging
+
+logger = logging.getLogger("lapsepy.journal.batch.py")
+
+
+class BatchResult:
+    """
+    Outcome of a single operation sent as part of a Batch, filled in when the batch is flushed.
+    """
+
+    def __init__(self, operation: BaseGQL, success_field: str | None = None, error_message: str | None = None):
+        """
+        :param operation: The batched operation.
+        :param success_field: Field of the response whose "success" flag has to be set for the operation to have
+        succeeded, leave as None to only check for GraphQL errors.
+        :param error_message: Message of the error raised when the success flag isn't set.
+        """
+        self.operation = operation
+        self.success_field = success_field
+        self.error_message = error_message
+
+        self.done = False
+        self.value: dict | None = None
+        self.error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.done and self.error is None
+
+    def result(self) -> dict:
+        """
+        :return: The operation's part of the response, raises the operation's error if it failed.
+        """
+        if not self.done:
+            raise SyncJournalException("Batch hasn't been flushed yet.")
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def _resolve(self, response: dict):
+        self.done = True
+        self.value = response
+
+        errors = response.get("errors", [])
+        if errors:
+            self.error = sync_journal_exception_router(error=errors[0])
+        elif self.success_field and not (response.get("data", {}).get(self.success_field) or {}).get("success"):
+            self.error = SyncJournalException(self.error_message or f"Error running {self.operation.operation_name}.")
+
+    def _fail(self, error: Exception):
+        self.done = True
+        self.error = error
+
+
+class Batch:
+    """
+    Collects mutations and sends them together, merged into a single GraphQL document, instead of making one request
+    per mutation. Use through Journal.batch or Lapse.batch:
+
+        with lapse.batch() as batch:
+            for msg_id in msg_ids:
+                batch.add_reaction(msg_id, "👍")
+
+    The operations are sent when the with block exits, or whenever flush is called.
+    """
+
+    def __init__(self, journal, max_operations: int = 25, raise_errors: bool = True):
+        """
+        :param journal: Journal to send the operations with.
+        :param max_operations: Maximum amount of operations merged into a single request.
+        :param raise_errors: Whether leaving the with block raises a BatchError when any operation failed.
+        """
+        if max_operations < 1:
+            raise ValueError("max_operations must be at least 1.")
+
+        self.journal = journal
+        self.max_operations = max_operations
+        self.raise_errors = raise_errors
+
+        self.pending: list[BatchResult] = []
+        self.results: list[BatchResult] = []
+
+    def add(self, operation: BaseGQL, success_field: str | None = None,
+            error_message: str | None = None) -> BatchResult:
+        """
+        Queues an arbitrary operation.
+        :param operation: Operation to queue.
+        :param success_field: See BatchResult.
+        :param error_message: See BatchResult.
+        :return: BatchResult filled in once the batch is flushed.
+        """
+        result = BatchResult(operation, success_field=success_field, error_message=error_message)
+        self.pending.append(result)
+        self.results.append(result)
+        return result
+
+    def add_reaction(self, msg_id: str, reaction: str) -> BatchResult:
+        """
+        Queues adding a reaction to a message, see Lapse.add_reaction.
+        """
+        return self.add(AddReactionGQL(msg_id=msg_id, reaction=reaction), "addMediaReaction",
+                        "Error adding reaction.")
+
+    def remove_reaction(self, msg_id: str, reaction: str) -> BatchResult:
+        """
+        Queues removing a reaction from a message, see Lapse.remove_reaction.
+        """
+        return self.add(RemoveReactionGQL(msg_id=msg_id, reaction=reaction), "removeMediaReaction",
+                        "Error removing reaction.")
+
+    def send_comment(self, msg_id: str, text: str, comment_id: str | None = None) -> BatchResult:
+        """
+        Queues adding a comment to a post, see Lapse.send_comment.
+        """
+        if comment_id is None:
+            comment_id = "01HEH" + str(uuid4()).upper().replace("-", "")[:20]
+
+        return self.add(SendCommentGQL(comment_id=comment_id, msg_id=msg_id, text=text), "sendMediaComment",
+                        "Error sending comment.")
+
+    def delete_comment(self, msg_id: str, comment_id: str) -> BatchResult:
+        """
+        Queues deleting a comment from a post, see Lapse.delete_comment.
+        """
+        return self.add(DeleteCommentGQL(msg_id=msg_id, comment_id=comment_id), "deleteMediaComment",
+                        "Error deleting comment.")
+
+    def send_kudos(self, user: str | Profile) -> BatchResult:
+        """
+        Queues sending kudos (vibes) to a user, see Lapse.send_kudos.
+        """
+        if isinstance(user, Profile):
+            user = user.user_id
+
+        return self.add(SendKudosGQL(user_id=user), "sendKudos",
+                        "Error sending kudos, could you already have reached your daily limit?")
+
+    def block_profile(self, user: str | Profile) -> BatchResult:
+        """
+        Queues blocking a user, see Lapse.block_profile.
+        """
+        if isinstance(user, Profile):
+            user = user.user_id
+
+        return self.add(BlockProfileGQL(user_id=user), "blockProfile", f"Error blocking user {user}.")
+
+    def unblock_profile(self, user: str | Profile) -> BatchResult:
+        """
+        Queues unblocking a user, see Lapse.unblock_profile.
+        """
+        if isinstance(user, Profile):
+            user = user.user_id
+
+        return self.add(UnblockProfileGQL(user_id=user), "unblockProfile", f"Error unblocking user {user}.")
+
+    def flush(self) -> list[BatchResult]:
+        """
+        Sends every queued operation. Queries and mutations can't share a document so they're sent separately, and
+        mutations keep the order they were queued in since a GraphQL server runs a document's mutations one by one.
+        :return: The results of the operations that were sent.
+        """
+        pending, self.pending = self.pending, []
+
+        for results in self._groups(pending):
+            self._send(results)
+
+        return pending
+
+    def _groups(self, pending: list[BatchResult]) -> list[list[BatchResult]]:
+        by_type: dict[str, list[BatchResult]] = {}
+        for result in pending:
+            by_type.setdefault(split_document(result.operation.query)[0], []).append(result)
+
+        return [results[i:i + self.max_operations]
+                for results in by_type.values() for i in range(0, len(results), self.max_operations)]
+
+    def _send(self, results: list[BatchResult]):
+        query = self._merge(results)
+
+        try:
+            response = self.journal._sync_journal_call(query.to_dict(), raise_errors=False)
+        except (SyncJournalException, requests.exceptions.RequestException) as e:
+            for result in results:
+                result._fail(e)
+            return
+
+        self._split(results, query, response)
+
+    @staticmethod
+    def _merge(results: list[BatchResult]) -> BaseGQL:
+        logger.debug(f"Sending batch of {len(results)} operations.")
+
+        # A lone operation is sent as is, there's nothing to merge it with.
+        if len(results) == 1:
+            return results[0].operation
+
+        return BatchGQL([result.operation for result in results])
+
+    @staticmethod
+    def _split(results: list[BatchResult], query: BaseGQL, response: dict):
+        responses = [response] if len(results) == 1 else query.split_response(response)
+        for result, op_response in zip(results, responses):
+            result._resolve(op_response)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            # Don't send half of what the caller meant to do.
+            self.pending.clear()
+            return
+
+        self.flush()
+        self._raise_errors()
+
+    def _raise_errors(self):
+        failed = [result for result in self.results if not result.ok]
+        if failed and self.raise_errors:
+            raise BatchError(f"{len(failed)} of {len(self.results)} batched operations failed, first error: "
+                             f"{failed[0].error}", results=failed)
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import mmap
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .image_cache import DiskImageCache
+
+logger = logging.getLogger("lapsepy.journal.common.async_transport.py")
+
+
+class AsyncResponse:
+    """
+    Response to a request made with AsyncTransport, its body is read in full before the connection is released.
+    """
+
+    def __init__(self, url: str, status_code: int, reason: str | None, headers: dict, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(errors="replace")
+
+    def raise_for_status(self):
+        """
+        Raises the same requests HTTPError a requests Response would for a 4xx or 5xx status.
+        :return: None
+        """
+        if self.status_code >= 400:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.exceptions.HTTPError(f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}")
+
+
+class AsyncTransport:
+    """
+    asyncio HTTP transport used by AsyncJournal, built on aiohttp. Every request goes through one aiohttp session, so
+    one connector holds the keep-alive connections to the GraphQL API, AWS, and the image CDN, and a semaphore caps how
+    many requests are in flight at once. Pass the same AsyncTransport to several clients to share both.
+
+    The session is created on the first request and belongs to that event loop, so an AsyncTransport is only used from
+    one loop. Failed connections and timeouts raise requests' ConnectionError and Timeout, so callers handle the same
+    exceptions as with Transport.
+    """
+
+    def __init__(self, max_concurrency: int = 64, timeout: float | None = None, store_cookies: bool = True,
+                 image_cache: DiskImageCache | None = None):
+        """
+        :param max_concurrency: Maximum amount of requests in flight, and of open connections, at once.
+        :param timeout: Timeout in seconds for every request, None waits forever.
+        :param store_cookies: Whether to keep cookies set by responses, see Transport.
+        :param image_cache: Disk cache for the images fetched with get_media, leave as None to always download them.
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncTransport needs aiohttp, install it with \"pip install lapsepy[async]\".")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.store_cookies = store_cookies
+        self.image_cache = image_cache
+
+        self.session: aiohttp.ClientSession | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self.session is None or self.session.closed:
+            logger.debug("Creating aiohttp session.")
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            cookie_jar = aiohttp.CookieJar() if self.store_cookies else aiohttp.DummyCookieJar()
+            self.session = aiohttp.ClientSession(connector=connector, cookie_jar=cookie_jar,
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+        return self.session
+
+    async def request(self, method: str, url: str, headers: dict | None = None, data=None,
+                      **kwargs) -> AsyncResponse:
+        """
+        Sends an HTTP request once one of the max_concurrency slots is free.
+        :param method: HTTP method to use.
+        :param url: URL to send the request to.
+        :param headers: Headers to send.
+        :param data: Body to send, bytes or a binary file object. Files are streamed and read on the default thread
+        pool by aiohttp.
+        :param kwargs: Extra arguments passed through to aiohttp.
+        :return: AsyncResponse object.
+        """
+        if hasattr(data, "read"):
+            # Without a Content-Disposition header, which aiohttp adds to files by default, like requests sends them.
+            data = aiohttp.payload.get_payload(data, disposition=None)
+
+        async with self._semaphore:
+            try:
+                async with self._get_session().request(method, url, headers=headers, data=data,
+                                                       **kwargs) as response:
+                    content = await response.read()
+                    return AsyncResponse(url=url, status_code=response.status, reason=response.reason,
+                                         headers=dict(response.headers), content=content)
+            except asyncio.TimeoutError as e:
+                raise requests.exceptions.Timeout(f"Request to {url} timed out.") from e
+            except aiohttp.ClientError as e:
+                raise requests.exceptions.ConnectionError(str(e)) from e
+
+    async def get(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request("PUT", url, **kwargs)
+
+    async def get_media(self, url: str, key: str | None = None) -> bytes | mmap.mmap:
+        """
+        Downloads an image from the CDN, going through the image cache when there is one, see Transport.get_media.
+        :param url: URL of the image.
+        :param key: Cache key of the image from media_key, leave as None to not cache it.
+        :return: The image's bytes, or a read only memory map of them when they came from the cache.
+        """
+        if self.image_cache is not None and key is not None:
+            data = self.image_cache.get(key)
+            if data is not None:
+                logger.debug(f"Got \"{url}\" from the image cache.")
+                return data
+
+        response = await self.get(url)
+        response.raise_for_status()
+
+        if self.image_cache is not None and key is not None:
+            self.image_cache.set(key, response.content)
+
+        return response.content
+
+    async def close(self):
+        """
+        Closes every pooled connection.
+        :return: None
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
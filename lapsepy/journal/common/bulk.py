@@ -0,0 +1,167 @@
+import asyncio
+import logging
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator
+
+logger = logging.getLogger("lapsepy.journal.common.bulk.py")
+
+
+class BulkResult:
+    """
+    Outcome of a single item of a bulk operation, either value is set or error is.
+    """
+
+    def __init__(self, index: int, item: Any, value: Any = None, error: BaseException | None = None):
+        self.index = index
+        self.item = item
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __str__(self):
+        state = "ok" if self.ok else f"error={self.error!r}"
+        return f"<BulkResult index={self.index} {state}>"
+
+    __repr__ = __str__
+
+
+def bulk_map(func: Callable[[Any], Any], items: Iterable, workers: int = 8, ordered: bool = False,
+             executor: ThreadPoolExecutor | None = None) -> Iterator[BulkResult]:
+    """
+    Runs func over items on a bounded thread pool, yielding a BulkResult for every item. A failing item is reported
+    in its BulkResult and does not stop the others.
+
+    Items are pulled from the iterable as workers free up, so at most 2 * workers items are in flight and huge or
+    lazy iterables are never read all at once.
+    :param func: Function to call with each item.
+    :param items: Items to process.
+    :param workers: Maximum amount of items to process at once.
+    :param ordered: Whether to yield results in the same order as items, otherwise they're yielded as they finish.
+    :param executor: Thread pool to run on, leave as None to create one for this call.
+    :return: Generator of BulkResults.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lapsepy-bulk")
+
+    max_pending = workers * 2
+    items_iter = enumerate(items)
+
+    def submit_next(pending) -> bool:
+        try:
+            index, item = next(items_iter)
+        except StopIteration:
+            return False
+
+        future = executor.submit(func, item)
+        submitted[future] = (index, item)
+
+        if ordered:
+            pending.append(future)
+        else:
+            pending.add(future)
+        return True
+
+    def to_result(future: Future) -> BulkResult:
+        index, item = submitted.pop(future)
+
+        error = future.exception()
+        if error is not None:
+            logger.debug(f"Bulk item {index} failed: {error!r}")
+            return BulkResult(index=index, item=item, error=error)
+        return BulkResult(index=index, item=item, value=future.result())
+
+    submitted: dict[Future, tuple[int, Any]] = {}
+    pending = deque() if ordered else set()
+
+    try:
+        while len(pending) < max_pending and submit_next(pending):
+            pass
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+
+            for future in done:
+                submit_next(pending)
+                yield to_result(future)
+    finally:
+        for future in pending:
+            future.cancel()
+
+        if owns_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def bulk_map_async(func: Callable[[Any], Awaitable[Any]], items: Iterable, workers: int = 8,
+                         ordered: bool = False) -> AsyncIterator[BulkResult]:
+    """
+    Same as bulk_map for a coroutine function, every item is processed in a task on the running event loop instead of
+    on a thread. Items are pulled from the iterable as tasks finish, so at most workers items are in flight.
+    :param func: Coroutine function to call with each item.
+    :param items: Items to process.
+    :param workers: Maximum amount of items to process at once.
+    :param ordered: Whether to yield results in the same order as items, otherwise they're yielded as they finish.
+    :return: Async generator of BulkResults.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+
+    items_iter = enumerate(items)
+
+    def submit_next(pending) -> bool:
+        try:
+            index, item = next(items_iter)
+        except StopIteration:
+            return False
+
+        task = asyncio.ensure_future(func(item))
+        submitted[task] = (index, item)
+
+        if ordered:
+            pending.append(task)
+        else:
+            pending.add(task)
+        return True
+
+    def to_result(task: asyncio.Future) -> BulkResult:
+        index, item = submitted.pop(task)
+
+        error = task.exception()
+        if error is not None:
+            logger.debug(f"Bulk item {index} failed: {error!r}")
+            return BulkResult(index=index, item=item, error=error)
+        return BulkResult(index=index, item=item, value=task.result())
+
+    submitted: dict[asyncio.Future, tuple[int, Any]] = {}
+    pending = deque() if ordered else set()
+
+    try:
+        while len(pending) < workers and submit_next(pending):
+            pass
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+                await asyncio.wait(done)
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+
+            for task in done:
+                submit_next(pending)
+                yield to_result(task)
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,176 @@
+import json
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+
+from ..factory.factory import query_hash
+
+logger = logging.getLogger("lapsepy.journal.common.cache.py")
+
+# How many seconds the response of each read only operation is cached for, operations not listed are never cached.
+DEFAULT_TTLS = {
+    "CurrentUserGraphQLQuery": 60,
+    "ProfileDetailsGraphQLQuery": 60,
+    "SearchUsersGraphQLQuery": 300,
+    "AlbumMediaGraphQLQuery": 60,
+    "DarkroomGraphQLQuery": 10
+}
+
+_PROFILE = ("CurrentUserGraphQLQuery", "ProfileDetailsGraphQLQuery", "SearchUsersGraphQLQuery")
+
+# Cached operations each mutation makes stale. Mutations that aren't listed, batches included, drop every cached
+# response of the account since there's no telling what they changed.
+DEFAULT_INVALIDATIONS = {
+    "SaveBioGraphQLMutation": _PROFILE,
+    "SaveDisplayNameGraphQLMutation": _PROFILE,
+    "SaveUsernameGraphQLMutation": _PROFILE,
+    "SaveEmojisGraphQLMutation": _PROFILE,
+    "SaveDOBGraphQLMutation": _PROFILE,
+    "SaveMusicGraphQLMutation": _PROFILE,
+    "BlockProfileGraphQLMutation": _PROFILE,
+    "UnblockProfileGraphQLMutation": _PROFILE,
+    "SendKudosGraphQLMutation": ("ProfileDetailsGraphQLQuery",),
+    "CreateStatusUpdateGraphQLMutation": ("ProfileDetailsGraphQLQuery",),
+    "RemoveFriendsFeedItem": ("ProfileDetailsGraphQLQuery",),
+    "CreateMediaGraphQLMutation": ("DarkroomGraphQLQuery",),
+    "ReviewMediaGraphQLMutation": ("DarkroomGraphQLQuery", "ProfileDetailsGraphQLQuery", "AlbumMediaGraphQLQuery"),
+    "SendInstantsGraphQLMutation": (),
+    "AddReactionGraphQLMutation": (),
+    "RemoveReactionGraphQLMutation": (),
+    "SendCommentGraphQLMutation": (),
+    "DeleteCommentGraphQLMutation": ()
+}
+
+
+def is_mutation(query: dict) -> bool:
+    """
+    :param query: Query dict as sent to the API.
+    :return: Whether the query is a mutation.
+    """
+    return (query.get("query") or "").lstrip().startswith("mutation")
+
+
+class ResponseCache:
+    """
+    LRU cache of the raw responses to read only GraphQL queries, bounded by both entry count and total bytes. Entries
+    are keyed by operation name, normalized variables, and account, so one cache can be shared by several clients.
+    """
+
+    def __init__(self, ttls: dict[str, float] | None = None, max_entries: int = 1024,
+                 max_bytes: int = 16 * 1024 * 1024, invalidations: dict[str, tuple[str, ...]] | None = None):
+        """
+        :param ttls: Seconds to cache each operation's responses for, keyed by operation name. Leave as None to use
+        DEFAULT_TTLS, operations not in it are never cached.
+        :param max_entries: Maximum amount of responses to keep.
+        :param max_bytes: Maximum total size of the kept responses.
+        :param invalidations: Cached operations each mutation makes stale, keyed by mutation operation name. Leave as
+        None to use DEFAULT_INVALIDATIONS.
+        """
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.invalidations = dict(DEFAULT_INVALIDATIONS if invalidations is None else invalidations)
+
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+
+        # key -> (expires_at, body)
+        self._entries: OrderedDict[tuple, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, account: str, query: dict) -> tuple | None:
+        """
+        :param account: Key of the account making the query, so accounts never see each other's responses.
+        :param query: Query dict as sent to the API.
+        :return: Cache key of the query, None if its operation isn't cached.
+        """
+        operation_name = query.get("operationName")
+        if operation_name not in self.ttls:
+            return None
+
+        variables = json.dumps(query.get("variables"), sort_keys=True, separators=(",", ":"), default=str)
+
+        # The same operation can be sent with different documents (see QUERY_PROFILES), which return different fields.
+        document = query_hash(query["query"]) if query.get("query") else None
+        return account, operation_name, variables, document
+
+    def get(self, key: tuple) -> bytes | None:
+        """
+        :param key: Key from make_key.
+        :return: The cached response body, None if there isn't one or it expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: tuple, body: bytes):
+        """
+        Caches a response, evicting the least recently used ones to stay within max_entries and max_bytes.
+        :param key: Key from make_key.
+        :param body: Raw response body.
+        :return: None
+        """
+        if len(body) > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttls[key[1]]
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (expires_at, body)
+            self.size += len(body)
+
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: tuple):
+        _, body = self._entries.pop(key)
+        self.size -= len(body)
+
+    def invalidate(self, account: str | None = None, operation_names: tuple[str, ...] | None = None):
+        """
+        Drops cached responses.
+        :param account: Only drop this account's responses, None drops every account's.
+        :param operation_names: Only drop responses to these operations, None drops every operation's.
+        :return: None
+        """
+        with self._lock:
+            for key in [key for key in self._entries
+                        if (account is None or key[0] == account)
+                        and (operation_names is None or key[1] in operation_names)]:
+                self._remove(key)
+
+    def on_mutation(self, account: str, operation_name: str | None):
+        """
+        Drops the cached responses a mutation made stale.
+        :param account: Account that made the mutation.
+        :param operation_name: operationName of the mutation.
+        :return: None
+        """
+        operation_names = self.invalidations.get(operation_name)
+
+        if operation_names is None:
+            logger.debug(f"Unknown mutation {operation_name}, dropping every cached response of the account.")
+            self.invalidate(account)
+        elif operation_names:
+            self.invalidate(account, operation_names)
+
+    def clear(self):
+        self.invalidate()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,99 @@
+import json
+import logging
+
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logger = logging.getLogger("lapsepy.journal.common.codec.py")
+
+
+class JSONCodec:
+    """
+    Serializes GraphQL requests and parses GraphQL responses. The base class uses the standard library's json module,
+    subclasses swap in faster parsers.
+    """
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        """
+        :param obj: JSON serializable object.
+        :return: UTF-8 encoded JSON.
+        """
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes | str) -> Any:
+        """
+        :param data: JSON document.
+        :return: The parsed document.
+        """
+        return json.loads(data)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed, install it with \"pip install orjson\".")
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError("msgspec is not installed, install it with \"pip install msgspec\".")
+
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes | str) -> Any:
+        return self._decoder.decode(data)
+
+
+CODECS: dict[str, type[JSONCodec]] = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec
+}
+
+
+def get_codec(name: str | None = None) -> JSONCodec:
+    """
+    :param name: "json", "orjson", or "msgspec". Leave as None to get the fastest one that's installed, orjson, then
+    msgspec, then the standard library.
+    :return: JSONCodec object.
+    """
+    if name is not None:
+        if name not in CODECS:
+            raise ValueError(f"Unknown codec \"{name}\", expected one of {', '.join(CODECS)}.")
+        return CODECS[name]()
+
+    if orjson is not None:
+        return OrjsonCodec()
+    if msgspec is not None:
+        return MsgspecCodec()
+
+    logger.debug("Neither orjson nor msgspec are installed, using the standard library json parser.")
+    return JSONCodec()
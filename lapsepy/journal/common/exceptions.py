@@ -36,6 +36,31 @@ class AuthTokenExpired(AuthTokenError):
         return self.message
 
 
+class BatchError(SyncJournalException):
+    def __init__(self, message: str = "", results: list | None = None):
+        self.message = message
+        self.results = results or []
+
+    def __str__(self):
+        return self.message
+
+
+class PersistedQueryNotFound(SyncJournalException):
+    def __init__(self, message: str = ""):
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+class PersistedQueryNotSupported(SyncJournalException):
+    def __init__(self, message: str = ""):
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
 
 
 def sync_journal_exception_router(error: dict) -> SyncJournalException:
@@ -45,7 +70,13 @@ def sync_journal_exception_router(error: dict) -> SyncJournalException:
     :param error: Error from https://sync-service.production.journal-api.lapse.app/graphql
     :return: Error
     """
-    if error.get("message") == "No authentication token provided":
+    code = (error.get("extensions") or {}).get("code")
+
+    if error.get("message") == "PersistedQueryNotFound" or code == "PERSISTED_QUERY_NOT_FOUND":
+        return PersistedQueryNotFound("Persisted query not found.")
+    elif error.get("message") == "PersistedQueryNotSupported" or code == "PERSISTED_QUERY_NOT_SUPPORTED":
+        return PersistedQueryNotSupported("Persisted queries are not supported.")
+    elif error.get("message") == "No authentication token provided":
         return AuthTokenError(error.get("message"))
     elif error.get("message") == "JWT string does not consist of exactly 3 parts (header, payload, signature)":
         return AuthTokenError("Authentication token is not properly formatted")
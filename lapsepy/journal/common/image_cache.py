@@ -0,0 +1,157 @@
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger("lapsepy.journal.common.image_cache.py")
+
+
+def media_key(media_id: str, transformation: str) -> str:
+    """
+    :param media_id: ID of the media on the image CDN.
+    :param transformation: Transformation string the image is requested with, eg "q_65,fl_keep_itc".
+    :return: Content address of the image, the same for every process.
+    """
+    return hashlib.sha256(f"{media_id}\0{transformation}".encode()).hexdigest()
+
+
+class DiskImageCache:
+    """
+    Size bounded cache of downloaded images on disk, safe to share between threads and processes. Files are written
+    atomically, read through mmap, and the least recently used ones are evicted once the cache outgrows max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        :param directory: Directory to keep the images in, it's created when missing.
+        :param max_bytes: Maximum total size of the cached images.
+        """
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        # Fan out over subdirectories so no directory gets too big.
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> mmap.mmap | None:
+        """
+        :param key: Key from media_key.
+        :return: Read only memory map of the cached image, None if it isn't cached.
+        """
+        path = self._path(key)
+
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        # Eviction goes by modification time, so mark the image as recently used.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return data
+
+    def set(self, key: str, data: bytes):
+        """
+        Caches an image.
+        :param key: Key from media_key.
+        :param data: The image's bytes.
+        :return: None
+        """
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see a half written image.
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+
+            # The image being replaced no longer counts towards the size.
+            try:
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data) - replaced
+
+            if self._size is None or self._size > self.max_bytes:
+                self._evict()
+
+    def _files(self) -> list[tuple[float, int, str]]:
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.startswith(".tmp-"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _evict(self):
+        """
+        Deletes the least recently used images until the cache fits in max_bytes. Other processes write to the same
+        directory, so the size is recounted from disk every time.
+        """
+        files = sorted(self._files())
+        size = sum(file_size for _, file_size, _ in files)
+
+        for _, file_size, path in files:
+            if size <= self.max_bytes:
+                break
+
+            try:
+                os.unlink(path)
+                size -= file_size
+            except OSError as e:
+                # Already evicted by another process, or still mapped on Windows.
+                logger.debug(f"Could not evict {path}: {e!r}")
+
+        self._size = size
+
+    @property
+    def size(self) -> int:
+        """
+        :return: Total size of the cached images in bytes.
+        """
+        return sum(file_size for _, file_size, _ in self._files())
+
+    def clear(self):
+        """
+        Deletes every cached image.
+        :return: None
+        """
+        for _, _, path in self._files():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+        with self._lock:
+            self._size = 0
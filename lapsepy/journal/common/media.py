@@ -0,0 +1,120 @@
+import io
+import mmap
+import threading
+
+from PIL import Image
+
+# What the media loaders can return, see render_media.
+OUTPUTS = ("image", "bytes", "memoryview", "lazy")
+
+
+def open_image(data: bytes | mmap.mmap) -> Image.Image:
+    """
+    Opens downloaded image data with Pillow.
+    :param data: The image's bytes, or a memory map of them from the image cache.
+    :return: Pillow image.
+    """
+    # A memory map is already file like, wrapping it in BytesIO would copy it.
+    if isinstance(data, mmap.mmap):
+        return Image.open(data)
+
+    return Image.open(io.BytesIO(data))
+
+
+class LazyImage:
+    """
+    Downloaded image that's only opened with Pillow the first time it's used as one. Jobs that only store the image
+    can use data, to_bytes, or save_raw without Pillow ever touching it.
+
+    Any attribute Pillow images have, like size, save, or getpixel, opens the image and is looked up on it.
+    """
+
+    def __init__(self, data: bytes | mmap.mmap):
+        """
+        :param data: The image's encoded bytes.
+        """
+        self.data = data
+        self._image: Image.Image | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def decoded(self) -> bool:
+        """
+        :return: Whether the image was opened with Pillow yet.
+        """
+        return self._image is not None
+
+    @property
+    def image(self) -> Image.Image:
+        """
+        :return: The Pillow image, opened on first access.
+        """
+        if self._image is None:
+            with self._lock:
+                if self._image is None:
+                    self._image = open_image(self.data)
+
+        return self._image
+
+    def to_bytes(self) -> bytes:
+        """
+        :return: The image's encoded bytes.
+        """
+        return self.data if isinstance(self.data, bytes) else self.data[:]
+
+    def save_raw(self, fp):
+        """
+        Writes the encoded image as it was downloaded, without decoding it.
+        :param fp: Path or binary file object to write to.
+        :return: None
+        """
+        if hasattr(fp, "write"):
+            fp.write(memoryview(self.data))
+            return
+
+        with open(fp, "wb") as f:
+            f.write(memoryview(self.data))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __bytes__(self):
+        return self.to_bytes()
+
+    def __getattr__(self, name):
+        # Only called for attributes LazyImage doesn't have itself.
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return getattr(self.image, name)
+
+    def __repr__(self):
+        return f"<LazyImage {len(self.data)} bytes{' decoded' if self.decoded else ''}>"
+
+
+MediaOutput = Image.Image | bytes | memoryview | LazyImage
+
+
+def render_media(data: bytes | mmap.mmap, output: str = "image") -> MediaOutput:
+    """
+    Turns downloaded image data into what a media loader was asked to return.
+    :param data: The image's bytes, or a memory map of them from the image cache. A memory map is closed here once
+    it's copied for "bytes", the other outputs read from it and keep it open until they're garbage collected.
+    :param output: "image" for a Pillow image, "bytes" for the encoded bytes, "memoryview" for a memoryview over them
+    that doesn't copy, or "lazy" for a LazyImage.
+    :return: The image in the requested form.
+    """
+    if output == "image":
+        return open_image(data)
+    if output == "bytes":
+        if isinstance(data, bytes):
+            return data
+
+        with data:
+            return data[:]
+    if output == "memoryview":
+        return memoryview(data)
+    if output == "lazy":
+        return LazyImage(data)
+
+    raise ValueError(f"Unknown media output \"{output}\", expected one of {', '.join(OUTPUTS)}.")
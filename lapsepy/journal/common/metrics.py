@@ -0,0 +1,228 @@
+import bisect
+import math
+import threading
+
+from typing import Iterable
+
+from .tracing import RequestTrace
+
+# Upper bounds of the latency histogram buckets, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 3, 5, 7.5, 10, 30, 60)
+
+
+class OperationStats:
+    """
+    Counters and latency histogram of a single GraphQL operation.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        :param buckets: Sorted upper bounds of the latency histogram buckets, in seconds.
+        """
+        self.buckets = buckets
+        # One count per bucket, plus one for everything above the last bound.
+        self.bucket_counts = [0] * (len(buckets) + 1)
+
+        self.count = 0
+        self.errors = 0
+        self.duration_sum = 0.0
+        self.duration_max = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def record(self, trace: RequestTrace):
+        duration = trace.duration or 0.0
+
+        self.count += 1
+        if trace.error is not None:
+            self.errors += 1
+
+        self.duration_sum += duration
+        self.duration_max = max(self.duration_max, duration)
+        self.bucket_counts[bisect.bisect_left(self.buckets, duration)] += 1
+
+        self.bytes_sent += trace.bytes_sent
+        self.bytes_received += trace.bytes_received
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Estimates a latency quantile from the histogram, interpolating linearly inside the bucket it falls in.
+        :param q: Quantile to estimate, from 0 to 1.
+        :return: Estimated latency in seconds, None if nothing was recorded.
+        """
+        if self.count == 0:
+            return None
+
+        rank = q * self.count
+        cumulative = 0
+
+        for i, bucket_count in enumerate(self.bucket_counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.duration_max
+
+                # The slowest request bounds every bucket from above.
+                upper = min(upper, self.duration_max)
+                lower = min(lower, upper)
+
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+
+            cumulative += bucket_count
+
+        return self.duration_max
+
+    def merge(self, other: "OperationStats"):
+        """
+        Adds another OperationStats' counts to this one, both need the same buckets.
+        :return: None
+        """
+        self.count += other.count
+        self.errors += other.errors
+        self.duration_sum += other.duration_sum
+        self.duration_max = max(self.duration_max, other.duration_max)
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        self.bucket_counts = [a + b for a, b in zip(self.bucket_counts, other.bucket_counts)]
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "latency": {
+                "mean": self.duration_sum / self.count if self.count else None,
+                "p50": self.quantile(0.5),
+                "p95": self.quantile(0.95),
+                "p99": self.quantile(0.99),
+                "max": self.duration_max if self.count else None,
+                "sum": self.duration_sum
+            },
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "mean_bytes_sent": self.bytes_sent / self.count if self.count else None,
+            "mean_bytes_received": self.bytes_received / self.count if self.count else None
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process metrics of the GraphQL calls made by a Journal, keyed by operation name.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        :param buckets: Sorted upper bounds of the latency histogram buckets, in seconds.
+        """
+        self.buckets = tuple(buckets)
+        self._operations: dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, trace: RequestTrace):
+        """
+        Adds a finished request to its operation's metrics.
+        :param trace: Trace of the request.
+        :return: None
+        """
+        operation_name = trace.operation_name or "unknown"
+
+        with self._lock:
+            stats = self._operations.get(operation_name)
+            if stats is None:
+                stats = self._operations[operation_name] = OperationStats(self.buckets)
+
+            stats.record(trace)
+
+    def operations(self) -> dict[str, OperationStats]:
+        """
+        :return: Copy of the metrics of every operation, keyed by operation name.
+        """
+        with self._lock:
+            copies = {}
+            for operation_name, stats in self._operations.items():
+                copies[operation_name] = OperationStats(self.buckets)
+                copies[operation_name].merge(stats)
+            return copies
+
+    def total(self) -> OperationStats:
+        """
+        :return: Metrics of every operation combined.
+        """
+        total = OperationStats(self.buckets)
+        for stats in self.operations().values():
+            total.merge(stats)
+        return total
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+
+    def to_dict(self) -> dict:
+        """
+        :return: dict of every operation's metrics keyed by operation name, see OperationStats.to_dict.
+        """
+        return {operation_name: stats.to_dict() for operation_name, stats in sorted(self.operations().items())}
+
+    def to_prometheus(self, prefix: str = "lapsepy", labels: dict | None = None) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+        :param prefix: Prefix of the metric names.
+        :param labels: Extra labels to add to every sample.
+        :return: The metrics as text.
+        """
+        return render_prometheus([(labels or {}, self)], prefix=prefix)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace("\"", "\\\"")
+
+
+def _format_labels(labels: dict) -> str:
+    return "{" + ",".join(f"{k}=\"{_escape_label(v)}\"" for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(registries: Iterable[tuple[dict, MetricsRegistry]], prefix: str = "lapsepy") -> str:
+    """
+    Renders several registries in the Prometheus text exposition format, telling them apart by their labels.
+    :param registries: (labels, registry) pairs.
+    :param prefix: Prefix of the metric names.
+    :return: The metrics as text.
+    """
+    counters = [
+        ("requests_total", "GraphQL requests made.", lambda s: s.count),
+        ("request_errors_total", "GraphQL requests that failed.", lambda s: s.errors),
+        ("request_bytes_sent_total", "Bytes of GraphQL request bodies sent.", lambda s: s.bytes_sent),
+        ("response_bytes_received_total", "Bytes of GraphQL response bodies received.", lambda s: s.bytes_received)
+    ]
+
+    samples = [(labels, name, stats) for labels, registry in registries
+               for name, stats in sorted(registry.operations().items())]
+
+    lines = []
+    for name, description, value in counters:
+        lines.append(f"# HELP {prefix}_{name} {description}")
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        for labels, operation_name, stats in samples:
+            sample_labels = _format_labels({**labels, "operation": operation_name})
+            lines.append(f"{prefix}_{name}{sample_labels} {value(stats)}")
+
+    histogram = f"{prefix}_request_duration_seconds"
+    lines.append(f"# HELP {histogram} Latency of GraphQL requests.")
+    lines.append(f"# TYPE {histogram} histogram")
+    for labels, operation_name, stats in samples:
+        operation_labels = {**labels, "operation": operation_name}
+
+        cumulative = 0
+        for bound, bucket_count in zip(stats.buckets + (math.inf,), stats.bucket_counts):
+            cumulative += bucket_count
+            bucket_labels = _format_labels({**operation_labels, "le": _format_value(bound)})
+            lines.append(f"{histogram}_bucket{bucket_labels} {cumulative}")
+
+        lines.append(f"{histogram}_sum{_format_labels(operation_labels)} {stats.duration_sum!r}")
+        lines.append(f"{histogram}_count{_format_labels(operation_labels)} {stats.count}")
+
+    return "\n".join(lines) + "\n"
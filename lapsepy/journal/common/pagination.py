@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import queue
+import threading
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+
+logger = logging.getLogger("lapsepy.journal.common.pagination.py")
+
+# Takes the amount of items to fetch and the cursor to start after, returns the page's items and its pageInfo.
+PageFetcher = Callable[[int, str | None], tuple[list[Any], dict]]
+
+# Same as PageFetcher, for coroutine functions.
+AsyncPageFetcher = Callable[[int, str | None], Awaitable[tuple[list[Any], dict]]]
+
+
+def walk_pages(fetch_page: PageFetcher, page_size: int = 10, limit: int | None = None,
+               prefetch: int = 0) -> Iterator[list[Any]]:
+    """
+    Lazily walks a cursor paginated connection, following pageInfo.endCursor while pageInfo.hasNextPage is set.
+    :param fetch_page: Function fetching a single page, see PageFetcher.
+    :param page_size: How many items to request per page.
+    :param limit: Maximum amount of items to fetch in total, leave as None to walk every page. The last page is
+    shrunk so no more than limit items are requested.
+    :param prefetch: How many pages to fetch ahead in the background while the caller works on the current one, 0
+    only requests a page once the previous one has been consumed.
+    :return: Generator of pages, each a list of items.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1.")
+    if prefetch < 0:
+        raise ValueError("prefetch can't be negative.")
+
+    pages = _walk_pages(fetch_page=fetch_page, page_size=page_size, limit=limit)
+
+    if prefetch:
+        pages = prefetch_pages(pages, depth=prefetch)
+
+    return pages
+
+
+def _walk_pages(fetch_page: PageFetcher, page_size: int, limit: int | None) -> Iterator[list[Any]]:
+    cursor = None
+    fetched = 0
+
+    while limit is None or fetched < limit:
+        size = page_size if limit is None else min(page_size, limit - fetched)
+
+        logger.debug(f"Fetching page of {size} after cursor {cursor}.")
+        items, page_info = fetch_page(size, cursor)
+        fetched += len(items)
+
+        if items:
+            yield items
+
+        next_cursor = (page_info or {}).get("endCursor")
+        if not (page_info or {}).get("hasNextPage") or next_cursor is None or next_cursor == cursor or not items:
+            return
+
+        cursor = next_cursor
+
+
+_END = object()
+
+
+def prefetch_pages(pages: Iterator[list[Any]], depth: int = 1) -> Iterator[list[Any]]:
+    """
+    Reads pages from a page generator on a background thread, staying up to depth pages ahead of the caller. Once
+    depth pages are waiting to be consumed the background thread stops fetching until the caller catches up, so
+    memory use stays bounded no matter how slowly the pages are processed.
+    :param pages: Page generator to read ahead of, it is only ever advanced by the background thread.
+    :param depth: Maximum amount of fetched pages not yet consumed by the caller.
+    :return: Generator of the same pages.
+    """
+    if depth < 1:
+        raise ValueError("depth must be at least 1.")
+
+    ready = queue.Queue()
+    slots = threading.Semaphore(depth)
+    stopped = threading.Event()
+
+    def producer():
+        try:
+            while True:
+                slots.acquire()
+                if stopped.is_set():
+                    return
+
+                page = next(pages, _END)
+                ready.put(page)
+
+                if page is _END:
+                    return
+        except BaseException as e:
+            ready.put(e)
+        finally:
+            pages.close()
+
+    thread = threading.Thread(target=producer, name="lapsepy-prefetch", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            page = ready.get()
+
+            if page is _END:
+                return
+            if isinstance(page, BaseException):
+                raise page
+
+            # Free a slot for the next page before handing this one to the caller.
+            slots.release()
+            yield page
+    finally:
+        stopped.set()
+        slots.release()
+
+
+def walk_items(fetch_page: PageFetcher, page_size: int = 10, limit: int | None = None,
+               prefetch: int = 0) -> Iterator[Any]:
+    """
+    Same as walk_pages, but yields the items one by one.
+    """
+    for page in walk_pages(fetch_page=fetch_page, page_size=page_size, limit=limit, prefetch=prefetch):
+        yield from page
+
+
+def walk_pages_async(fetch_page: AsyncPageFetcher, page_size: int = 10, limit: int | None = None,
+                     prefetch: int = 0) -> AsyncIterator[list[Any]]:
+    """
+    Same as walk_pages, for a coroutine function fetching the pages. Prefetched pages are fetched by a task on the
+    running event loop instead of a background thread.
+    :return: Async generator of pages, each a list of items.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1.")
+    if prefetch < 0:
+        raise ValueError("prefetch can't be negative.")
+
+    pages = _walk_pages_async(fetch_page=fetch_page, page_size=page_size, limit=limit)
+
+    if prefetch:
+        pages = prefetch_pages_async(pages, depth=prefetch)
+
+    return pages
+
+
+async def _walk_pages_async(fetch_page: AsyncPageFetcher, page_size: int,
+                            limit: int | None) -> AsyncIterator[list[Any]]:
+    cursor = None
+    fetched = 0
+
+    while limit is None or fetched < limit:
+        size = page_size if limit is None else min(page_size, limit - fetched)
+
+        logger.debug(f"Fetching page of {size} after cursor {cursor}.")
+        items, page_info = await fetch_page(size, cursor)
+        fetched += len(items)
+
+        if items:
+            yield items
+
+        next_cursor = (page_info or {}).get("endCursor")
+        if not (page_info or {}).get("hasNextPage") or next_cursor is None or next_cursor == cursor or not items:
+            return
+
+        cursor = next_cursor
+
+
+async def prefetch_pages_async(pages: AsyncIterator[list[Any]], depth: int = 1) -> AsyncIterator[list[Any]]:
+    """
+    Same as prefetch_pages, reading ahead of an async page generator with a task instead of a thread.
+    :param pages: Async page generator to read ahead of, it is only ever advanced by the task.
+    :param depth: Maximum amount of fetched pages not yet consumed by the caller.
+    :return: Async generator of the same pages.
+    """
+    if depth < 1:
+        raise ValueError("depth must be at least 1.")
+
+    ready = asyncio.Queue()
+    slots = asyncio.Semaphore(depth)
+
+    async def producer():
+        try:
+            while True:
+                await slots.acquire()
+
+                page = await anext(pages, _END)
+                ready.put_nowait(page)
+
+                if page is _END:
+                    return
+        except Exception as e:
+            ready.put_nowait(e)
+        finally:
+            await pages.aclose()
+
+    task = asyncio.create_task(producer())
+
+    try:
+        while True:
+            page = await ready.get()
+
+            if page is _END:
+                return
+            if isinstance(page, BaseException):
+                raise page
+
+            # Free a slot for the next page before handing this one to the caller.
+            slots.release()
+            yield page
+    finally:
+        task.cancel()
+
+
+async def walk_items_async(fetch_page: AsyncPageFetcher, page_size: int = 10, limit: int | None = None,
+                           prefetch: int = 0) -> AsyncIterator[Any]:
+    """
+    Same as walk_pages_async, but yields the items one by one.
+    """
+    async for page in walk_pages_async(fetch_page=fetch_page, page_size=page_size, limit=limit, prefetch=prefetch):
+        for item in page:
+            yield item
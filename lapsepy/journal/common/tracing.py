@@ -0,0 +1,141 @@
+import logging
+import random
+import threading
+import time
+
+from typing import Callable
+
+logger = logging.getLogger("lapsepy.journal.common.tracing.py")
+
+
+class RequestTrace:
+    """
+    Record of a single GraphQL request, handed to every trace hook once the request is done.
+    """
+
+    def __init__(self, operation_name: str | None, url: str, retries: int = 0):
+        """
+        :param operation_name: operationName of the query.
+        :param url: URL the request was sent to.
+        :param retries: How many attempts of the same call came before this one.
+        """
+        self.operation_name = operation_name
+        self.url = url
+        self.retries = retries
+
+        self.timestamp = time.time()
+        self.duration: float | None = None
+
+        self.status: int | None = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.error: Exception | None = None
+
+        self._start = time.perf_counter()
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def record_response(self, response):
+        """
+        Reads the status and sizes of a requests Response.
+        :param response: Response to the traced request.
+        :return: None
+        """
+        body = response.request.body
+        self.record(status=response.status_code, bytes_sent=len(body) if body else 0,
+                    bytes_received=len(response.content))
+
+    def record(self, status: int, bytes_sent: int, bytes_received: int):
+        """
+        Records the status and sizes of the traced request, for responses that didn't come from requests.
+        :param status: HTTP status of the response.
+        :param bytes_sent: Size of the request body.
+        :param bytes_received: Size of the response body.
+        :return: None
+        """
+        self.status = status
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start
+
+    def to_dict(self) -> dict:
+        return {
+            "operation_name": self.operation_name,
+            "url": self.url,
+            "timestamp": self.timestamp,
+            "duration": self.duration,
+            "status": self.status,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "retries": self.retries,
+            "error": None if self.error is None else repr(self.error)
+        }
+
+    def __repr__(self):
+        return f"<RequestTrace {self.operation_name} status={self.status} duration={self.duration}>"
+
+
+TraceHook = Callable[[RequestTrace], None]
+
+
+class Tracer:
+    """
+    Hands a RequestTrace for every sampled GraphQL request to the registered hooks. While no hooks are registered
+    nothing is recorded, so tracing costs nothing until it's turned on.
+    """
+
+    def __init__(self, sample_rate: float = 1.0):
+        """
+        :param sample_rate: Fraction of the requests to trace, from 0 to 1.
+        """
+        self.sample_rate = sample_rate
+        self.hooks: tuple[TraceHook, ...] = ()
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: TraceHook):
+        """
+        Registers a function to call with every sampled RequestTrace. Hooks run on the thread that made the request,
+        so they should be quick, exceptions raised by them are logged and ignored.
+        :param hook: Function taking a RequestTrace.
+        :return: None
+        """
+        with self._lock:
+            self.hooks = self.hooks + (hook,)
+
+    def remove_hook(self, hook: TraceHook):
+        with self._lock:
+            self.hooks = tuple(h for h in self.hooks if h is not hook)
+
+    def sample(self) -> bool:
+        """
+        :return: Whether the next request should be traced.
+        """
+        if not self.hooks:
+            return False
+
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def emit(self, trace: RequestTrace):
+        """
+        Hands a finished trace to the hooks.
+        :param trace: Trace of a request that sample chose.
+        :return: None
+        """
+        for hook in self.hooks:
+            try:
+                hook(trace)
+            except Exception as e:
+                logger.error(f"Trace hook {hook!r} failed: {e!r}")
+
+
+def log_trace(trace: RequestTrace):
+    """
+    Trace hook that logs every trace to the "lapsepy.journal.common.tracing.py" logger at debug level.
+    """
+    logger.debug(f"{trace.operation_name} status={trace.status} duration={trace.duration:.4f}s "
+                 f"sent={trace.bytes_sent}B received={trace.bytes_received}B retries={trace.retries} "
+                 f"error={trace.error!r}")
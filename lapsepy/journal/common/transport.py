@@ -0,0 +1,207 @@
+import http.cookiejar
+import logging
+import mmap
+import os
+import tempfile
+import threading
+
+from typing import BinaryIO, Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .image_cache import DiskImageCache
+
+logger = logging.getLogger("lapsepy.journal.common.transport.py")
+
+# Largest piece of a streamed download held in memory at once.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Where a streamed download can be written to: a file path, a binary file object, or a function taking each chunk.
+Sink = str | os.PathLike | BinaryIO | Callable[[bytes], object]
+
+
+def _write_chunks(chunks, sink: Sink) -> int:
+    """
+    Writes chunks of a download to a sink.
+    :param chunks: Iterable of bytes like objects.
+    :param sink: Path, binary file object, or function taking each chunk.
+    :return: Amount of bytes written.
+    """
+    written = 0
+
+    if isinstance(sink, (str, os.PathLike)):
+        # Download next to the destination first so a failed download never leaves a truncated file behind.
+        directory = os.path.dirname(os.path.abspath(sink))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    written += len(chunk)
+            os.replace(temp_path, sink)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return written
+
+    write = sink.write if hasattr(sink, "write") else sink
+    for chunk in chunks:
+        write(chunk)
+        written += len(chunk)
+
+    return written
+
+
+class Transport:
+    """
+    Pooled, keep-alive HTTP transport used for every request lapsepy makes, the GraphQL API, AWS uploads and the
+    Cloudinary image CDN all share the same connections so only the first request to a host pays for the TCP and TLS
+    handshake.
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10, max_retries: int = 0,
+                 timeout: float | None = None, pool_block: bool = False, store_cookies: bool = True,
+                 image_cache: DiskImageCache | None = None):
+        """
+        :param pool_connections: Amount of hosts to keep connection pools for.
+        :param pool_maxsize: Maximum amount of keep-alive connections to keep open per host, raise this when making
+        many concurrent requests.
+        :param max_retries: How many times to retry failed connections, this does not retry requests that got a
+        response.
+        :param timeout: Default timeout in seconds for every request, None waits forever.
+        :param pool_block: Whether to wait for a free connection when the pool is exhausted instead of opening a
+        throwaway connection.
+        :param store_cookies: Whether to keep cookies set by responses, turn this off when several accounts share the
+        Transport so one account's cookies are never sent along with another's requests.
+        :param image_cache: Disk cache for the images fetched with get_media, leave as None to always download them.
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.pool_block = pool_block
+
+        self.store_cookies = store_cookies
+        self.image_cache = image_cache
+
+        self.session = requests.Session()
+
+        if not store_cookies:
+            self.session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries,
+                              pool_block=pool_block)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @staticmethod
+    def from_options(options) -> "Transport":
+        """
+        Creates a Transport sized with the connection pool settings of an Options object.
+        :param options: BaseOptions object to read the pool settings from.
+        :return: Transport object.
+        """
+        return Transport(
+            pool_connections=options.pool_connections,
+            pool_maxsize=options.pool_maxsize,
+            max_retries=options.max_retries,
+            timeout=options.timeout,
+            pool_block=options.pool_block
+        )
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends an HTTP request over the connection pool.
+        :param method: HTTP method to use.
+        :param url: URL to send the request to.
+        :param kwargs: Extra arguments passed through to requests.
+        :return: requests Response object.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def get_media(self, url: str, key: str | None = None) -> bytes | mmap.mmap:
+        """
+        Downloads an image from the CDN, going through the image cache when there is one.
+        :param url: URL of the image.
+        :param key: Cache key of the image from media_key, leave as None to not cache it.
+        :return: The image's bytes, or a read only memory map of them when they came from the cache.
+        """
+        if self.image_cache is not None and key is not None:
+            data = self.image_cache.get(key)
+            if data is not None:
+                logger.debug(f"Got \"{url}\" from the image cache.")
+                return data
+
+        request = self.get(url)
+        request.raise_for_status()
+
+        if self.image_cache is not None and key is not None:
+            self.image_cache.set(key, request.content)
+
+        return request.content
+
+    def stream(self, url: str, sink: Sink, chunk_size: int = DEFAULT_CHUNK_SIZE, key: str | None = None) -> int:
+        """
+        Downloads a file straight into a sink, holding at most chunk_size bytes of it in memory at a time.
+        :param url: URL of the file.
+        :param sink: Where to write the file, a path (written atomically), a binary file object, or a function
+        called with each chunk.
+        :param chunk_size: Largest chunk to read from the connection at once.
+        :param key: Image cache key from media_key, the file is copied from the image cache when it's cached there.
+        Streamed downloads aren't added to the cache since that would need them in memory.
+        :return: Amount of bytes written to the sink.
+        """
+        if self.image_cache is not None and key is not None:
+            data = self.image_cache.get(key)
+            if data is not None:
+                logger.debug(f"Streaming \"{url}\" from the image cache.")
+                with data:
+                    return _write_chunks((data[i:i + chunk_size] for i in range(0, len(data), chunk_size)), sink)
+
+        with self.get(url, stream=True) as response:
+            response.raise_for_status()
+            return _write_chunks(response.iter_content(chunk_size=chunk_size), sink)
+
+    def close(self):
+        """
+        Closes every pooled connection.
+        :return: None
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_default_transport: Transport | None = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> Transport:
+    """
+    Gets the process wide Transport, used by structures that weren't created by a Journal.
+    :return: Transport object.
+    """
+    global _default_transport
+
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                logger.debug("Creating default transport.")
+                _default_transport = Transport()
+
+    return _default_transport
@@ -0,0 +1,109 @@
+import contextlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import BinaryIO
+
+from PIL import Image
+
+logger = logging.getLogger("lapsepy.journal.common.upload.py")
+
+# What can be uploaded as a photo: a Pillow image, JPEG bytes, a path to a JPEG file, or a binary file object of one.
+UploadSource = Image.Image | bytes | bytearray | memoryview | str | os.PathLike | BinaryIO
+
+
+def _encode(im: Image.Image) -> bytes:
+    # Module level so process pools can pickle it.
+    bytes_io = io.BytesIO()
+    im.save(bytes_io, format="jpeg")
+    return bytes_io.getvalue()
+
+
+def encode_jpeg(im: Image.Image) -> bytes:
+    """
+    Encodes a Pillow image as a JPEG.
+    :param im: Pillow image.
+    :return: JPEG bytes.
+    """
+    logger.debug("Encoding image as JPEG.")
+    return _encode(im)
+
+
+@contextlib.contextmanager
+def open_upload(source: UploadSource):
+    """
+    Turns something to upload into a request body. Bytes are sent as they are, files are streamed from disk instead of
+    being read into memory, and only Pillow images get encoded.
+    :param source: Pillow image, JPEG bytes, path to a JPEG file, or binary file object of one.
+    :return: Context manager giving the body to send, files it opened are closed when it exits.
+    """
+    if isinstance(source, Image.Image):
+        yield encode_jpeg(source)
+    elif isinstance(source, bytes):
+        yield source
+    elif isinstance(source, (bytearray, memoryview)):
+        # requests would send these as chunked iterables of ints.
+        yield bytes(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield f
+    elif hasattr(source, "read"):
+        yield source
+    else:
+        raise TypeError(f"Can't upload {type(source).__name__}, expected a Pillow image, bytes, a path, or a binary "
+                        f"file object.")
+
+
+class EncodePool:
+    """
+    Encodes Pillow images as JPEGs in worker processes, so encoding many images isn't limited to one core. The
+    processes are only started once the first image is submitted, which can be from any thread, so they're never
+    forked from the calling process: they're started by a fork server where one is available and spawned otherwise.
+    """
+
+    def __init__(self, processes: int | None = None):
+        """
+        :param processes: Amount of worker processes, None uses one per CPU and 0 encodes in the calling thread.
+        """
+        self.processes = processes
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, im: Image.Image) -> Future:
+        """
+        Starts encoding an image.
+        :param im: Pillow image.
+        :return: Future of the JPEG bytes.
+        """
+        if self.processes == 0:
+            future = Future()
+            future.set_result(encode_jpeg(im))
+            return future
+
+        with self._lock:
+            if self._executor is None:
+                logger.debug("Starting JPEG encoding processes.")
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._executor = ProcessPoolExecutor(max_workers=self.processes,
+                                                     mp_context=multiprocessing.get_context(method))
+            return self._executor.submit(_encode, im)
+
+    def close(self):
+        """
+        Stops the worker processes, images still waiting to be encoded are cancelled.
+        :return: None
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
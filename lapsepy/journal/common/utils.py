@@ -1,4 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
 
 
 def format_iso_time(dt: datetime) -> str:
@@ -8,3 +11,35 @@ def format_iso_time(dt: datetime) -> str:
     :return: Formatted datetime object.
     """
     return dt.isoformat()[:-3] + "Z"
+
+
+def pack_time(dt: datetime | None) -> int | datetime | None:
+    """
+    Packs a datetime into an int, which takes less memory than the datetime. The int is the microseconds since the
+    epoch shifted left once, with the lowest bit set for UTC datetimes and clear for naive ones.
+    :param dt: Naive or UTC datetime. Anything else, like datetimes in other timezones, is returned as it is.
+    :return: The packed datetime, see unpack_time.
+    """
+    if type(dt) is not datetime:
+        return dt
+
+    if dt.tzinfo is None:
+        utc = 0
+    elif dt.tzinfo is timezone.utc:
+        utc = 1
+    else:
+        return dt
+
+    return (dt.replace(tzinfo=None) - _EPOCH) // _MICROSECOND << 1 | utc
+
+
+def unpack_time(value: int | datetime | None) -> datetime | None:
+    """
+    :param value: Value from pack_time.
+    :return: A datetime equal to the one that was packed.
+    """
+    if type(value) is not int:
+        return value
+
+    dt = _EPOCH + timedelta(microseconds=value >> 1)
+    return dt.replace(tzinfo=timezone.utc) if value & 1 else dt
@@ -2,25 +2,55 @@
 Author: Quintin Dunn
 Date: 11/23/23
 """
-from lapsepy.journal.factory.factory import BaseGQL
+from lapsepy.journal.factory.factory import BaseGQL, check_query_profile
+
+# Query profiles pick how much of each album item a query asks for, see friends_factory.
+
+ALBUM_MEDIA_FULL_QUERY = (
+    "query AlbumMediaGraphQLQuery($id: ID!, $first: Int, $after: String, $last: Int, $before: String) { album(id: "
+    "$id) { __typename id media(first: $first, after: $after, last: $last, before: $before) { __typename totalCount "
+    "edges { __typename cursor node { __typename ...AlbumMediaDetails } } pageInfo { __typename startCursor endCursor "
+    "hasNextPage hasPreviousPage } } } }\nfragment AlbumMediaDetails on AlbumMedia { __typename addedAt { __typename "
+    "isoString } media { __typename ...CoreMediaFragment } }\nfragment CoreMediaFragment on Media { __typename id "
+    "takenAt { __typename isoString } takenBy { __typename ...CoreProfileFragment } deletedAt { __typename isoString "
+    "} }\nfragment CoreProfileFragment on Profile { __typename id displayName profilePhotoName username friendStatus "
+    "isBlocked blockedMe hashedPhoneNumber joinedAt { __typename isoString } }"
+)
+
+# The fields AlbumMedia objects are made from.
+ALBUM_MEDIA_MEDIA_QUERY = (
+    "query AlbumMediaGraphQLQuery($id: ID!, $first: Int, $after: String, $last: Int, $before: String) { album(id: "
+    "$id) { id media(first: $first, after: $after, last: $last, before: $before) { edges { cursor node { addedAt { "
+    "isoString } media { id takenAt { isoString } takenBy { id } } } } pageInfo { endCursor hasNextPage } } } }"
+)
+
+# Just enough to page through the album and load its media, without who took them.
+ALBUM_MEDIA_IDS_QUERY = (
+    "query AlbumMediaGraphQLQuery($id: ID!, $first: Int, $after: String, $last: Int, $before: String) { album(id: "
+    "$id) { id media(first: $first, after: $after, last: $last, before: $before) { edges { cursor node { addedAt { "
+    "isoString } media { id takenAt { isoString } } } } pageInfo { endCursor hasNextPage } } } }"
+)
 
 
 class AlbumMediaGQL(BaseGQL):
-    def __init__(self, album_id: str, last: int):
-        super().__init__("AlbumMediaGraphQLQuery",
-                         "query AlbumMediaGraphQLQuery($id: ID!, $first: Int, $after: String, $last: Int, $before: "
-                         "String) { album(id: $id) { __typename id media(first: $first, after: $after, last: $last, "
-                         "before: $before) { __typename totalCount edges { __typename cursor node { __typename "
-                         "...AlbumMediaDetails } } pageInfo { __typename startCursor endCursor hasNextPage "
-                         "hasPreviousPage } } } }\nfragment AlbumMediaDetails on AlbumMedia { __typename addedAt { "
-                         "__typename isoString } media { __typename ...CoreMediaFragment } }\nfragment "
-                         "CoreMediaFragment on Media { __typename id takenAt { __typename isoString } takenBy { "
-                         "__typename ...CoreProfileFragment } deletedAt { __typename isoString } }\nfragment "
-                         "CoreProfileFragment on Profile { __typename id displayName profilePhotoName username "
-                         "friendStatus isBlocked blockedMe hashedPhoneNumber joinedAt { __typename isoString } }")
+    QUERIES = {
+        "full": ALBUM_MEDIA_FULL_QUERY,
+        "media-only": ALBUM_MEDIA_MEDIA_QUERY,
+        "ids-only": ALBUM_MEDIA_IDS_QUERY
+    }
+
+    def __init__(self, album_id: str, last: int | None, first: int | None = None, after: str | None = None,
+                 before: str | None = None, profile: str = "full"):
+        check_query_profile(profile)
+        self.profile = profile
+
+        super().__init__("AlbumMediaGraphQLQuery", self.QUERIES[profile])
 
         self.album_id = album_id
         self.last = last
+        self.first = first
+        self.after = after
+        self.before = before
 
         self.variables = {}
 
@@ -31,3 +61,10 @@ class AlbumMediaGQL(BaseGQL):
             "id": self.album_id,
             "last": self.last
         }
+
+        if self.first is not None:
+            self.variables["first"] = self.first
+        if self.after is not None:
+            self.variables["after"] = self.after
+        if self.before is not None:
+            self.variables["before"] = self.before
@@ -0,0 +1,199 @@
+import re
+
+from .factory import BaseGQL
+
+import logging
+
+logger = logging.getLogger("lapsepy.journal.factory.batch_factory.py")
+
+_HEADER = re.compile(r"^\s*(query|mutation|subscription)\b\s*(\w+)?\s*(\(.*\))?\s*$", re.DOTALL)
+_VARIABLE = re.compile(r"\$(\w+)")
+_NAME = re.compile(r"[_A-Za-z]\w*")
+_FRAGMENT = re.compile(r"fragment\s+(\w+)")
+
+
+def _skip_balanced(text: str, start: int) -> int:
+    """
+    :param text: Text to scan.
+    :param start: Index of an opening "(" or "{".
+    :return: Index just past the matching closing bracket.
+    """
+    opening = text[start]
+    closing = ")" if opening == "(" else "}"
+    depth = 0
+    in_string = False
+
+    i = start
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if char == "\\":
+                i += 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == opening:
+            depth += 1
+        elif char == closing:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+
+    raise ValueError(f"Unbalanced \"{opening}\" in GraphQL document.")
+
+
+def split_document(query: str) -> tuple[str, str, str | None, str, str]:
+    """
+    Splits a single operation GraphQL document into its parts.
+    :param query: GraphQL document.
+    :return: The operation type, operation name, variable definitions, top level selections, and any fragment
+    definitions following the operation.
+    """
+    body_start = query.index("{")
+    body_end = _skip_balanced(query, body_start)
+
+    header = _HEADER.match(query[:body_start])
+    if header is None:
+        raise ValueError(f"Can't parse GraphQL operation header \"{query[:body_start]}\".")
+
+    operation_type, operation_name, variables = header.groups()
+    return operation_type, operation_name, variables, query[body_start + 1:body_end - 1], query[body_end:]
+
+
+def alias_selections(selections: str, prefix: str) -> str:
+    """
+    Prefixes the alias of every top level field in a selection set, giving fields without an alias one.
+    :param selections: Top level selections, without the surrounding braces.
+    :param prefix: Prefix to add to every alias.
+    :return: The aliased selections.
+    """
+    aliased = []
+    i = 0
+
+    while i < len(selections):
+        if selections[i] in " \t\r\n,":
+            aliased.append(selections[i])
+            i += 1
+            continue
+
+        if selections.startswith("...", i):
+            raise ValueError("Fragment spreads on the root operation type can't be batched.")
+
+        name = _NAME.match(selections, i)
+        if name is None:
+            raise ValueError(f"Unexpected \"{selections[i]}\" in GraphQL selection set.")
+        i = name.end()
+
+        # "alias: field", keep the field and replace the alias.
+        alias = name.group()
+        rest = selections[i:].lstrip()
+        if rest.startswith(":"):
+            i = len(selections) - len(rest) + 1
+            while selections[i] in " \t\r\n":
+                i += 1
+            name = _NAME.match(selections, i)
+            i = name.end()
+
+        start = i
+        while i < len(selections) and selections[i] in " \t\r\n":
+            i += 1
+        if i < len(selections) and selections[i] == "(":
+            i = _skip_balanced(selections, i)
+        while i < len(selections) and selections[i] in " \t\r\n":
+            i += 1
+        if i < len(selections) and selections[i] == "{":
+            i = _skip_balanced(selections, i)
+
+        aliased.append(f"{prefix}{alias}: {name.group()}{selections[start:i]}")
+
+    return "".join(aliased)
+
+
+class BatchGQL(BaseGQL):
+    """
+    Merges several operations of the same type into a single GraphQL document. Each operation's top level fields get
+    aliased and its variables renamed with a "b<index>_" prefix so they can't collide, then split_response hands every
+    operation back its own part of the response.
+    """
+    # Every batch is its own document.
+    keep_query_hash = False
+
+    def __init__(self, operations: list[BaseGQL]):
+        """
+        :param operations: Operations to merge, all queries or all mutations.
+        """
+        if not operations:
+            raise ValueError("Can't batch an empty list of operations.")
+
+        self.operations = operations
+        self.prefixes = [f"b{i}_" for i in range(len(operations))]
+
+        operation_types = set()
+        definitions = []
+        selections = []
+        fragments = {}
+        variables = {}
+
+        for operation, prefix in zip(operations, self.prefixes):
+            operation_type, _, op_definitions, op_selections, op_fragments = split_document(operation.query)
+            operation_types.add(operation_type)
+
+            if op_definitions:
+                definitions.append(_VARIABLE.sub(rf"${prefix}\1", op_definitions[1:-1]))
+            selections.append(alias_selections(_VARIABLE.sub(rf"${prefix}\1", op_selections), prefix))
+
+            # Operations built by the same factory share fragments, only include each of them once.
+            for fragment in re.split(r"\n(?=fragment\s)", op_fragments.strip()):
+                fragment_name = _FRAGMENT.match(fragment)
+                if fragment_name is None:
+                    continue
+                if fragments.setdefault(fragment_name.group(1), fragment) != fragment:
+                    raise ValueError(f"Conflicting definitions of fragment {fragment_name.group(1)}.")
+
+            for name, value in (operation.variables or {}).items():
+                variables[prefix + name] = value
+
+        if len(operation_types) > 1:
+            raise ValueError("Can't batch queries and mutations in the same document.")
+
+        operation_type = operation_types.pop()
+        operation_name = f"Batch{operation_type.capitalize()}"
+
+        query = operation_type + " " + operation_name
+        if definitions:
+            query += "(" + ", ".join(definitions) + ")"
+        query += " { " + " ".join(selection.strip() for selection in selections) + " }"
+        for fragment in fragments.values():
+            query += "\n" + fragment
+
+        super().__init__(operation_name, query)
+        self.variables = variables
+
+    def split_response(self, response: dict) -> list[dict]:
+        """
+        Splits the response to the merged document into one response per operation.
+        :param response: Response from the API.
+        :return: List of responses, in the same order as the operations. Errors without a path apply to the whole
+        document, so they're given to every operation.
+        """
+        data = response.get("data") or {}
+        responses = [{"data": {}} for _ in self.operations]
+
+        for alias, value in data.items():
+            for prefix, op_response in zip(self.prefixes, responses):
+                if alias.startswith(prefix):
+                    op_response["data"][alias[len(prefix):]] = value
+                    break
+
+        for error in response.get("errors", []):
+            path = error.get("path") or []
+            for prefix, op_response in zip(self.prefixes, responses):
+                if not path or str(path[0]).startswith(prefix):
+                    op_error = dict(error)
+                    if path:
+                        op_error["path"] = [path[0][len(prefix):]] + path[1:]
+                    op_response.setdefault("errors", []).append(op_error)
+
+        return responses
@@ -5,19 +5,75 @@ Date: 10/22/23
 
 from datetime import datetime, timedelta
 
+import hashlib
 import logging
 logger = logging.getLogger("lapsepy.journal.factory.py")
 
+# How much of each item the factories that support query profiles ask for, from everything the Lapse app asks for
+# to only what lapsepy's parsers read.
+QUERY_PROFILES = ("full", "media-only", "ids-only")
+
+
+def check_query_profile(profile: str):
+    """
+    :param profile: Query profile to check.
+    :return: None
+    """
+    if profile not in QUERY_PROFILES:
+        raise ValueError(f"Unknown query profile \"{profile}\", expected one of {', '.join(QUERY_PROFILES)}.")
+
+
+def query_hash(query: str) -> str:
+    """
+    Hashes a query document for persisted queries. The documents of the factory classes are only hashed once, when
+    the first instance using them is built, see BaseGQL.
+    :param query: GraphQL query document.
+    :return: Hex sha256 of the document.
+    """
+    sha256 = BaseGQL.query_hashes.get(query)
+    if sha256 is None:
+        sha256 = hashlib.sha256(query.encode()).hexdigest()
+    return sha256
+
+
+def persisted_query(query: dict, include_query: bool = False) -> dict:
+    """
+    Turns a query dict into an Apollo persisted query, which sends the document's hash instead of the document.
+    :param query: Query dict from BaseGQL.to_dict.
+    :param include_query: Whether to still send the document along, this registers the hash with the server.
+    :return: The persisted query dict.
+    """
+    persisted = {
+        "operationName": query.get("operationName"),
+        "variables": query.get("variables"),
+        "extensions": {"persistedQuery": {"version": 1, "sha256Hash": query_hash(query["query"])}}
+    }
+
+    if include_query:
+        persisted["query"] = query["query"]
+
+    return persisted
+
 
 class BaseGQL:
     """
     Base class for GraphQL queries.
     """
+    # Document -> sha256 of every document the factory classes send, one per class and query profile.
+    query_hashes: dict[str, str] = {}
+
+    # Whether the class sends the same few documents every time, so their hashes are worth keeping. Classes that build
+    # a new document per instance turn this off.
+    keep_query_hash = True
+
     def __init__(self, operation_name: str, query: str):
         self.variables = None
         self.operation_name = operation_name
         self.query = query
 
+        if self.keep_query_hash and query not in BaseGQL.query_hashes:
+            BaseGQL.query_hashes[query] = hashlib.sha256(query.encode()).hexdigest()
+
     def to_dict(self):
         """
         :return: The GraphQL query as a dictionary, this is what is uploaded to the API.
@@ -27,3 +83,17 @@ class BaseGQL:
             "query": self.query,
             "variables": self.variables
         }
+
+    @property
+    def query_hash(self) -> str:
+        """
+        :return: sha256 of the query document, used as its persisted query ID.
+        """
+        return query_hash(self.query)
+
+    def to_persisted_dict(self, include_query: bool = False) -> dict:
+        """
+        :param include_query: Whether to send the document along with its hash.
+        :return: The GraphQL query as an Apollo persisted query, see persisted_query.
+        """
+        return persisted_query(self.to_dict(), include_query=include_query)
@@ -95,7 +95,19 @@ class DarkroomGQL(BaseGQL):
 
 
 class SendInstantsGQL(BaseGQL):
-    def __init__(self, user_id: str, file_uuid: str, im_id: str, caption: str, time_limit: int):
+    """
+    Create the GraphQL Mutation for sending an uploaded instant to one or more users.
+    """
+
+    def __init__(self, user_id: str | list[str], file_uuid: str, im_id: str | list[str], caption: str,
+                 time_limit: int):
+        """
+        :param user_id: ID of the user to send the instant to, or a list of IDs to send it to several users.
+        :param file_uuid: UUID of the uploaded instant file, every destination shares it.
+        :param im_id: ID of the instant, or a list of IDs with one per user.
+        :param caption: Caption of the instant.
+        :param time_limit: How long the instant can be viewed for.
+        """
         super().__init__(
             operation_name="SendInstantsGraphQLMutation",
             query="mutation SendInstantsGraphQLMutation($input: SendInstantsInput!) { sendInstants(input: $input) "
@@ -108,6 +120,12 @@ class SendInstantsGQL(BaseGQL):
         self.caption = caption
         self.time_limit = time_limit
 
+        self.user_ids = [user_id] if isinstance(user_id, str) else list(user_id)
+        self.im_ids = [im_id] if isinstance(im_id, str) else list(im_id)
+
+        if len(self.user_ids) != len(self.im_ids):
+            raise ValueError("Every user needs exactly one instant ID.")
+
         self.variables = {}
 
         self._render_variables()
@@ -118,11 +136,11 @@ class SendInstantsGQL(BaseGQL):
                 {
                     "destination": {
                         "profile": {
-                            "userId": self.user_id
+                            "userId": user_id
                         }
                     },
                     "filename": f"instant/{self.file_uuid}",
-                    "id": self.im_id,
+                    "id": im_id,
                     "metadata": {
                         "caption": self.caption,
                         "frame": "ORIGINAL"
@@ -130,6 +148,7 @@ class SendInstantsGQL(BaseGQL):
                     "timeLimit": self.time_limit
 
                 }
+                for user_id, im_id in zip(self.user_ids, self.im_ids)
             ]
         }
 
@@ -3,10 +3,10 @@ Author: Quintin Dunn
 Date: 10/22/23
 """
 
-import io
 import uuid
 
-from .common.exceptions import sync_journal_exception_router, SyncJournalException, AuthTokenExpired
+from .common.exceptions import sync_journal_exception_router, SyncJournalException, AuthTokenExpired, \
+    PersistedQueryNotFound, PersistedQueryNotSupported
 
 from uuid import uuid4
 from datetime import datetime
@@ -15,6 +15,17 @@ from PIL import Image
 import requests
 
 from .common.utils import format_iso_time
+from .common.transport import Transport
+from .common.tracing import Tracer, RequestTrace
+from .common.metrics import MetricsRegistry
+from .common.cache import ResponseCache, is_mutation
+from .common.codec import JSONCodec, get_codec
+from .common.media import MediaOutput
+from .common.upload import UploadSource, EncodePool, open_upload
+from .common.bulk import BulkResult, bulk_map
+from .common.pagination import walk_items
+from .batch import Batch
+from .factory.factory import persisted_query
 from .factory.friends_factory import FriendsFeedItemsGQL, ProfileDetailsGQL, SendKudosGQL, SearchUsersGQL
 
 from .factory.media_factory import ImageUploadURLGQL, CreateMediaGQL, SendInstantsGQL, StatusUpdateGQL, \
@@ -27,12 +38,19 @@ from lapsepy.journal.factory.profile_factory import SaveBioGQL, SaveDisplayNameG
 from lapsepy.journal.factory.album_factory import AlbumMediaGQL
 
 from .structures import Snap, Profile, ProfileMusic, FriendsFeed, FriendNode, DarkRoomMedia, ReviewMediaPartition, \
-    SearchUser, Album, AlbumMedia, BaseOptions, Options
+    SearchUser, Album, AlbumMedia, BaseOptions, Options, LazyFriendsFeed, LazyFriendNode, LazyProfile
 
+import hashlib
 import logging
+from typing import Iterable, Iterator
 
 logger = logging.getLogger("lapsepy.journal.journal.py")
 
+# Headers of the image uploads to AWS.
+AWS_HEADERS = {
+    "User-Agent": "Lapse/20651 CFNetwork/1408.0.4 Darwin/22.5.0"
+}
+
 
 def parse_iso_time(iso_str: str) -> datetime:
     iso_str = iso_str.removesuffix("Z")
@@ -44,7 +62,11 @@ def parse_iso_time(iso_str: str) -> datetime:
 
 
 class Journal:
-    def __init__(self, authorization: str, refresher, options: BaseOptions | None = None):
+    def __init__(self, authorization: str, refresher, options: BaseOptions | None = None,
+                 transport: Transport | None = None, tracer: Tracer | None = None,
+                 metrics: MetricsRegistry | None = None, cache: ResponseCache | None = None,
+                 codec: JSONCodec | None = None, persisted_queries: bool = False, lazy_structures: bool = False,
+                 account: str | None = None):
         self.request_url = "https://sync-service.production.journal-api.lapse.app/graphql"
         self.refresher = refresher
         self.auth_token = authorization
@@ -54,75 +76,235 @@ class Journal:
 
         self.options = options
 
-    def _sync_journal_call(self, query: dict, reauth=True) -> dict:
+        # Connection pool shared by the GraphQL API, AWS uploads, and the structures' media loaders.
+        if transport is None:
+            transport = Transport.from_options(options)
+
+        self.transport = transport
+
+        # Hooks called with a RequestTrace for every sampled GraphQL call, tracing is off until a hook is added.
+        if tracer is None:
+            tracer = Tracer()
+
+        self.tracer = tracer
+
+        # Per operation counts, latencies, and sizes of the GraphQL calls, set to None to stop collecting them.
+        if metrics is None:
+            metrics = MetricsRegistry()
+
+        self.metrics = metrics
+
+        # Opt-in cache of read only query responses, it can be shared by several Journals.
+        self.cache = cache
+
+        # Identifies the authenticated account in the cache, Lapse passes a hash of its refresh token.
+        self.account = account
+
+        # JSON serializer and parser of the GraphQL calls, orjson or msgspec when they're installed.
+        if codec is None:
+            codec = get_codec()
+
+        self.codec = codec
+
+        # Whether to send Apollo persisted query hashes instead of the query documents, turned off by itself if the
+        # server doesn't support them.
+        self.persisted_queries = persisted_queries
+
+        # Whether to return structures that wrap the response dicts and only decode the fields that are read.
+        self.lazy_structures = lazy_structures
+
+    def _sync_journal_call(self, query: dict, reauth=True, raise_errors=True, retries: int = 0,
+                           send_document: bool = False) -> dict:
         """
         Makes an API call to "https://sync-service.production.journal-api.lapse.app/graphql" with an arbitrary query.
         :param query: The query to send to the API.
+        :param reauth: Whether to refresh the auth token and retry once if it expired.
+        :param raise_errors: Whether to raise the first GraphQL error in the response, set to False to get the errors
+        back in the response instead. An expired auth token is still handled either way.
+        :param retries: How many attempts of this call were already made, only used for tracing.
+        :param send_document: Whether to send the query document along with its persisted query hash, used when the
+        server didn't know the hash.
         :return: dict of the HTTP response.
         """
 
         logger.debug(f"Making request to {self.request_url}")
 
-        operation = query.get("operationName")
-        headers = self.options.to_headers(operation_name=operation, authorization_token=self.auth_token)
+        cache_key, cached = self._cached_response(query)
+        if cached is not None:
+            return cached
 
-        request = requests.post(self.request_url, headers=headers, json=query)
+        auth_token = self.auth_token
 
-        print(request.request.headers)
+        sampled = self.tracer.sample()
+        trace = None
+        if sampled or self.metrics is not None:
+            trace = RequestTrace(operation_name=query.get("operationName"), url=self.request_url, retries=retries)
 
-        # Check for exceptions raised while making request, none of these are handled.
-        try:
-            request.raise_for_status()
-        except requests.exceptions.HTTPError:
-            raise requests.exceptions.HTTPError(request.text)
+        error = None
 
-        # Check for errors in response
-        errors = request.json().get("errors", [])
+        try:
+            headers, body = self._encode_call(query, auth_token=auth_token, send_document=send_document)
+            request = self.transport.post(self.request_url, headers=headers, data=body)
 
-        if len(errors) > 0:
-            # There is an error, route it and raise the appropriate error.
-            logger.error(f"Got error from request to {self.request_url} with query {query}.")
+            if trace is not None:
+                trace.record_response(request)
 
+            # Check for exceptions raised while making request, none of these are handled.
             try:
-                raise sync_journal_exception_router(error=errors[0])
-            except AuthTokenExpired:
-                # If the error is related to the AuthToken being expired, retry once.
-                if reauth:
+                request.raise_for_status()
+            except requests.exceptions.HTTPError:
+                raise requests.exceptions.HTTPError(request.text)
+
+            response, error = self._decode_call(request.content)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._finish_call(query, trace=trace, sampled=sampled, error=error, cache_key=cache_key)
+
+        if cache_key is not None and error is None:
+            self.cache.set(cache_key, request.content)
+
+        if error is not None:
+            retry = self._retry_call(error, reauth=reauth, send_document=send_document)
+            if retry is not None:
+                # Another thread may have swapped in a new token while this request was in flight.
+                if isinstance(error, AuthTokenExpired) and self.auth_token == auth_token:
                     self.refresher()
 
-                    logger.debug("Auth token expired, retrying.")
-                    return self._sync_journal_call(query=query, reauth=False)
-                else:
-                    # Already retried it once, raise a real exception that won't be automatically caught.
-                    raise sync_journal_exception_router(error=errors[0])
+                return self._sync_journal_call(query=query, raise_errors=raise_errors, retries=retries + 1, **retry)
+
+            if raise_errors or isinstance(error, AuthTokenExpired):
+                # An expired token that was already retried once is always raised, it affects the whole request.
+                logger.error(f"Got error from request to {self.request_url} with query {query}.")
+                raise error
 
         # Return the data from the API call.
-        return request.json()
+        return response
 
-    @staticmethod
-    def _upload_image_to_aws(im: Image, upload_url: str):
+    def _cached_response(self, query: dict) -> tuple[str | None, dict | None]:
+        """
+        Looks a query up in the response cache.
+        :param query: The query about to be sent.
+        :return: The query's cache key, None when it isn't cached, and its cached response if there is one.
+        """
+        if self.cache is None:
+            return None, None
+
+        cache_key = self.cache.make_key(self.cache_account, query)
+        if cache_key is None:
+            return None, None
+
+        body = self.cache.get(cache_key)
+        if body is None:
+            return cache_key, None
+
+        logger.debug(f"Using cached response to {query.get('operationName')}.")
+        return cache_key, self.codec.loads(body)
+
+    def _encode_call(self, query: dict, auth_token: str | None, send_document: bool = False) -> tuple[dict, bytes]:
+        """
+        Builds the headers and body of a GraphQL call.
+        :param query: The query to send.
+        :param auth_token: Access token to send it with.
+        :param send_document: See _sync_journal_call.
+        :return: The headers and the serialized body.
+        """
+        headers = self.options.to_headers(operation_name=query.get("operationName"), authorization_token=auth_token)
+        headers["content-type"] = "application/json"
+
+        body = query
+        if self.persisted_queries and query.get("query"):
+            body = persisted_query(query, include_query=send_document)
+
+        return headers, self.codec.dumps(body)
+
+    def _decode_call(self, content: bytes) -> tuple[dict, Exception | None]:
+        """
+        Parses the body of a GraphQL response, it's only parsed this once.
+        :param content: Body of the response.
+        :return: The response, and the error its first GraphQL error was routed to if it has any.
+        """
+        response = self.codec.loads(content)
+        errors = response.get("errors", [])
+
+        if len(errors) > 0:
+            # There is an error, route it to the appropriate exception.
+            return response, sync_journal_exception_router(error=errors[0])
+
+        return response, None
+
+    def _finish_call(self, query: dict, trace: RequestTrace | None, sampled: bool, error: Exception | None,
+                     cache_key: str | None):
+        """
+        Hands a finished call's trace to the metrics and trace hooks, and invalidates the cache after a mutation.
+        :return: None
+        """
+        if trace is not None:
+            trace.error = error
+            trace.finish()
+
+            if self.metrics is not None:
+                self.metrics.record(trace)
+            if sampled:
+                self.tracer.emit(trace)
+
+        if self.cache is not None and cache_key is None and is_mutation(query):
+            # The mutation may have partly gone through even if it errored or raised.
+            self.cache.on_mutation(self.cache_account, query.get("operationName"))
+
+    def _retry_call(self, error: Exception, reauth: bool, send_document: bool) -> dict | None:
+        """
+        Decides whether a call that got a GraphQL error is sent again.
+        :param error: The routed error.
+        :param reauth: Whether the call may still retry with a refreshed auth token.
+        :param send_document: Whether the call already sent its query document.
+        :return: The reauth and send_document arguments of the retry, or None to not retry. When the auth token
+        expired the caller refreshes it before retrying.
+        """
+        if isinstance(error, PersistedQueryNotFound) and not send_document:
+            # The server doesn't know the hash yet, send the document along to register it.
+            logger.debug("Persisted query not found, sending the document.")
+            return {"reauth": reauth, "send_document": True}
+
+        if isinstance(error, PersistedQueryNotSupported) and self.persisted_queries:
+            logger.debug("Persisted queries aren't supported, turning them off.")
+            self.persisted_queries = False
+            return {"reauth": reauth, "send_document": False}
+
+        if isinstance(error, AuthTokenExpired) and reauth:
+            # If the error is related to the AuthToken being expired, retry once.
+            logger.debug("Auth token expired, retrying.")
+            return {"reauth": False, "send_document": send_document}
+
+        return None
+
+    @property
+    def cache_account(self) -> str:
+        """
+        :return: Key telling this Journal's account apart in a shared ResponseCache. It's the account passed in, or
+        else a hash of the access token. Clients sharing Options or a device ID still get their own entries.
+        """
+        if self.account is not None:
+            return self.account
+
+        return hashlib.sha256(str(self.auth_token).encode()).hexdigest()
+
+    def _upload_image_to_aws(self, im: UploadSource, upload_url: str):
         """
         Uploads an image to the Lapse AWS server.
-        :param im: Image to upload to server
+        :param im: Image to upload to server, a Pillow image is encoded as a jpeg, anything else is sent as it is.
         :param upload_url: Url to upload to
         :return:
         """
-        # Save the image as a jpeg in memory, this is what will get sent to AWS.
-        logger.debug("Saving image content to buffer.")
-        bytes_io = io.BytesIO()
-        im.save(bytes_io, format="jpeg")
-        im_data = bytes_io.getvalue()
-
         # Send image to AWS server
-        aws_headers = {
-            "User-Agent": "Lapse/20651 CFNetwork/1408.0.4 Darwin/22.5.0"
-        }
-
         logger.debug("Uploading image to AWS server.")
-        aws_request = requests.put(upload_url, headers=aws_headers, data=im_data)
+        with open_upload(im) as body:
+            aws_request = self.transport.put(upload_url, headers=AWS_HEADERS, data=body)
         aws_request.raise_for_status()
 
     def refresh_authorization(self, new_token: str):
+        # Requests read the token once when they start, so swapping the reference is atomic for them.
         self.auth_token = new_token
         logger.debug("Refreshed authorization in Journal")
 
@@ -136,12 +318,13 @@ class Journal:
         query = ImageUploadURLGQL(file_uuid=file_uuid, is_instant=is_instant).to_dict()
         return self._sync_journal_call(query=query).get("data").get("imageUploadURL")
 
-    def upload_photo(self, im: Image.Image, develop_in: int, file_uuid: str | None = None,
+    def upload_photo(self, im: UploadSource, develop_in: int, file_uuid: str | None = None,
                      taken_at: datetime | None = None, color_temperature: float = 6000, exposure_value: float = 9,
                      flash: bool = False, timezone: str = "America/New_York") -> DarkRoomMedia:
         """
         Upload an image to your Lapse darkroom
-        :param im: Pillow object of the Image.
+        :param im: Pillow image, JPEG bytes, path to a JPEG file, or binary file object of one. Only Pillow images are
+        re-encoded, files are streamed from disk.
         :param develop_in: How many seconds until the Image should develop.
         :param file_uuid: UUID of the image for backend storage, leave at None unless you know what you're doing.
         :param taken_at: Datetime object of when the image was taken, can be left None to be set automatically to now.
@@ -155,32 +338,54 @@ class Journal:
         :param timezone: Timezone that lapse thinks you're using.
         :return: None
         """
+        return self._upload_photo(im=im, develop_in=develop_in, file_uuid=file_uuid, taken_at=taken_at,
+                                  color_temperature=color_temperature, exposure_value=exposure_value, flash=flash,
+                                  timezone=timezone)
+
+    def _upload_photo(self, im: UploadSource, develop_in: int, file_uuid: str | None = None,
+                      taken_at: datetime | None = None, color_temperature: float = 6000, exposure_value: float = 9,
+                      flash: bool = False, timezone: str = "America/New_York",
+                      encode_pool: EncodePool | None = None) -> DarkRoomMedia:
         if file_uuid is None:
             # UUID in testing always started with "01HDBZ" with a total length of 26 chars.
             file_uuid = "01HDBZ" + str(uuid4()).upper().replace("-", "")[:20]
 
         if taken_at is None:
             taken_at = datetime.utcnow()
-        taken_at_iso = format_iso_time(taken_at)
+
+        # Start encoding in the pool so it overlaps with getting the upload url.
+        body = im
+        if encode_pool is not None and isinstance(im, Image.Image):
+            encoding = encode_pool.submit(im)
+        else:
+            encoding = None
 
         # Get AWS upload url from Lapse API.
         logger.debug("Getting AWS url from Lapse API.")
         upload_url = self.image_upload_url_call(file_uuid=file_uuid)
 
+        if encoding is not None:
+            body = encoding.result()
+
         # Upload to AWS
-        self._upload_image_to_aws(im=im, upload_url=upload_url)
+        self._upload_image_to_aws(im=body, upload_url=upload_url)
+
+        return self._register_photo(file_uuid=file_uuid, develop_in=develop_in, taken_at=taken_at,
+                                    color_temperature=color_temperature, exposure_value=exposure_value, flash=flash,
+                                    timezone=timezone, im=im if isinstance(im, Image.Image) else None)
 
+    def _register_photo(self, file_uuid: str, develop_in: int, taken_at: datetime, color_temperature: float = 6000,
+                        exposure_value: float = 9, flash: bool = False, timezone: str = "America/New_York",
+                        im: Image.Image | None = None) -> DarkRoomMedia:
+        """
+        Registers a photo that was already PUT on AWS in the darkroom, the last step of upload_photo.
+        :return: DarkRoomMedia of the photo.
+        """
         # Register image in darkroom
         logger.debug("Registering image in Lapse darkroom.")
-        query = CreateMediaGQL(
-            file_uuid=file_uuid,
-            taken_at=taken_at_iso,
-            develop_in=develop_in,
-            color_temperature=color_temperature,
-            exposure_value=exposure_value,
-            flash=flash,
-            timezone=timezone,
-        ).to_dict()
+        query = self._register_photo_query(file_uuid=file_uuid, develop_in=develop_in, taken_at=taken_at,
+                                           color_temperature=color_temperature, exposure_value=exposure_value,
+                                           flash=flash, timezone=timezone)
 
         # Create DarkRoomMedia object
         darkroom_snap = DarkRoomMedia(
@@ -188,6 +393,7 @@ class Journal:
             media_id=file_uuid,
             taken_at=taken_at,
             develop_in=develop_in,
+            transport=self.transport
         )
 
         self._sync_journal_call(query=query)
@@ -195,6 +401,19 @@ class Journal:
 
         return darkroom_snap
 
+    @staticmethod
+    def _register_photo_query(file_uuid: str, develop_in: int, taken_at: datetime, color_temperature: float,
+                              exposure_value: float, flash: bool, timezone: str) -> dict:
+        return CreateMediaGQL(
+            file_uuid=file_uuid,
+            taken_at=format_iso_time(taken_at),
+            develop_in=develop_in,
+            color_temperature=color_temperature,
+            exposure_value=exposure_value,
+            flash=flash,
+            timezone=timezone,
+        ).to_dict()
+
     def query_darkroom(self) -> list[DarkRoomMedia]:
         """
         Queries your darkroom and returns the media inside it.
@@ -203,19 +422,24 @@ class Journal:
         query = DarkroomGQL().to_dict()
         response = self._sync_journal_call(query)
 
-        darkroom_data = response.get("data", {}).get("darkroom", [])
+        yield from self._parse_darkroom(response)
 
-        for drm in darkroom_data:
+    def _parse_darkroom(self, response: dict) -> list[DarkRoomMedia]:
+        darkroom_media = []
+
+        for drm in response.get("data", {}).get("darkroom", []):
             develops_at = drm.get("developsAt", {}).get("isoString")
             media_id = drm.get("mediaId")
             taken_at = drm.get("takenAt", {}).get("isoString")
 
-            darkroom_media = DarkRoomMedia(
+            darkroom_media.append(DarkRoomMedia(
                 develop_in=develops_at,
                 media_id=media_id,
-                taken_at=taken_at
-            )
-            yield darkroom_media
+                taken_at=taken_at,
+                transport=self.transport
+            ))
+
+        return darkroom_media
 
     def review_snaps(self, archived: list["ReviewMediaPartition"] | None = None,
                      deleted: list["ReviewMediaPartition"] | None = None,
@@ -240,11 +464,12 @@ class Journal:
         if not response.get("data", {}).get("reviewMedia", {}).get("success"):
             raise SyncJournalException("Error reviewing media.")
 
-    def upload_instant(self, im: Image.Image, user_id: str, file_uuid: str | None = None, im_id: str | None = None,
+    def upload_instant(self, im: UploadSource, user_id: str, file_uuid: str | None = None, im_id: str | None = None,
                        caption: str | None = None, time_limit: int = 10):
         """
         Uploads an instant and sends it to a user
-        :param im: Pillow Image object of the image.
+        :param im: Pillow image, JPEG bytes, path to a JPEG file, or binary file object of one. Only Pillow images are
+        re-encoded, use send_instants to send one image to several users with a single encoding and upload.
         :param user_id: ID of user to send it to.
         :param file_uuid: UUID of the file, leave this to None unless you know what you're doing
         :param im_id: UUID of the instant, leave this to None unless you know what you're doing
@@ -253,21 +478,82 @@ class Journal:
         :return:
         """
 
-        if file_uuid is None:
-            # UUID in testing always started with "01HDCWT" with a total length of 26 chars.
-            file_uuid = "01HDCWT" + str(uuid4()).upper().replace("-", "")[:19]
+        self.send_instants(im=im, user_ids=[user_id], file_uuid=file_uuid, im_ids=None if im_id is None else [im_id],
+                           caption=caption, time_limit=time_limit)
 
-        if im_id is None:
-            # UUID in testing always started with "01HDCWT" with a total length of 26 chars.
-            im_id = "01HDCWT" + str(uuid4()).upper().replace("-", "")[:19]
+    def send_instants(self, im: UploadSource, user_ids: Iterable[str], file_uuid: str | None = None,
+                      im_ids: Iterable[str] | None = None, caption: str | None = None, time_limit: int = 10,
+                      max_destinations: int = 25) -> dict[str, str]:
+        """
+        Uploads an instant once and sends it to many users, every destination shares the uploaded file and they're
+        sent in as few SendInstantsGraphQLMutation calls as max_destinations allows.
+        :param im: Pillow image, JPEG bytes, path to a JPEG file, or binary file object of one. A Pillow image is only
+        encoded once for every user.
+        :param user_ids: IDs of the users to send it to, duplicates are only sent to once.
+        :param file_uuid: UUID of the file, leave this to None unless you know what you're doing
+        :param im_ids: UUIDs of the instants with one per entry of user_ids, leave this to None unless you know what
+        you're doing
+        :param caption: Caption of the instant
+        :param time_limit: How long they can view the instant for
+        :param max_destinations: Maximum amount of users sent to in a single call.
+        :return: dict of the ID of each user's instant, keyed by user ID.
+        """
+        instants, file_uuid, queries = self._instant_queries(user_ids=user_ids, file_uuid=file_uuid, im_ids=im_ids,
+                                                             caption=caption, time_limit=time_limit,
+                                                             max_destinations=max_destinations)
+        if not instants:
+            return {}
 
         upload_url = self.image_upload_url_call(file_uuid=file_uuid, is_instant=True)
 
         self._upload_image_to_aws(im=im, upload_url=upload_url)
 
-        query = SendInstantsGQL(user_id=user_id, file_uuid=file_uuid, im_id=im_id, caption=caption,
-                                time_limit=time_limit).to_dict()
-        self._sync_journal_call(query)
+        for query in queries:
+            response = self._sync_journal_call(query)
+
+            if not response.get("data", {}).get("sendInstants", {}).get("success"):
+                raise SyncJournalException("Error sending instants.")
+
+        return instants
+
+    @staticmethod
+    def _instant_queries(user_ids: Iterable[str], file_uuid: str | None, im_ids: Iterable[str] | None,
+                         caption: str | None, time_limit: int,
+                         max_destinations: int) -> tuple[dict[str, str], str, list[dict]]:
+        """
+        Builds the SendInstantsGraphQLMutation calls of send_instants.
+        :return: dict of the ID of each user's instant keyed by user ID, the UUID of the file, and the queries.
+        """
+        user_ids = list(user_ids)
+
+        if im_ids is None:
+            # UUID in testing always started with "01HDCWT" with a total length of 26 chars.
+            im_ids = ["01HDCWT" + str(uuid4()).upper().replace("-", "")[:19] for _ in user_ids]
+        else:
+            im_ids = list(im_ids)
+
+        if len(im_ids) != len(user_ids):
+            raise ValueError("im_ids needs exactly one ID per user.")
+
+        # A user listed again keeps the first ID they were given.
+        instants = {}
+        for user_id, im_id in zip(user_ids, im_ids):
+            instants.setdefault(user_id, im_id)
+        user_ids, im_ids = list(instants), list(instants.values())
+
+        if file_uuid is None:
+            # UUID in testing always started with "01HDCWT" with a total length of 26 chars.
+            file_uuid = "01HDCWT" + str(uuid4()).upper().replace("-", "")[:19]
+
+        queries = []
+        for start in range(0, len(user_ids), max_destinations):
+            end = start + max_destinations
+            logger.debug(f"Sending instant {file_uuid} to {len(user_ids[start:end])} users.")
+
+            queries.append(SendInstantsGQL(user_id=user_ids[start:end], file_uuid=file_uuid, im_id=im_ids[start:end],
+                                           caption=caption, time_limit=time_limit).to_dict())
+
+        return instants, file_uuid, queries
 
     def create_status_update(self, text: str, msg_id: str | None):
         """
@@ -313,38 +599,82 @@ class Journal:
         if not response.get("data", {}).get("sendKudos", {}).get("success"):
             raise SyncJournalException("Error sending kudos, could you already have reached your daily limit?")
 
-    def get_friends_feed(self, count: int = 10) -> FriendsFeed:
+    def _parse_friend_nodes(self, edges: list[dict]) -> list[FriendNode]:
         """
-        Gets your friend upload feed.
-        :param count: How many collection to grab.
-        :return: A list of profiles
+        Parses the edges of a friendsFeedItems response into FriendNode objects.
+        :param edges: friendsFeedItems.edges from the API.
+        :return: list of FriendNodes.
         """
-
-        # Get all the user's friends in the range.
-        query = FriendsFeedItemsGQL(last=count).to_dict()
-        response = self._sync_journal_call(query)
-
-        nodes: list[dict] = [i['node'] for i in response['data']['friendsFeedItems']['edges']]
+        nodes: list[dict] = [i['node'] for i in edges]
 
         friend_nodes = []
 
         for node in nodes:
             profile_data = node.get("user")
-            profile = Profile.from_dict(profile_data)
+            profile = Profile.from_dict(profile_data, transport=self.transport)
 
             timestamp = node.get("timestamp", {}).get("isoString")
 
-            entries = node.get("content").get("entries")
+            # Only media shares have entries, other feed items (status updates, bio updates...) don't.
+            entries = (node.get("content") or {}).get("entries") or []
 
             node_entry_objs = []
             for entry in entries:
-                snap = Snap.from_dict(entry)
+                snap = Snap.from_dict(entry, transport=self.transport)
                 node_entry_objs.append(snap)
                 profile.media.append(snap)
 
             friend_nodes.append(FriendNode(profile=profile, iso_string=timestamp, entries=node_entry_objs))
 
-        return FriendsFeed(friend_nodes)
+        return friend_nodes
+
+    def get_friends_feed(self, count: int = 10, profile: str = "full") -> FriendsFeed:
+        """
+        Gets your friend upload feed.
+        :param count: How many collection to grab.
+        :param profile: How much of each feed item to request, "full", "media-only" for just the media shares and the
+        fields their Profiles and Snaps are made from, or "ids-only" for just the sharer's ID and username and what's
+        needed to load the Snaps.
+        :return: A list of profiles
+        """
+
+        # Get all the user's friends in the range.
+        query = FriendsFeedItemsGQL(last=count, profile=profile).to_dict()
+        response = self._sync_journal_call(query)
+
+        return self._parse_friends_feed(response)
+
+    def _parse_friends_feed(self, response: dict) -> FriendsFeed:
+        edges = response['data']['friendsFeedItems']['edges']
+        if self.lazy_structures:
+            return LazyFriendsFeed(edges, transport=self.transport)
+
+        return FriendsFeed(self._parse_friend_nodes(edges))
+
+    def _parse_friends_feed_page(self, response: dict) -> tuple[list[FriendNode], dict]:
+        feed_data = response['data']['friendsFeedItems']
+        if self.lazy_structures:
+            nodes = [LazyFriendNode(edge['node'], transport=self.transport) for edge in feed_data['edges']]
+        else:
+            nodes = self._parse_friend_nodes(feed_data['edges'])
+        return nodes, feed_data.get("pageInfo", {})
+
+    def iter_friends_feed(self, page_size: int = 10, limit: int | None = None,
+                          prefetch: int = 0, profile: str = "full") -> Iterator[FriendNode]:
+        """
+        Walks your friends feed page by page, unless prefetch is set a page is only requested once the
+        previous one has been consumed.
+        :param page_size: How many feed items to request per page.
+        :param limit: Maximum amount of feed items to get, leave as None to walk the whole feed.
+        :param prefetch: How many pages to fetch ahead in the background while you process the current one.
+        :param profile: How much of each feed item to request, see get_friends_feed.
+        :return: Generator of FriendNodes.
+        """
+        def fetch_page(first: int, after: str | None) -> tuple[list[FriendNode], dict]:
+            query = FriendsFeedItemsGQL(last=None, first=first, after=after, profile=profile).to_dict()
+            return self._parse_friends_feed_page(self._sync_journal_call(query))
+
+        return walk_items(fetch_page, page_size=page_size, limit=limit, prefetch=prefetch)
 
     def get_current_user(self) -> Profile:
         """
@@ -353,17 +683,23 @@ class Journal:
         """
         query = CurrentUserGQL().to_dict()
         response = self._sync_journal_call(query)
-        pd = response.get("data", {}).get("user", {}).get("profile", {})
-        profile = Profile.from_dict(pd)
 
-        return profile
+        return self._parse_current_user(response)
+
+    def _parse_current_user(self, response: dict) -> Profile:
+        pd = response.get("data", {}).get("user", {}).get("profile", {})
+        return Profile.from_dict(pd, transport=self.transport, lazy=self.lazy_structures)
 
-    def get_profile_by_id(self, user_id: str, album_limit: int = 6, friends_limit: int = 10) -> Profile:
+    def get_profile_by_id(self, user_id: str, album_limit: int = 6, friends_limit: int = 10,
+                          profile: str = "full") -> Profile:
         """
         Get a Profile object
         :param user_id: ID the user of the profile you want to query.
         :param album_limit: Max amount of albums to get.
         :param friends_limit: Max amount of friends to get.
+        :param profile: How much of the profile to request, "full", "media-only" for the profile and its albums
+        without friends, or "ids-only" for the IDs and usernames of the profile and its friends and its albums' media
+        IDs.
         :return:
         """
         query = ProfileDetailsGQL(
@@ -371,11 +707,19 @@ class Journal:
             album_limit=album_limit,
             friends_limit=friends_limit,
             mutual_limit=1,
-            popular_limit=1
+            popular_limit=1,
+            profile=profile
         ).to_dict()
         response = self._sync_journal_call(query)
+
+        return self._parse_profile(response)
+
+    def _parse_profile(self, response: dict) -> Profile:
         pd = response.get("data", {}).get("profile", {})
 
+        if self.lazy_structures:
+            return LazyProfile(pd, transport=self.transport)
+
         def generate_profile_object(profile_data: dict) -> Profile:
             music = profile_data.get("music")
             if music is not None:
@@ -384,7 +728,8 @@ class Journal:
                     artwork_url=music.get("artworkUrl"),
                     duration=music.get("duration"),
                     song_title=music.get("songTitle"),
-                    song_url=music.get("songUrl")
+                    song_url=music.get("songUrl"),
+                    transport=self.transport
                 )
             else:
                 profile_music = None
@@ -402,36 +747,13 @@ class Journal:
                 user_id=profile_data.get('id'),
                 username=profile_data.get('username'),
                 hashed_phone_number=profile_data.get("hashedPhoneNumber"),
-                profile_music=profile_music
+                profile_music=profile_music,
+                transport=self.transport
             )
             if profile_data.get("albums"):
                 album_data = profile_data.get("albums", {}).get("edges", {})
-
-                albums = []
-
-                for album_edge in album_data:
-                    album_node = album_edge['node']
-
-                    album_media = []
-                    for media_edge in album_node.get("media", {}).get("edges", {}):
-                        node = media_edge.get("node")
-                        # added_at: datetime, media_id: str, taken_at: datetime, capturer_id: str
-                        album_media.append(AlbumMedia(
-                            added_at=parse_iso_time(node.get("addedAt", {}).get("isoString")),
-                            taken_at=parse_iso_time(node.get("addedAt", {}).get("isoString")),
-                            media_id=node.get("media", {}).get("id"),
-                            capturer_id=usr_profile.user_id
-                        ))
-
-                    albums.append(Album(
-                        album_id=album_node.get("id"),
-                        media=album_media,
-                        album_name=album_node.get("name"),
-                        visibility=album_node.get("visibility"),
-                        created_at=parse_iso_time(album_node.get("createdAt", {}).get("isoString")),
-                        updated_at=parse_iso_time(album_node.get("updatedAt", {}).get("isoString")),
-                        owner=usr_profile
-                    ))
+                albums = [Album.from_dict(album_edge['node'], owner=usr_profile, transport=self.transport)
+                          for album_edge in album_data]
 
                 usr_profile.albums = albums
 
@@ -440,7 +762,7 @@ class Journal:
         profile = generate_profile_object(pd)
 
         # Generate friend objects
-        for friend in pd.get("friends", {}).get("edges"):
+        for friend in (pd.get("friends") or {}).get("edges") or []:
             friend = generate_profile_object(friend.get("node", {}))
             profile.friends.append(friend)
 
@@ -601,9 +923,13 @@ class Journal:
         query = SearchUsersGQL(term=term, first=first).to_dict()
         response = self._sync_journal_call(query)
 
+        return self._parse_search_users(response.get("data", {}).get("searchUsers", {}).get("edges"))
+
+    @staticmethod
+    def _parse_search_users(edges: list[dict]) -> list[SearchUser]:
         users = []
 
-        for edge in response.get("data", {}).get("searchUsers", {}).get("edges"):
+        for edge in edges:
             node = edge['node']
             search_user = SearchUser(user_id=node.get("id"),
                                      display_name=node.get("displayName"),
@@ -617,6 +943,27 @@ class Journal:
 
         return users
 
+    def _parse_search_users_page(self, response: dict) -> tuple[list[SearchUser], dict]:
+        search_data = response.get("data", {}).get("searchUsers", {})
+        return self._parse_search_users(search_data.get("edges") or []), search_data.get("pageInfo", {})
+
+    def iter_search_users(self, term: str, page_size: int = 10, limit: int | None = None,
+                          prefetch: int = 0) -> Iterator[SearchUser]:
+        """
+        Walks the search results for a term page by page, unless prefetch is set a page is only requested once the
+        previous one has been consumed.
+        :param term: Term to search for
+        :param page_size: How many users to request per page.
+        :param limit: Maximum amount of users to get, leave as None to get every result.
+        :param prefetch: How many pages to fetch ahead in the background while you process the current one.
+        :return: Generator of SearchUsers.
+        """
+        def fetch_page(first: int, after: str | None) -> tuple[list[SearchUser], dict]:
+            query = SearchUsersGQL(term=term, first=first, after=after).to_dict()
+            return self._parse_search_users_page(self._sync_journal_call(query))
+
+        return walk_items(fetch_page, page_size=page_size, limit=limit, prefetch=prefetch)
+
     def block_user(self, user_id: str):
         """
         Send a user blocking API call
@@ -641,30 +988,138 @@ class Journal:
         if not response.get("data", {}).get("unblockProfile", {}).get("success"):
             raise SyncJournalException(f"Error unblocking user {user_id}.")
 
-    def get_album_by_id(self, album_id: str, last: int):
+    def get_album_by_id(self, album_id: str, last: int, profile: str = "full"):
         """
         Gets an album by its ID.
         :param album_id: ID of the album
         :param last: How many items to query from the album.
+        :param profile: How much of each item to request, "full", "media-only" for the fields AlbumMedia is made from,
+        or "ids-only" which also leaves out who took each item.
         :return:
         """
-        query = AlbumMediaGQL(album_id=album_id, last=last).to_dict()
+        query = AlbumMediaGQL(album_id=album_id, last=last, profile=profile).to_dict()
 
         response = self._sync_journal_call(query)
 
+        return self._parse_album(response, album_id=album_id)
+
+    def _parse_album(self, response: dict, album_id: str) -> Album:
         if response.get("errors"):
             raise SyncJournalException(f"Error getting album {album_id}")
 
         album_data = response.get("data", {}).get("album", {})
 
+        media = self._parse_album_media(album_data.get("media", {}).get("edges", {}))
+
+        album = Album(album_id=album_id, media=media)
+
+        return album
+
+    def _parse_album_media(self, edges: list[dict]) -> list[AlbumMedia]:
         media = []
 
-        for edge in album_data.get("media", {}).get("edges", {}):
+        for edge in edges:
             node = edge['node']
 
-            album_media = AlbumMedia.from_dict(album_data=node)
+            album_media = AlbumMedia.from_dict(album_data=node, transport=self.transport, lazy=self.lazy_structures)
             media.append(album_media)
 
-        album = Album(album_id=album_id, media=media)
+        return media
 
-        return album
+    def _parse_album_media_page(self, response: dict) -> tuple[list[AlbumMedia], dict]:
+        media_data = (response.get("data", {}).get("album") or {}).get("media", {})
+        return self._parse_album_media(media_data.get("edges") or []), media_data.get("pageInfo", {})
+
+    def iter_album_media(self, album_id: str, page_size: int = 20, limit: int | None = None,
+                         prefetch: int = 0, profile: str = "full") -> Iterator[AlbumMedia]:
+        """
+        Walks an album's media page by page, unless prefetch is set a page is only requested once the
+        previous one has been consumed.
+        :param album_id: ID of the album
+        :param page_size: How many items to request per page.
+        :param limit: Maximum amount of items to get, leave as None to walk the whole album.
+        :param prefetch: How many pages to fetch ahead in the background while you process the current one.
+        :param profile: How much of each item to request, see get_album_by_id.
+        :return: Generator of AlbumMedia.
+        """
+        def fetch_page(first: int, after: str | None) -> tuple[list[AlbumMedia], dict]:
+            query = AlbumMediaGQL(album_id=album_id, last=None, first=first, after=after, profile=profile).to_dict()
+            return self._parse_album_media_page(self._sync_journal_call(query))
+
+        return walk_items(fetch_page, page_size=page_size, limit=limit, prefetch=prefetch)
+
+    @staticmethod
+    def _load_media_item(media: Snap | AlbumMedia | DarkRoomMedia | Profile, quality: int,
+                         fl_keep_iptc: bool, output: str = "image") -> MediaOutput:
+        if isinstance(media, Snap):
+            return media.load_snap(quality=quality, fl_keep_iptc=fl_keep_iptc, output=output)
+        if isinstance(media, (AlbumMedia, DarkRoomMedia)):
+            return media.load(quality=quality, fl_keep_iptc=fl_keep_iptc, output=output)
+        if isinstance(media, Profile):
+            return media.load_profile_picture(quality=quality, output=output)
+
+        raise TypeError(f"Cannot load media of type {type(media).__name__}.")
+
+    def load_media(self, media: Iterable[Snap | AlbumMedia | DarkRoomMedia | Profile], quality: int = 65,
+                   fl_keep_iptc: bool = True, workers: int = 8, ordered: bool = False,
+                   output: str = "image") -> Iterator[BulkResult]:
+        """
+        Downloads the images of many Snaps, AlbumMedia, DarkRoomMedia, or Profiles (profile pictures) at once.
+        :param media: Media to load, this can be any iterable and is only read as workers free up.
+        :param quality: Quality of the images (1-100)
+        seek https://cloudinary.com/documentation/transformation_reference#q_quality for more information.
+        :param fl_keep_iptc: Whether to keep copyright related material seek
+        https://cloudinary.com/documentation/transformation_reference#fl_keep_attribution for more information.
+        :param workers: How many images to download at once, keep this at or below Options.pool_maxsize so every
+        download reuses a pooled connection.
+        :param ordered: Whether to yield results in the same order as media, otherwise they're yielded as they finish.
+        :param output: What to load the images as, see Snap.load_snap. Use "bytes" to skip decoding entirely.
+        :return: Generator of BulkResults, BulkResult.item is the media object and BulkResult.value its Pillow image.
+        A failed download is reported in BulkResult.error and doesn't stop the rest of the batch.
+        """
+        def load(item):
+            return self._load_media_item(item, quality=quality, fl_keep_iptc=fl_keep_iptc, output=output)
+
+        return bulk_map(load, media, workers=workers, ordered=ordered)
+
+    def upload_photos(self, images: Iterable[UploadSource], develop_in: int, workers: int = 8,
+                      encode_processes: int | None = None, ordered: bool = False, color_temperature: float = 6000,
+                      exposure_value: float = 9, flash: bool = False,
+                      timezone: str = "America/New_York") -> Iterator[BulkResult]:
+        """
+        Uploads many images to your Lapse darkroom at once. Each image goes through the same steps as upload_photo, but
+        the steps of different images overlap: while one image is being PUT on AWS, others are getting their upload
+        urls, being encoded, or being registered.
+        :param images: Images to upload, anything upload_photo takes. This can be any iterable and is only read as
+        workers free up.
+        :param develop_in: How many seconds until the images should develop.
+        :param workers: How many images to upload at once, keep this at or below Options.pool_maxsize so every request
+        reuses a pooled connection.
+        :param encode_processes: How many processes encode Pillow images, None uses one per CPU and 0 encodes on the
+        upload threads. The processes are only started if a Pillow image needs encoding.
+        :param ordered: Whether to yield results in the same order as images, otherwise they're yielded as they finish.
+        :param color_temperature: See upload_photo.
+        :param exposure_value: See upload_photo.
+        :param flash: See upload_photo.
+        :param timezone: See upload_photo.
+        :return: Generator of BulkResults, BulkResult.item is the image and BulkResult.value its DarkRoomMedia. A failed
+        upload is reported in BulkResult.error and doesn't stop the rest of the images.
+        """
+        encode_pool = EncodePool(processes=encode_processes)
+
+        def upload(im):
+            return self._upload_photo(im=im, develop_in=develop_in, color_temperature=color_temperature,
+                                      exposure_value=exposure_value, flash=flash, timezone=timezone,
+                                      encode_pool=encode_pool)
+
+        with encode_pool:
+            yield from bulk_map(upload, images, workers=workers, ordered=ordered)
+
+    def batch(self, max_operations: int = 25, raise_errors: bool = True) -> Batch:
+        """
+        Collects mutations and sends them merged into as few requests as possible, see Batch.
+        :param max_operations: Maximum amount of operations merged into a single request.
+        :param raise_errors: Whether leaving the with block raises a BatchError when any operation failed.
+        :return: Batch to use as a context manager.
+        """
+        return Batch(self, max_operations=max_operations, raise_errors=raise_errors)
@@ -3,9 +3,9 @@ Author: Quintin Dunn
 Date: 10/27/23
 """
 
-from .profile import Profile, ProfileMusic
-from .snap import Snap, DarkRoomMedia, ReviewMediaPartition
-from .friendsfeed import FriendsFeed, FriendNode
+from .profile import Profile, ProfileMusic, LazyProfile
+from .snap import Snap, DarkRoomMedia, ReviewMediaPartition, LazySnap
+from .friendsfeed import FriendsFeed, FriendNode, LazyFriendsFeed, LazyFriendNode
 from .searches import SearchUser
-from .album import Album, AlbumMedia
+from .album import Album, AlbumMedia, LazyAlbumMedia
 from .options import BaseOptions, Options
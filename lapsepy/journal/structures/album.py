@@ -1,11 +1,12 @@
 from datetime import datetime
 
-from .core import ReactableMedia
+from .core import ReactableMedia, PackedTime, LazyField
+from ..common.transport import Transport, get_default_transport, Sink, DEFAULT_CHUNK_SIZE
+from ..common.image_cache import media_key
+from ..common.media import render_media, MediaOutput
 
 from PIL import Image
 
-import io
-import requests
 import logging
 from typing import TYPE_CHECKING, Union
 
@@ -28,7 +29,13 @@ def _parse_iso_time(iso_str: str) -> datetime:
 class AlbumMedia(ReactableMedia):
     BASE_URL = "https://image.production.journal-api.lapse.app/image/upload/"
 
-    def __init__(self, added_at: datetime, media_id: str, taken_at: datetime, capturer_id: str):
+    __slots__ = ("_added_at", "_taken_at", "capturer_id", "transport", "im")
+
+    added_at = PackedTime()
+    taken_at = PackedTime()
+
+    def __init__(self, added_at: datetime, media_id: str, taken_at: datetime, capturer_id: str,
+                 transport: Transport | None = None):
         super().__init__(media_id=media_id)
 
         self.added_at: datetime = added_at
@@ -36,36 +43,69 @@ class AlbumMedia(ReactableMedia):
         self.taken_at: datetime = taken_at
         self.capturer_id: str = capturer_id
 
+        self.transport: Transport | None = transport
+
         self.im: Image.Image | None
 
-    def load(self, quality: int = 65, fl_keep_iptc: bool = True) -> Image.Image:
+    def _url(self, quality: int, fl_keep_iptc: bool) -> tuple[str, str]:
+        transformation = f"q_{quality}" + (",fl_keep_itc" if fl_keep_iptc else "")
+        return f"{self.BASE_URL}{transformation}/{self.id}.jpeg", media_key(self.id, transformation)
+
+    def load(self, quality: int = 65, fl_keep_iptc: bool = True, output: str = "image") -> MediaOutput:
         """
         Loads the filtered Snap object's image into memory by making an HTTP request to Lapse's servers.
         :param quality: Quality of the image (1-100)
         seek https://cloudinary.com/documentation/transformation_reference#q_quality for more information.
         :param fl_keep_iptc: Whether to keep copyright related material seek
         https://cloudinary.com/documentation/transformation_reference#fl_keep_attribution for more information.
+        :param output: What to return, "image" for a Pillow image, "bytes" for the encoded JPEG, "memoryview" for a
+        memoryview over it, or "lazy" for a LazyImage that's only decoded when used as an image.
 
-        :return: Pillow image.
+        :return: Pillow image, or the form picked with output.
         """
-        url = f"{self.BASE_URL}q_{quality}" + (",fl_keep_itc/" if fl_keep_iptc else "/")
-        url += f"{self.id}.jpeg"
+        url, key = self._url(quality, fl_keep_iptc)
 
         logger.debug(f"Getting image from \"{url}\"")
 
-        request = requests.get(url)
-        bytes_io = io.BytesIO(request.content)
-        image = Image.open(bytes_io)
+        data = (self.transport or get_default_transport()).get_media(url, key)
+        image = render_media(data, output)
         return image
 
+    def stream(self, sink: Sink, quality: int = 65, fl_keep_iptc: bool = True,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Downloads the image straight into a sink without holding the whole image in memory.
+        :param sink: Path, binary file object, or function called with each chunk, see Transport.stream.
+        :param quality: Quality of the image (1-100)
+        :param fl_keep_iptc: Whether to keep copyright related material.
+        :param chunk_size: Largest chunk of the image held in memory at once.
+        :return: Amount of bytes written to the sink.
+        """
+        url, key = self._url(quality, fl_keep_iptc)
+
+        logger.debug(f"Streaming image from \"{url}\"")
+
+        return (self.transport or get_default_transport()).stream(url, sink, chunk_size=chunk_size, key=key)
+
     @staticmethod
-    def from_dict(album_data: dict) -> "AlbumMedia":
+    def from_dict(album_data: dict, transport: Transport | None = None, lazy: bool = False) -> "AlbumMedia":
+        """
+        :param album_data: Album media node from the API.
+        :param transport: Transport to load the media with, leave as None to use the default one.
+        :param lazy: Whether to return a LazyAlbumMedia, which only decodes each field from album_data when it's first
+        read.
+        :return: AlbumMedia object.
+        """
+        if lazy:
+            return LazyAlbumMedia(album_data, transport=transport)
+
         media_data = album_data.get("media", {})
         return AlbumMedia(
             added_at=_parse_iso_time(album_data.get('addedAt', {}).get("isoString")),
             media_id=media_data.get("id", None),
             taken_at=_parse_iso_time(media_data.get("takenAt", {}).get("isoString", "")),
-            capturer_id=media_data.get("takenBy", {}).get("id", "")
+            capturer_id=media_data.get("takenBy", {}).get("id", ""),
+            transport=transport
         )
 
     def __str__(self):
@@ -74,6 +114,29 @@ class AlbumMedia(ReactableMedia):
     __repr__ = __str__
 
 
+class LazyAlbumMedia(AlbumMedia):
+    """
+    AlbumMedia over the raw album media node of a response, each field is decoded the first time it's read and kept
+    after that.
+    """
+    __slots__ = ("_data",)
+
+    added_at = LazyField(lambda media: _parse_iso_time(media._data.get("addedAt", {}).get("isoString")))
+    id = LazyField(lambda media: media._data.get("media", {}).get("id", None))
+    taken_at = LazyField(lambda media: _parse_iso_time(media._data.get("media", {}).get("takenAt", {})
+                                                       .get("isoString", "")))
+    capturer_id = LazyField(lambda media: media._data.get("media", {}).get("takenBy", {}).get("id", ""))
+
+    def __init__(self, album_data: dict, transport: Transport | None = None):
+        """
+        :param album_data: Album media node from the API, kept as it is until its fields are read.
+        :param transport: Transport to load the media with, leave as None to use the default one.
+        """
+        self._data = album_data
+
+        self.transport: Transport | None = transport
+
+
 class Album:
     def __init__(self, album_id, media: list[AlbumMedia], album_name: str | None = None, visibility: str | None = None,
                  created_at: datetime | None = None, updated_at: datetime = None, owner: Union["Profile", None] = None):
@@ -87,6 +150,37 @@ class Album:
 
         self.owner = owner
 
+    @staticmethod
+    def from_dict(album_data: dict, owner: Union["Profile", None] = None,
+                  transport: Transport | None = None) -> "Album":
+        """
+        Generates an Album from an album node of a profile's albums.
+        :param album_data: Album node from the API.
+        :param owner: Profile the album belongs to, its media are credited to it.
+        :param transport: Transport to load the album's media with, leave as None to use the default one.
+        :return: Album object.
+        """
+        album_media = []
+        for media_edge in album_data.get("media", {}).get("edges", {}):
+            node = media_edge.get("node")
+            album_media.append(AlbumMedia(
+                added_at=_parse_iso_time(node.get("addedAt", {}).get("isoString")),
+                taken_at=_parse_iso_time(node.get("addedAt", {}).get("isoString")),
+                media_id=node.get("media", {}).get("id"),
+                capturer_id=owner.user_id if owner is not None else None,
+                transport=transport
+            ))
+
+        return Album(
+            album_id=album_data.get("id"),
+            media=album_media,
+            album_name=album_data.get("name"),
+            visibility=album_data.get("visibility"),
+            created_at=_parse_iso_time(album_data.get("createdAt", {}).get("isoString")),
+            updated_at=_parse_iso_time(album_data.get("updatedAt", {}).get("isoString")),
+            owner=owner
+        )
+
     def __str__(self):
         return f"<Lapse album id=\"{self.album_id}\" size={len(self.media)}>"
 
@@ -1,14 +1,68 @@
 import typing
 
+from ..common.utils import pack_time, unpack_time
+
 if typing.TYPE_CHECKING:
     from lapsepy.lapse import Lapse
 
 
+class PackedTime:
+    """
+    datetime attribute that's kept packed into an int (see pack_time) in a slot named after the attribute with a
+    leading underscore, reading it gives back the datetime.
+    """
+
+    def __set_name__(self, owner, name):
+        self.slot = "_" + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return unpack_time(getattr(obj, self.slot))
+
+    def __set__(self, obj, value):
+        setattr(obj, self.slot, pack_time(value))
+
+
+class LazyField:
+    """
+    Attribute of a lazy structure that's decoded from the raw response the first time it's read, then kept where the
+    structure it extends keeps it (its slot, or the slot behind its PackedTime).
+    """
+
+    def __init__(self, decode: typing.Callable[[typing.Any], typing.Any]):
+        """
+        :param decode: Called with the lazy structure, returns the attribute's value.
+        """
+        self.decode = decode
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.field = next(vars(cls)[name] for cls in owner.__mro__[1:] if name in vars(cls))
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+
+        try:
+            return self.field.__get__(obj, objtype)
+        except AttributeError:
+            # Slots raise AttributeError until they're set.
+            value = self.decode(obj)
+            self.field.__set__(obj, value)
+            return value
+
+    def __set__(self, obj, value):
+        self.field.__set__(obj, value)
+
+
 class Media:
-    pass
+    __slots__ = ()
 
 
 class ReactableMedia(Media):
+    __slots__ = ("id",)
+
     def __init__(self, media_id):
         self.id = media_id
 
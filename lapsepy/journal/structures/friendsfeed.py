@@ -1,7 +1,9 @@
 from datetime import datetime
 
+from .core import LazyField, PackedTime
 from .profile import Profile
 from .snap import Snap
+from ..common.transport import Transport
 
 
 def _dt_from_iso(dt_str: str):
@@ -15,9 +17,74 @@ class FriendsFeed:
     def __iter__(self):
         return iter(self.nodes)
 
+    def __len__(self):
+        return len(self.nodes)
+
+
+class LazyFriendsFeed(FriendsFeed):
+    """
+    FriendsFeed over the raw edges of a friendsFeedItems response, the FriendNodes are only made once the feed is
+    first used and decode their own fields as they're read.
+    """
+
+    def __init__(self, edges: list[dict], transport: Transport | None = None):
+        """
+        :param edges: friendsFeedItems.edges from the API.
+        :param transport: Transport to load the feed's media with, leave as None to use the default one.
+        """
+        self._edges = edges
+        self._nodes: list[FriendNode] | None = None
+
+        self.transport = transport
+
+    @property
+    def nodes(self) -> list["FriendNode"]:
+        if self._nodes is None:
+            self._nodes = [LazyFriendNode(edge["node"], transport=self.transport) for edge in self._edges]
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes: list["FriendNode"]):
+        self._nodes = nodes
+
+    def __len__(self):
+        return len(self._edges)
+
 
 class FriendNode:
+    __slots__ = ("profile", "_timestamp", "entries")
+
+    timestamp = PackedTime()
+
     def __init__(self, profile: Profile, iso_string: str, entries: list[Snap]):
         self.profile = profile
         self.timestamp: datetime = _dt_from_iso(iso_string)
         self.entries: list[Snap] = entries
+
+
+class LazyFriendNode(FriendNode):
+    """
+    FriendNode over the raw node of a friendsFeedItems edge, its profile, timestamp, and entries are decoded the first
+    time they're read and kept after that.
+    """
+    __slots__ = ("_data", "transport")
+
+    profile = LazyField(lambda node: node._decode_profile())
+    timestamp = LazyField(lambda node: _dt_from_iso(node._data.get("timestamp", {}).get("isoString")))
+    entries = LazyField(lambda node: [Snap.from_dict(entry, transport=node.transport, lazy=True)
+                                      for entry in (node._data.get("content") or {}).get("entries") or []])
+
+    def __init__(self, node_data: dict, transport: Transport | None = None):
+        """
+        :param node_data: Node of a friendsFeedItems edge from the API, kept as it is until its fields are read.
+        :param transport: Transport to load the node's media with, leave as None to use the default one.
+        """
+        self._data = node_data
+
+        self.transport: Transport | None = transport
+
+    def _decode_profile(self) -> Profile:
+        profile = Profile.from_dict(self._data.get("user"), transport=self.transport, lazy=True)
+        # Like the feed's eager parser, the profile's media are the snaps it shared in this item.
+        profile.media.extend(self.entries)
+        return profile
@@ -1,6 +1,9 @@
 import random
 import uuid
 
+from types import MappingProxyType
+from typing import Mapping
+
 IOS_VERSIONS = ["16", "16.0.1", "16.0.2", "16.0.3", "16.1", "16.1.1", "16.1.2", "16.2", "16.3", "16.3.1", "16.4",
                 "16.4.1", "16.5", "16.5.1", "16.6", "16.6.1", "16.7", "16.7.1", "16.7.2"]
 
@@ -12,6 +15,16 @@ DEVICES = ["iPhone10,4", "iPhone10,5", "iPhone10,6", "iPhone11,2", "iPhone11,4",
 
 
 class BaseOptions:
+    # Connection pool settings, these are not sent as headers.
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    pool_block: bool = False
+    max_retries: int = 0
+    timeout: float | None = None
+
+    # Headers that are the same for every call, compiled from the HEADER_ attributes on first use.
+    _static_headers: Mapping[str, str] | None = None
+
     def __init__(self, **kwargs):
         for k, v in kwargs.items():
             setattr(self, f"HEADER_{k}", v)
@@ -36,19 +49,40 @@ class BaseOptions:
 
         return key
 
-    def to_headers(self, operation_name: str, authorization_token: str):
-        attrs = list(filter(lambda x: x.startswith("HEADER_"), dir(self)))
-        key_value_pairs = {self.format_header(attr): str(self.__getattribute__(attr)) for attr in attrs}
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+
+        if name.startswith("HEADER_"):
+            object.__setattr__(self, "_static_headers", None)
+
+    def __delattr__(self, name):
+        super().__delattr__(name)
 
-        x_emb_path = f"/graphql/{operation_name}"
+        if name.startswith("HEADER_"):
+            object.__setattr__(self, "_static_headers", None)
 
-        rendered = {
-            "x-apollo-operation-name": operation_name,
-            "x-emb-path": x_emb_path,
-            "authorization": authorization_token
-        }
+    @property
+    def static_headers(self) -> Mapping[str, str]:
+        """
+        :return: Read only mapping of the headers sent with every call, recompiled after a HEADER_ attribute changes.
+        """
+        static_headers = self._static_headers
 
-        key_value_pairs.update(rendered)
+        if static_headers is None:
+            attrs = list(filter(lambda x: x.startswith("HEADER_"), dir(self)))
+            static_headers = MappingProxyType(
+                {self.format_header(attr): str(self.__getattribute__(attr)) for attr in attrs}
+            )
+            object.__setattr__(self, "_static_headers", static_headers)
+
+        return static_headers
+
+    def to_headers(self, operation_name: str, authorization_token: str):
+        key_value_pairs = dict(self.static_headers)
+
+        key_value_pairs["x-apollo-operation-name"] = operation_name
+        key_value_pairs["x-emb-path"] = f"/graphql/{operation_name}"
+        key_value_pairs["authorization"] = authorization_token
 
         return key_value_pairs
 
@@ -65,6 +99,11 @@ class Options(BaseOptions):
                  apollographql_client_name: str = "com.lapse.journal-apollo-ios",
                  apollographql_client_version: str | None = None,
                  accept_language: str = "en-US,en;q=0.9",
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 max_retries: int = 0,
+                 timeout: float | None = None
                  ):
         self.x_ios_version_number = x_ios_version_number
         self.x_device_name = x_device_name
@@ -84,6 +123,13 @@ class Options(BaseOptions):
         self.accept_encoding = "gzip, deflate, br"
         self.x_apollo_operation_type = "query"
 
+        # Connection pool settings (used by Transport.from_options)
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.max_retries = max_retries
+        self.timeout = timeout
+
         if self.user_agent is None:
             self.user_agent = f"Lapse/{self.x_app_version_number}/{x_app_build_number} iOS"
 
@@ -1,12 +1,15 @@
 import logging
-import requests
 
 from datetime import datetime
 
 from PIL import Image
-import io
 
+from .album import Album
+from .core import LazyField
 from .snap import Snap
+from ..common.transport import Transport, get_default_transport, Sink, DEFAULT_CHUNK_SIZE
+from ..common.image_cache import media_key
+from ..common.media import render_media, MediaOutput
 
 import typing
 
@@ -14,7 +17,6 @@ logger = logging.getLogger("lapsepy.journal.structures.py")
 
 if typing.TYPE_CHECKING:
     from lapsepy.lapse import Lapse
-    from lapsepy.journal.structures.album import Album
 
 
 def _dt_from_iso(dt_str: str):
@@ -22,13 +24,15 @@ def _dt_from_iso(dt_str: str):
 
 
 class Profile:
+    __slots__ = ("bio", "blocked_me", "user_display_name", "emojis", "is_friends", "kudos", "profile_photo_name",
+                 "tags", "hashed_phone_number", "user_id", "username", "_media", "is_blocked", "albums", "_friends",
+                 "profile_music", "transport", "profile_picture")
+
     def __init__(self, user_id: str, username: str, display_name: str, profile_photo_name: str, bio: str | None,
                  emojis: list[str], is_friends: bool, blocked_me: bool, kudos: int, tags: list[dict],
                  hashed_phone_number: str, is_blocked: bool = False, friends: list["Profile"] = None,
-                 profile_music: "ProfileMusic" = None, albums: list["Album"] | None = None):
-        if friends is None:
-            friends = []
-
+                 profile_music: "ProfileMusic" = None, albums: list["Album"] | None = None,
+                 transport: Transport | None = None):
         self.bio: str = bio
         self.blocked_me: bool = blocked_me
         self.user_display_name: str = display_name
@@ -40,37 +44,56 @@ class Profile:
         self.hashed_phone_number = hashed_phone_number
         self.user_id: str = user_id
         self.username: str = username
-        self.media: list[Snap] = []
+        # Only some calls fill in media or friends, so their lists aren't made until they're used.
+        self._media: list[Snap] | None = None
         self.is_blocked = is_blocked
         self.albums = albums
 
-        self.friends: list["Profile"] = friends
+        self._friends: list["Profile"] | None = friends
         self.profile_music = profile_music
 
+        self.transport: Transport | None = transport
+
         self.profile_picture: Image.Image | None = None
 
+    @property
+    def media(self) -> list[Snap]:
+        if self._media is None:
+            self._media = []
+        return self._media
+
+    @media.setter
+    def media(self, media: list[Snap]):
+        self._media = media
+
+    @property
+    def friends(self) -> list["Profile"]:
+        if self._friends is None:
+            self._friends = []
+        return self._friends
+
+    @friends.setter
+    def friends(self, friends: list["Profile"]):
+        self._friends = friends
+
     @staticmethod
-    def from_dict(profile_data: dict) -> "Profile":
+    def from_dict(profile_data: dict, transport: Transport | None = None, lazy: bool = False) -> "Profile":
         """
         Generates a Profile object from a dictionary with the necessary profile data
         :param profile_data: Dictionary containing the necessary data.
+        :param transport: Transport to load the Profile's media with, leave as None to use the default one.
+        :param lazy: Whether to return a LazyProfile, which only decodes each field from profile_data when it's first
+        read.
         :return: Profile object prefilled with the data.
         """
+        if lazy:
+            return LazyProfile(profile_data, transport=transport)
+
         logger.debug("Creating new Profile object from dictionary.")
 
         pd = profile_data
 
-        music = pd.get("music")
-        if music is not None:
-            profile_music = ProfileMusic(
-                artist=music.get("artist"),
-                artwork_url=music.get("artworkUrl"),
-                duration=music.get("duration"),
-                song_title=music.get("songTitle"),
-                song_url=music.get("songUrl")
-            )
-        else:
-            profile_music = None
+        profile_music = ProfileMusic.from_dict(pd.get("music"), transport=transport)
 
         return Profile(
             bio=pd.get('bio'),
@@ -84,30 +107,35 @@ class Profile:
             user_id=pd.get('id'),
             username=pd.get('username'),
             hashed_phone_number=pd.get("hashedPhoneNumber"),
-            profile_music=profile_music
+            profile_music=profile_music,
+            transport=transport
         )
 
-    def load_profile_picture(self, quality: int = 65, height: int | None = None) -> Image.Image:
+    def _picture_url(self, quality: int, height: int | None) -> tuple[str, str]:
+        transformation = f"q_{quality}" + (f",h_{height}" if height is not None else "")
+        url = f"https://image.production.journal-api.lapse.app/image/upload/{transformation}"
+        url += f"//{self.profile_photo_name}.jpg"
+        return url, media_key(self.profile_photo_name, transformation)
+
+    def load_profile_picture(self, quality: int = 65, height: int | None = None,
+                             output: str = "image") -> MediaOutput:
         """
         Loads the Profile's profile picture into memory by making an HTTP request to Lapse's servers.
         :param quality: Quality of the image (1-100)
         seek https://cloudinary.com/documentation/transformation_reference#q_quality for more information.
         :param height: Height of the image in pixels, width is determined by image aspect ratio. Leave as None to get
         original height.
+        :param output: What to return, "image" for a Pillow image, "bytes" for the encoded JPEG, "memoryview" for a
+        memoryview over it, or "lazy" for a LazyImage that's only decoded when used as an image.
 
-        :return: Pillow image.
+        :return: Pillow image, or the form picked with output.
         """
-        url = f"https://image.production.journal-api.lapse.app/image/upload/q_{quality}"
-        url += f",h_{height}" if height is not None else ""
-        url += f"//{self.profile_photo_name}.jpg"
+        url, key = self._picture_url(quality, height)
 
         logger.debug(f"Getting profile image from \"{url}\"")
 
-        request = requests.get(url)
-        request.raise_for_status()
-        
-        bytes_io = io.BytesIO(request.content)
-        image = Image.open(bytes_io)
+        data = (self.transport or get_default_transport()).get_media(url, key)
+        image = render_media(data, output)
 
         self.profile_picture = image
 
@@ -131,31 +159,126 @@ class Profile:
         return f"<Lapse profile \"{self.username}\" {self.user_id}>"
 
 
+class LazyProfile(Profile):
+    """
+    Profile over the raw profile dict of a response, each field (including its music, albums, and friends) is decoded
+    the first time it's read and kept after that.
+    """
+    __slots__ = ("_data",)
+
+    bio = LazyField(lambda profile: profile._data.get("bio"))
+    blocked_me = LazyField(lambda profile: profile._data.get("blockedMe"))
+    user_display_name = LazyField(lambda profile: profile._data.get("displayName"))
+    emojis = LazyField(lambda profile: profile._data.get("emojis", {}).get("emojis"))
+    is_friends = LazyField(lambda profile: profile._data.get("friendStatus") == "FRIENDS")
+    kudos = LazyField(lambda profile: profile._data.get("kudos", {}).get("totalCount", -1))
+    profile_photo_name = LazyField(lambda profile: profile._data.get("profilePhotoName"))
+    tags = LazyField(lambda profile: profile._data.get("tags"))
+    hashed_phone_number = LazyField(lambda profile: profile._data.get("hashedPhoneNumber"))
+    user_id = LazyField(lambda profile: profile._data.get("id"))
+    username = LazyField(lambda profile: profile._data.get("username"))
+    is_blocked = LazyField(lambda profile: profile._data.get("isBlocked", False))
+    profile_music = LazyField(lambda profile: ProfileMusic.from_dict(profile._data.get("music"),
+                                                                     transport=profile.transport))
+    albums = LazyField(lambda profile: profile._decode_albums())
+    _media = LazyField(lambda profile: None)
+    _friends = LazyField(lambda profile: profile._decode_friends())
+
+    def __init__(self, profile_data: dict, transport: Transport | None = None):
+        """
+        :param profile_data: Profile dict from the API, kept as it is until its fields are read.
+        :param transport: Transport to load the Profile's media with, leave as None to use the default one.
+        """
+        self._data = profile_data
+
+        self.transport: Transport | None = transport
+
+        self.profile_picture: Image.Image | None = None
+
+    def _decode_albums(self) -> list[Album] | None:
+        albums = self._data.get("albums")
+        if not albums:
+            return None
+
+        return [Album.from_dict(edge["node"], owner=self, transport=self.transport)
+                for edge in albums.get("edges", {})]
+
+    def _decode_friends(self) -> list[Profile] | None:
+        friends = self._data.get("friends")
+        if not friends:
+            return None
+
+        return [LazyProfile(edge.get("node", {}), transport=self.transport) for edge in friends.get("edges") or []]
+
+
 class ProfileMusic:
-    def __init__(self, artist: str, artwork_url: str, duration: int, song_title: str, song_url: str):
+    __slots__ = ("artist", "artwork_url", "duration", "song_title", "song_url", "transport", "song", "artwork")
+
+    def __init__(self, artist: str, artwork_url: str, duration: int, song_title: str, song_url: str,
+                 transport: Transport | None = None):
         self.artist = artist
         self.artwork_url = artwork_url
         self.duration = duration
         self.song_title = song_title
         self.song_url = song_url
 
+        self.transport: Transport | None = transport
+
         self.song: None | bytes = None
-        self.artwork: None | Image.Image = None
+        self.artwork: None | MediaOutput = None
+
+    @staticmethod
+    def from_dict(music_data: dict | None, transport: Transport | None = None) -> "ProfileMusic | None":
+        """
+        :param music_data: Music dict of a profile from the API.
+        :param transport: Transport to load the song and artwork with, leave as None to use the default one.
+        :return: ProfileMusic object, None if the profile has no music.
+        """
+        if music_data is None:
+            return None
+
+        return ProfileMusic(
+            artist=music_data.get("artist"),
+            artwork_url=music_data.get("artworkUrl"),
+            duration=music_data.get("duration"),
+            song_title=music_data.get("songTitle"),
+            song_url=music_data.get("songUrl"),
+            transport=transport
+        )
 
-    def load(self):
+    def load(self, output: str = "image"):
         """
         Loads the song, and artwork into memory
+        :param output: What to load the artwork as, "image" for a Pillow image, "bytes" for the encoded image,
+        "memoryview" for a memoryview over it, or "lazy" for a LazyImage that's only decoded when used as an image.
         :return: None
         """
+        transport = self.transport or get_default_transport()
+
         # Get song
-        request = requests.get(self.song_url)
+        request = transport.get(self.song_url)
         request.raise_for_status()
         self.song = request.content
 
         # Get artwork
         if self.artwork_url:
-            request = requests.get(self.artwork_url)
-            request.raise_for_status()
+            self.artwork = render_media(transport.get_media(self.artwork_url), output)
 
-            bytes_io = io.BytesIO(request.content)
-            self.artwork = Image.open(bytes_io)
\ No newline at end of file
+    def stream_song(self, sink: Sink, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Downloads the song straight into a sink, unlike load the song is never held in memory as a whole.
+        :param sink: Path, binary file object, or function called with each chunk, see Transport.stream.
+        :param chunk_size: Largest chunk of the song held in memory at once.
+        :return: Amount of bytes written to the sink.
+        """
+        logger.debug(f"Streaming song from \"{self.song_url}\"")
+        return (self.transport or get_default_transport()).stream(self.song_url, sink, chunk_size=chunk_size)
+
+    def stream_artwork(self, sink: Sink, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Downloads the artwork straight into a sink.
+        :param sink: Path, binary file object, or function called with each chunk, see Transport.stream.
+        :param chunk_size: Largest chunk of the artwork held in memory at once.
+        :return: Amount of bytes written to the sink.
+        """
+        return (self.transport or get_default_transport()).stream(self.artwork_url, sink, chunk_size=chunk_size)
@@ -5,6 +5,9 @@ if TYPE_CHECKING:
 
 
 class SearchUser:
+    __slots__ = ("user_id", "display_name", "profile_photo_name", "username", "friend_status", "blocked_me",
+                 "is_blocked")
+
     def __init__(self, user_id, display_name: str, profile_photo_name: str, username: str, friend_status: str,
                  blocked_me: bool, is_blocked: bool):
 
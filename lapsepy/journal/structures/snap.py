@@ -3,20 +3,20 @@ Author: Quintin Dunn
 Date: 10/22/23
 """
 
-import io
 import logging
 
-import requests
-
 from datetime import datetime, timedelta
 from PIL import Image
 
-from .core import Media, ReactableMedia
+from .core import Media, ReactableMedia, PackedTime, LazyField
 
 import typing
 
 from lapsepy.journal.common.exceptions import SyncJournalException
 from ..common.utils import format_iso_time
+from ..common.transport import Transport, get_default_transport, Sink, DEFAULT_CHUNK_SIZE
+from ..common.image_cache import media_key
+from ..common.media import render_media, MediaOutput
 
 if typing.TYPE_CHECKING:
     from lapsepy.lapse import Lapse
@@ -31,14 +31,15 @@ def _dt_from_iso(dt_str: str):
 class Snap(ReactableMedia):
     BASE_URL = "https://image.production.journal-api.lapse.app/image/upload/"
 
+    __slots__ = ("seen", "_taken_at", "_develops_at", "filtered_id", "original_id", "transport", "filtered",
+                 "original")
+
+    taken_at = PackedTime()
+    develops_at = PackedTime()
+
     def __init__(self, seen: bool, taken_at: datetime, develops_at: datetime, filtered_id: str | None,
-                 original_id: str | None):
-        if filtered_id:
-            mid = filtered_id.split("/filtered_0")[0]
-        elif original_id:
-            mid = original_id.split("/filtered_0")[0]
-        else:
-            raise SyncJournalException("Could not get ID of snap.")
+                 original_id: str | None, transport: Transport | None = None):
+        mid = self._media_id(filtered_id, original_id)
 
         super().__init__(media_id=mid)
 
@@ -50,16 +51,31 @@ class Snap(ReactableMedia):
 
         self.id = mid
 
-        self.filtered: Image.Image | None = None
-        self.original: Image.Image | None = None
+        self.transport: Transport | None = transport
+
+        self.filtered: MediaOutput | None = None
+        self.original: MediaOutput | None = None
 
     @staticmethod
-    def from_dict(snap_data: dict) -> "Snap":
+    def _media_id(filtered_id: str | None, original_id: str | None) -> str:
+        if filtered_id:
+            return filtered_id.split("/filtered_0")[0]
+        if original_id:
+            return original_id.split("/filtered_0")[0]
+
+        raise SyncJournalException("Could not get ID of snap.")
+
+    @staticmethod
+    def from_dict(snap_data: dict, transport: Transport | None = None, lazy: bool = False) -> "Snap":
         """
         Generates a Snap object from a dictionary with the necessary snap data
         :param snap_data: Dictionary containing the necessary data.
+        :param transport: Transport to load the Snap's images with, leave as None to use the default one.
+        :param lazy: Whether to return a LazySnap, which only decodes each field from snap_data when it's first read.
         :return: Snap object prefilled with the data.
         """
+        if lazy:
+            return LazySnap(snap_data, transport=transport)
 
         logger.debug("Creating new Snap object from dictionary.")
 
@@ -69,75 +85,159 @@ class Snap(ReactableMedia):
             taken_at=_dt_from_iso(media.get("takenAt")['isoString']),
             develops_at=_dt_from_iso(media.get("developsAt")['isoString']),
             filtered_id=media['content'].get("filtered"),
-            original_id=media['content'].get("original")
+            original_id=media['content'].get("original"),
+            transport=transport
         )
 
-    def load_filtered(self, quality: int, fl_keep_iptc: bool) -> Image.Image:
+    def _filtered_url(self, quality: int, fl_keep_iptc: bool) -> tuple[str, str]:
+        transformation = f"q_{quality}" + (",fl_keep_itc" if fl_keep_iptc else "")
+        return f"{self.BASE_URL}{transformation}/{self.filtered_id}.jpeg", media_key(self.filtered_id, transformation)
+
+    def _original_url(self, quality: int, fl_keep_iptc: bool) -> tuple[str, str]:
+        transformation = f"q_{quality}" + (",fl_keep_itc" if fl_keep_iptc else "")
+        return (f"{self.BASE_URL}{transformation}{self.original_id}/original_0.jpeg",
+                media_key(self.original_id, transformation))
+
+    def load_filtered(self, quality: int, fl_keep_iptc: bool, output: str = "image") -> MediaOutput:
         """
         Loads the filtered Snap object's image into memory by making an HTTP request to Lapse's servers.
         :param quality: Quality of the image (1-100)
         seek https://cloudinary.com/documentation/transformation_reference#q_quality for more information.
         :param fl_keep_iptc: Whether to keep copyright related material seek
         https://cloudinary.com/documentation/transformation_reference#fl_keep_attribution for more information.
+        :param output: What to return, "image" for a Pillow image, "bytes" for the encoded JPEG, "memoryview" for a
+        memoryview over it, or "lazy" for a LazyImage that's only decoded when used as an image.
 
-        :return: Pillow image.
+        :return: Pillow image, or the form picked with output.
         """
-        url = f"{self.BASE_URL}q_{quality}" + (",fl_keep_itc/" if fl_keep_iptc else "/")
-        url += f"{self.filtered_id}.jpeg"
+        url, key = self._filtered_url(quality, fl_keep_iptc)
 
         logger.debug(f"Getting image from \"{url}\"")
 
-        request = requests.get(url)
-        bytes_io = io.BytesIO(request.content)
-        image = Image.open(bytes_io)
+        data = (self.transport or get_default_transport()).get_media(url, key)
+        image = render_media(data, output)
         return image
 
-    def load_original(self, quality: int, fl_keep_iptc: bool) -> Image.Image:
+    def load_original(self, quality: int, fl_keep_iptc: bool, output: str = "image") -> MediaOutput:
         """
         Loads the original Snap object's image into memory by making an HTTP request to Lapse's servers.
         :param quality: Quality of the image (1-100)
         seek https://cloudinary.com/documentation/transformation_reference#q_quality for more information.
         :param fl_keep_iptc: Whether to keep copyright related material seek
         https://cloudinary.com/documentation/transformation_reference#fl_keep_attribution for more information.
+        :param output: What to return, "image" for a Pillow image, "bytes" for the encoded JPEG, "memoryview" for a
+        memoryview over it, or "lazy" for a LazyImage that's only decoded when used as an image.
 
-        :return: Pillow image.
+        :return: Pillow image, or the form picked with output.
         """
-
-        url = f"{self.BASE_URL}q_{quality}" + (",fl_keep_itc" if fl_keep_iptc else "")
-        url += f"{self.original_id}/original_0.jpeg"
+        url, key = self._original_url(quality, fl_keep_iptc)
 
         logger.debug(f"Getting image from \"{url}\"")
 
-        request = requests.get(url)
-        bytes_io = io.BytesIO(request.content)
+        data = (self.transport or get_default_transport()).get_media(url, key)
 
-        image = Image.open(bytes_io)
+        image = render_media(data, output)
         return image
 
-    def load_snap(self, quality: int = 65, fl_keep_iptc: bool = True) -> Image.Image:
+    def load_snap(self, quality: int = 65, fl_keep_iptc: bool = True, output: str = "image") -> MediaOutput:
         """
         Returns a Pillow Image of either the filtered image or original image.
         :param quality: Quality of the image (1-100)
         seek https://cloudinary.com/documentation/transformation_reference#q_quality for more information.
         :param fl_keep_iptc: Whether to keep copyright related material seek
         https://cloudinary.com/documentation/transformation_reference#fl_keep_attribution for more information.
+        :param output: What to return, "image" for a Pillow image, "bytes" for the encoded JPEG, "memoryview" for a
+        memoryview over it, or "lazy" for a LazyImage that's only decoded when used as an image.
 
-        :return: Pillow image.
+        :return: Pillow image, or the form picked with output.
         """
         if self.filtered_id is not None:
             logger.debug("Loading \"filtered\" image.")
-            self.filtered = self.load_filtered(quality=quality, fl_keep_iptc=fl_keep_iptc)
+            self.filtered = self.load_filtered(quality=quality, fl_keep_iptc=fl_keep_iptc, output=output)
             return self.filtered
-        if self.original is not None:
+        if self.original_id is not None:
             logger.debug("Loading \"original\" image.")
-            self.original = self.load_original(quality=quality, fl_keep_iptc=fl_keep_iptc)
+            self.original = self.load_original(quality=quality, fl_keep_iptc=fl_keep_iptc, output=output)
             return self.original
 
+    def stream_filtered(self, sink: Sink, quality: int = 65, fl_keep_iptc: bool = True,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Downloads the filtered image straight into a sink without holding the whole image in memory.
+        :param sink: Path, binary file object, or function called with each chunk, see Transport.stream.
+        :param quality: Quality of the image (1-100)
+        :param fl_keep_iptc: Whether to keep copyright related material.
+        :param chunk_size: Largest chunk of the image held in memory at once.
+        :return: Amount of bytes written to the sink.
+        """
+        url, key = self._filtered_url(quality, fl_keep_iptc)
+
+        logger.debug(f"Streaming image from \"{url}\"")
+
+        return (self.transport or get_default_transport()).stream(url, sink, chunk_size=chunk_size, key=key)
+
+    def stream_original(self, sink: Sink, quality: int = 65, fl_keep_iptc: bool = True,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Downloads the original image straight into a sink without holding the whole image in memory.
+        :param sink: Path, binary file object, or function called with each chunk, see Transport.stream.
+        :param quality: Quality of the image (1-100)
+        :param fl_keep_iptc: Whether to keep copyright related material.
+        :param chunk_size: Largest chunk of the image held in memory at once.
+        :return: Amount of bytes written to the sink.
+        """
+        url, key = self._original_url(quality, fl_keep_iptc)
+
+        logger.debug(f"Streaming image from \"{url}\"")
+
+        return (self.transport or get_default_transport()).stream(url, sink, chunk_size=chunk_size, key=key)
+
+    def stream_snap(self, sink: Sink, quality: int = 65, fl_keep_iptc: bool = True,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Streams either the filtered image or the original image, picked the same way load_snap picks.
+        :param sink: Path, binary file object, or function called with each chunk, see Transport.stream.
+        :param quality: Quality of the image (1-100)
+        :param fl_keep_iptc: Whether to keep copyright related material.
+        :param chunk_size: Largest chunk of the image held in memory at once.
+        :return: Amount of bytes written to the sink.
+        """
+        if self.filtered_id is not None:
+            return self.stream_filtered(sink, quality=quality, fl_keep_iptc=fl_keep_iptc, chunk_size=chunk_size)
+        return self.stream_original(sink, quality=quality, fl_keep_iptc=fl_keep_iptc, chunk_size=chunk_size)
+
+
+class LazySnap(Snap):
+    """
+    Snap over the raw snap dict of a response, each field is decoded the first time it's read and kept after that.
+    """
+    __slots__ = ("_data",)
+
+    seen = LazyField(lambda snap: snap._data.get("seen"))
+    taken_at = LazyField(lambda snap: _dt_from_iso(snap._data["media"]["takenAt"]["isoString"]))
+    develops_at = LazyField(lambda snap: _dt_from_iso(snap._data["media"]["developsAt"]["isoString"]))
+    filtered_id = LazyField(lambda snap: snap._data["media"]["content"].get("filtered"))
+    original_id = LazyField(lambda snap: snap._data["media"]["content"].get("original"))
+    id = LazyField(lambda snap: snap._media_id(snap.filtered_id, snap.original_id))
+
+    def __init__(self, snap_data: dict, transport: Transport | None = None):
+        """
+        :param snap_data: Snap dict from the API, kept as it is until its fields are read.
+        :param transport: Transport to load the Snap's images with, leave as None to use the default one.
+        """
+        self._data = snap_data
+
+        self.transport: Transport | None = transport
+
+        self.filtered: MediaOutput | None = None
+        self.original: MediaOutput | None = None
+
 
 class DarkRoomMedia(Media):
     BASE_URL = "https://image.production.journal-api.lapse.app/image/upload/"
 
-    def __init__(self, develop_in: int | str, media_id: str, taken_at: datetime, im: Image.Image | None = None):
+    def __init__(self, develop_in: int | str, media_id: str, taken_at: datetime, im: Image.Image | None = None,
+                 transport: Transport | None = None):
 
         self.im: None | Image.Image = im
 
@@ -149,7 +249,9 @@ class DarkRoomMedia(Media):
         self.media_id: str = media_id
         self.taken_at: datetime = taken_at
 
-        self.im: Image.Image | None = None
+        self.im: MediaOutput | None = None
+
+        self.transport: Transport | None = transport
 
         self._developed: bool = False
 
@@ -179,18 +281,36 @@ class DarkRoomMedia(Media):
         partition = self.review(iso_string=iso_string)
         return ctx.review_snaps(shared=[partition])
 
-    def load(self, quality: int = 65, fl_keep_iptc: bool = True):
-        url = f"{self.BASE_URL}q_{quality}" + (",fl_keep_itc/" if fl_keep_iptc else "/")
-        url += f"{self.media_id}.jpeg"
+    def _url(self, quality: int, fl_keep_iptc: bool) -> tuple[str, str]:
+        transformation = f"q_{quality}" + (",fl_keep_itc" if fl_keep_iptc else "")
+        return f"{self.BASE_URL}{transformation}/{self.media_id}.jpeg", media_key(self.media_id, transformation)
+
+    def load(self, quality: int = 65, fl_keep_iptc: bool = True, output: str = "image") -> MediaOutput:
+        url, key = self._url(quality, fl_keep_iptc)
 
         logger.debug(f"Getting image from \"{url}\"")
 
-        request = requests.get(url)
-        bytes_io = io.BytesIO(request.content)
-        image = Image.open(bytes_io)
+        data = (self.transport or get_default_transport()).get_media(url, key)
+        image = render_media(data, output)
         self.im = image
         return image
 
+    def stream(self, sink: Sink, quality: int = 65, fl_keep_iptc: bool = True,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Downloads the image straight into a sink without holding the whole image in memory.
+        :param sink: Path, binary file object, or function called with each chunk, see Transport.stream.
+        :param quality: Quality of the image (1-100)
+        :param fl_keep_iptc: Whether to keep copyright related material.
+        :param chunk_size: Largest chunk of the image held in memory at once.
+        :return: Amount of bytes written to the sink.
+        """
+        url, key = self._url(quality, fl_keep_iptc)
+
+        logger.debug(f"Streaming image from \"{url}\"")
+
+        return (self.transport or get_default_transport()).stream(url, sink, chunk_size=chunk_size, key=key)
+
 
 class ReviewMediaPartition:
     def __init__(self, media_id: str, iso_string: str | None | datetime = None, tags: list = None):
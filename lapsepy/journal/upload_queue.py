@@ -0,0 +1,259 @@
+import contextlib
+import logging
+import os
+import sqlite3
+import time
+
+from datetime import datetime
+from uuid import uuid4
+from typing import TYPE_CHECKING, Iterator
+
+from PIL import Image
+
+from .common.bulk import BulkResult, bulk_map
+from .common.upload import UploadSource, encode_jpeg
+from .structures import DarkRoomMedia
+
+if TYPE_CHECKING:
+    from .journal import Journal
+
+logger = logging.getLogger("lapsepy.journal.upload_queue.py")
+
+# Stages of a queued upload, in the order they're done.
+STAGE_QUEUED = "queued"
+STAGE_URL_ISSUED = "url_issued"
+STAGE_UPLOADED = "uploaded"
+STAGE_REGISTERED = "registered"
+
+STAGES = (STAGE_QUEUED, STAGE_URL_ISSUED, STAGE_UPLOADED, STAGE_REGISTERED)
+
+_COLUMNS = ("file_uuid", "stage", "path", "data", "develop_in", "taken_at", "color_temperature", "exposure_value",
+            "flash", "timezone", "upload_url", "url_issued_at", "attempts", "error", "created_at")
+
+
+class QueuedUpload:
+    """
+    A photo in an UploadQueue and how far its upload got.
+    """
+
+    def __init__(self, file_uuid: str, stage: str, path: str | None, data: bytes | None, develop_in: int,
+                 taken_at: datetime, color_temperature: float, exposure_value: float, flash: bool, timezone: str,
+                 upload_url: str | None = None, url_issued_at: float | None = None, attempts: int = 0,
+                 error: str | None = None, created_at: float | None = None):
+        self.file_uuid = file_uuid
+        self.stage = stage
+
+        self.path = path
+        self.data = data
+
+        self.develop_in = develop_in
+        self.taken_at = taken_at
+        self.color_temperature = color_temperature
+        self.exposure_value = exposure_value
+        self.flash = flash
+        self.timezone = timezone
+
+        self.upload_url = upload_url
+        self.url_issued_at = url_issued_at
+
+        self.attempts = attempts
+        self.error = error
+        self.created_at = created_at
+
+    @property
+    def source(self) -> str | bytes:
+        """
+        :return: The path of the photo, or its bytes when it wasn't queued from a path.
+        """
+        return self.path if self.path is not None else self.data
+
+    @property
+    def done(self) -> bool:
+        return self.stage == STAGE_REGISTERED
+
+    @staticmethod
+    def _from_row(row: tuple) -> "QueuedUpload":
+        values = dict(zip(_COLUMNS, row))
+        values["taken_at"] = datetime.fromisoformat(values["taken_at"])
+        values["flash"] = bool(values["flash"])
+        return QueuedUpload(**values)
+
+    def __repr__(self):
+        return f"<QueuedUpload {self.file_uuid} stage={self.stage}>"
+
+
+class UploadQueue:
+    """
+    Durable queue of darkroom uploads backed by a sqlite database. Every stage of an upload (upload url issued, photo
+    PUT on AWS, photo registered) is recorded as soon as it's done, so a worker that dies midway resumes each photo
+    from its last finished stage instead of uploading it again from scratch.
+
+    Photos queued from a path are read from that path when they're uploaded, anything else is stored in the database.
+    Only one process should run a queue at a time.
+    """
+
+    def __init__(self, path: str, timeout: float = 30, url_max_age: float = 300):
+        """
+        :param path: Path of the sqlite database, it's created when missing.
+        :param timeout: How many seconds to wait for another connection holding the database's write lock.
+        :param url_max_age: How many seconds an issued upload url is reused for, older ones may have expired so a
+        new one is requested instead.
+        """
+        self.path = path
+        self.timeout = timeout
+        self.url_max_age = url_max_age
+
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                "file_uuid TEXT PRIMARY KEY, stage TEXT NOT NULL, path TEXT, data BLOB, develop_in INTEGER NOT NULL, "
+                "taken_at TEXT NOT NULL, color_temperature REAL NOT NULL, exposure_value REAL NOT NULL, "
+                "flash INTEGER NOT NULL, timezone TEXT NOT NULL, upload_url TEXT, url_issued_at REAL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, created_at REAL NOT NULL)"
+            )
+
+    @contextlib.contextmanager
+    def _connection(self):
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def add(self, im: UploadSource, develop_in: int, file_uuid: str | None = None, taken_at: datetime | None = None,
+            color_temperature: float = 6000, exposure_value: float = 9, flash: bool = False,
+            timezone: str = "America/New_York") -> str:
+        """
+        Queues a photo to upload to the darkroom, the parameters are the same as Journal.upload_photo's.
+        :param im: Pillow image, JPEG bytes, path to a JPEG file, or binary file object of one. Paths are stored as
+        they are and have to still exist when the photo is uploaded, anything else is stored as JPEG bytes.
+        :return: file_uuid of the queued photo.
+        """
+        path = None
+        data = None
+
+        if isinstance(im, (str, os.PathLike)):
+            path = os.path.abspath(im)
+        elif isinstance(im, Image.Image):
+            data = encode_jpeg(im)
+        elif isinstance(im, (bytes, bytearray, memoryview)):
+            data = bytes(im)
+        elif hasattr(im, "read"):
+            data = im.read()
+        else:
+            raise TypeError(f"Can't upload {type(im).__name__}, expected a Pillow image, bytes, a path, or a binary "
+                            f"file object.")
+
+        if file_uuid is None:
+            # UUID in testing always started with "01HDBZ" with a total length of 26 chars.
+            file_uuid = "01HDBZ" + str(uuid4()).upper().replace("-", "")[:20]
+
+        if taken_at is None:
+            taken_at = datetime.utcnow()
+
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT INTO uploads (file_uuid, stage, path, data, develop_in, taken_at, color_temperature, "
+                "exposure_value, flash, timezone, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (file_uuid, STAGE_QUEUED, path, data, develop_in, taken_at.isoformat(), color_temperature,
+                 exposure_value, int(flash), timezone, time.time())
+            )
+
+        logger.debug(f"Queued upload {file_uuid}.")
+        return file_uuid
+
+    def get(self, file_uuid: str) -> QueuedUpload | None:
+        """
+        :param file_uuid: file_uuid of the queued photo.
+        :return: The queued photo, None if it isn't in the queue.
+        """
+        with self._connection() as connection:
+            row = connection.execute(f"SELECT {', '.join(_COLUMNS)} FROM uploads WHERE file_uuid = ?",
+                                     (file_uuid,)).fetchone()
+        return QueuedUpload._from_row(row) if row else None
+
+    def pending(self) -> list[QueuedUpload]:
+        """
+        :return: Every photo that isn't registered yet, oldest first.
+        """
+        with self._connection() as connection:
+            rows = connection.execute(f"SELECT {', '.join(_COLUMNS)} FROM uploads WHERE stage != ? "
+                                      f"ORDER BY created_at", (STAGE_REGISTERED,)).fetchall()
+        return [QueuedUpload._from_row(row) for row in rows]
+
+    def counts(self) -> dict[str, int]:
+        """
+        :return: How many photos are at each stage.
+        """
+        with self._connection() as connection:
+            rows = connection.execute("SELECT stage, COUNT(*) FROM uploads GROUP BY stage").fetchall()
+        return {stage: 0 for stage in STAGES} | dict(rows)
+
+    def remove(self, file_uuid: str):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM uploads WHERE file_uuid = ?", (file_uuid,))
+
+    def clear_finished(self):
+        """
+        Removes every registered photo from the queue.
+        :return: None
+        """
+        with self._connection() as connection:
+            connection.execute("DELETE FROM uploads WHERE stage = ?", (STAGE_REGISTERED,))
+
+    def _update(self, file_uuid: str, **values):
+        columns = ", ".join(f"{column} = ?" for column in values)
+        with self._connection() as connection:
+            connection.execute(f"UPDATE uploads SET {columns} WHERE file_uuid = ?", (*values.values(), file_uuid))
+
+    def _advance(self, journal: "Journal", upload: QueuedUpload) -> DarkRoomMedia:
+        """
+        Runs the unfinished stages of a queued photo, recording each one as it finishes.
+        """
+        try:
+            url_expired = upload.url_issued_at is None or time.time() - upload.url_issued_at > self.url_max_age
+            if upload.stage == STAGE_QUEUED or (upload.stage == STAGE_URL_ISSUED and url_expired):
+                upload.upload_url = journal.image_upload_url_call(file_uuid=upload.file_uuid)
+                upload.url_issued_at = time.time()
+                upload.stage = STAGE_URL_ISSUED
+                self._update(upload.file_uuid, stage=upload.stage, upload_url=upload.upload_url,
+                             url_issued_at=upload.url_issued_at)
+
+            if upload.stage == STAGE_URL_ISSUED:
+                journal._upload_image_to_aws(im=upload.source, upload_url=upload.upload_url)
+                upload.stage = STAGE_UPLOADED
+                self._update(upload.file_uuid, stage=upload.stage)
+
+            darkroom_media = journal._register_photo(file_uuid=upload.file_uuid, develop_in=upload.develop_in,
+                                                     taken_at=upload.taken_at,
+                                                     color_temperature=upload.color_temperature,
+                                                     exposure_value=upload.exposure_value, flash=upload.flash,
+                                                     timezone=upload.timezone)
+            upload.stage = STAGE_REGISTERED
+            # The photo's bytes aren't needed anymore.
+            self._update(upload.file_uuid, stage=upload.stage, data=None, error=None)
+        except Exception as e:
+            upload.attempts += 1
+            upload.error = repr(e)
+            self._update(upload.file_uuid, attempts=upload.attempts, error=upload.error)
+            raise
+
+        return darkroom_media
+
+    def run(self, journal: "Journal", workers: int = 8, ordered: bool = False) -> Iterator[BulkResult]:
+        """
+        Uploads every pending photo, resuming each one from its last finished stage.
+        :param journal: Journal to upload with, a Lapse object's is at Lapse.journal.
+        :param workers: How many photos to upload at once.
+        :param ordered: Whether to yield results oldest photo first, otherwise they're yielded as they finish.
+        :return: Generator of BulkResults, BulkResult.item is the QueuedUpload and BulkResult.value its DarkRoomMedia.
+        A failed photo stays in the queue at the stage it got to, with the error recorded, and is retried by the
+        next run.
+        """
+        return bulk_map(lambda upload: self._advance(journal, upload), self.pending(), workers=workers,
+                        ordered=ordered)
+
+    def __len__(self):
+        with self._connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM uploads WHERE stage != ?",
+                                      (STAGE_REGISTERED,)).fetchone()[0]
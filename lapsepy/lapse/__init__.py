@@ -4,3 +4,5 @@ Date: 10/22/23
 """
 
 from .lapse import Lapse
+from .async_lapse import AsyncLapse
+from .pool import LapsePool
@@ -0,0 +1,392 @@
+from datetime import datetime
+from typing import AsyncIterator, Iterable
+
+from lapsepy.lapse.lapse import Lapse
+from lapsepy.journal.async_journal import AsyncBatch, AsyncJournal
+from lapsepy.journal.common.async_transport import AsyncTransport
+from lapsepy.journal.common.bulk import BulkResult
+from lapsepy.journal.common.exceptions import UserNotFoundException
+from lapsepy.journal.common.upload import UploadSource
+from lapsepy.journal.structures import Profile, DarkRoomMedia, ReviewMediaPartition, BaseOptions, Options, \
+    FriendNode, SearchUser, AlbumMedia, Snap
+
+import logging
+
+logger = logging.getLogger("lapsepy.lapse.async_lapse.py")
+
+
+class AsyncLapse:
+    """
+    asyncio version of Lapse, every method mirrors the method of the same name on Lapse. Calls are awaited, the iter_
+    methods, load_media and upload_photos return async generators, and batch is used with async with.
+
+    Requests are made with aiohttp, which has to be installed ("pip install lapsepy[async]"), see AsyncJournal for
+    what still runs on threads. The access token is fetched on the first call rather than in the constructor, so
+    creating an AsyncLapse never blocks the event loop.
+    """
+
+    def __init__(self, refresh_token, options: BaseOptions | None = None, max_concurrency: int = 64,
+                 transport: AsyncTransport | None = None):
+        """
+        :param refresh_token: Token gotten from Lapse to refresh your access token.
+        :param options: Options object with the headers to send to Lapse, leave as None to generate them.
+        :param max_concurrency: Maximum amount of requests this client can have in flight, only used when transport
+        is None.
+        :param transport: AsyncTransport to make the requests with, pass the same one to several clients to share its
+        connections and concurrency limit.
+        """
+        if options is None:
+            options = Options()
+
+        self.lapse = Lapse(refresh_token=refresh_token, options=options, authenticate=False)
+        self.journal = AsyncJournal(self.lapse.journal, transport=transport, max_concurrency=max_concurrency)
+
+    @property
+    def refresh_token(self) -> str:
+        return self.lapse.refresh_token
+
+    @property
+    def auth_token(self) -> str | None:
+        return self.lapse.auth_token
+
+    async def authenticate(self) -> None:
+        """
+        Gets a new access token.
+        :return: None
+        """
+        await self.journal.authenticate()
+
+    async def upload_photo(self, im: UploadSource,
+                           develop_in: int,
+                           file_uuid: str | None = None,
+                           taken_at: datetime | None = None,
+                           color_temperature: float = 6000,
+                           exposure_value: float = 9,
+                           flash: bool = False,
+                           timezone: str = "America/New_York") -> DarkRoomMedia:
+        """
+        Upload an image to your Lapse darkroom, see Lapse.upload_photo.
+        """
+        return await self.journal.upload_photo(im=im, develop_in=develop_in, file_uuid=file_uuid, taken_at=taken_at,
+                                               color_temperature=color_temperature, exposure_value=exposure_value,
+                                               flash=flash, timezone=timezone)
+
+    async def query_darkroom(self) -> list[DarkRoomMedia]:
+        """
+        Queries your darkroom and returns the media inside it.
+        :return:
+        """
+        return await self.journal.query_darkroom()
+
+    async def review_snaps(self, archived: list["ReviewMediaPartition"] | None = None,
+                           deleted: list["ReviewMediaPartition"] | None = None,
+                           shared: list["ReviewMediaPartition"] | None = None):
+        """
+        Reviews snaps from the darkroom
+        :param archived: List of ReviewMediaPartitions for Snaps to archive.
+        :param deleted: List of ReviewMediaPartitions for Snaps to delete.
+        :param shared: List of ReviewMediaPartitions for Snaps to share.
+        :return:
+        """
+        return await self.journal.review_snaps(archived=archived, deleted=deleted, shared=shared)
+
+    async def upload_instant(self, im: UploadSource, user: str | Profile, file_uuid: str | None = None,
+                             im_id: str | None = None, caption: str | None = None, time_limit: int = 10):
+        """
+        Uploads an instant to Lapse server and sends it to a profile, see Lapse.upload_instant.
+        """
+        if isinstance(user, Profile):
+            user = user.user_id
+
+        return await self.journal.upload_instant(im=im, user_id=user, file_uuid=file_uuid, im_id=im_id,
+                                                 caption=caption, time_limit=time_limit)
+
+    async def send_instants(self, im: UploadSource, users: Iterable[str | Profile], file_uuid: str | None = None,
+                            caption: str | None = None, time_limit: int = 10,
+                            max_destinations: int = 25) -> dict[str, str]:
+        """
+        Uploads an instant to Lapse server once and sends it to many profiles, see Lapse.send_instants.
+        """
+        user_ids = [user.user_id if isinstance(user, Profile) else user for user in users]
+
+        return await self.journal.send_instants(im=im, user_ids=user_ids, file_uuid=file_uuid, caption=caption,
+                                                time_limit=time_limit, max_destinations=max_destinations)
+
+    async def create_status_update(self, text: str, msg_id: str | None = None):
+        """
+        Creates a status update on your Journal
+        :param text: Msg of the text to send
+        :param msg_id: Leave None if you don't know what you're doing. FORMAT: STATUS_UPDATE:<(str(uuid.uuid4))>
+        :return:
+        """
+        return await self.journal.create_status_update(text=text, msg_id=msg_id)
+
+    async def remove_status_update(self, msg_id: str, removed_at: datetime | None = None):
+        """
+        Removes a status update
+        :param msg_id: ID of the status update
+        :param removed_at: datetime object of when it was removed
+        :return:
+        """
+        return await self.journal.remove_status_update(msg_id=msg_id, removed_at=removed_at)
+
+    async def send_kudos(self, user: str | Profile):
+        """
+        Sends kudos (vibes) to a user.
+        :param user: ID / Object of user to send it to.
+        :return:
+        """
+        if isinstance(user, Profile):
+            user = user.user_id
+
+        await self.journal.send_kudos(user)
+
+    async def get_friends_feed(self, count: int = 10, profile: str = "full"):
+        """
+        Gets your friend upload feed.
+        :param count: How many collection to grab.
+        :param profile: How much of each feed item to request, "full", "media-only", or "ids-only", see
+        Journal.get_friends_feed.
+        :return: A list of profiles
+        """
+        return await self.journal.get_friends_feed(count=count, profile=profile)
+
+    def iter_friends_feed(self, page_size: int = 10, limit: int | None = None, prefetch: int = 0,
+                          profile: str = "full") -> AsyncIterator[FriendNode]:
+        """
+        Walks your friends feed page by page, see Lapse.iter_friends_feed.
+        :return: Async generator of FriendNodes.
+        """
+        return self.journal.iter_friends_feed(page_size=page_size, limit=limit, prefetch=prefetch, profile=profile)
+
+    async def get_profile_by_id(self, user_id: str, album_limit: int = 6, friends_limit: int = 10,
+                                profile: str = "full") -> Profile:
+        """
+        Get a Profile object
+        :param user_id: ID the user of the profile you want to query.
+        :param album_limit: Max amount of albums to get.
+        :param friends_limit: Max amount of friends to get.
+        :param profile: How much of the profile to request, "full", "media-only", or "ids-only", see
+        Journal.get_profile_by_id.
+        :return:
+        """
+        return await self.journal.get_profile_by_id(user_id=user_id, album_limit=album_limit,
+                                                    friends_limit=friends_limit, profile=profile)
+
+    async def get_current_user(self) -> Profile:
+        """
+        Gets the current user information
+        :return: dict of current user information
+        """
+        return await self.journal.get_current_user()
+
+    async def update_bio(self, bio: str):
+        """
+        Updates your Lapse bio
+        :param bio: String of what your new bio should be.
+        :return: None
+        """
+        return await self.journal.modify_bio(bio=bio)
+
+    async def update_display_name(self, display_name: str):
+        """
+        Updates your Lapse display name
+        :param display_name: String of what your new display name should be.
+        :return: None
+        """
+        return await self.journal.modify_display_name(display_name=display_name)
+
+    async def update_username(self, username: str):
+        """
+        Updates your Lapse username
+        :param username: String of what your new display name should be.
+        :return: None
+        """
+        return await self.journal.modify_username(username=username)
+
+    async def update_emojis(self, emojis: list[str]):
+        """
+        Updates your Lapse emojis
+        :param emojis: List of emojis to put as your lapse emojis
+        :return: None
+        """
+        return await self.journal.modify_emojis(emojis=emojis)
+
+    async def update_dob(self, dob: str | datetime):
+        """
+        Updates your Lapse date of birth
+        :param dob: date of birth in yyyy-mm-dd format
+        :return: None
+        """
+        return await self.journal.modify_dob(dob=dob)
+
+    async def update_music(self, artist: str, artwork_url: str, duration: int, song_title: str, song_url: str):
+        """
+        Modifies your Lapse profile's music
+        :param artist: Artist of the song
+        :param artwork_url: URL to the artwork for the song
+        :param duration: Duration of the MP3
+        :param song_title: Title of the Song
+        :param song_url: URL of the song's MP3.
+        :return:
+        """
+        return await self.journal.modify_music(artist=artist, artwork_url=artwork_url, duration=duration,
+                                               song_title=song_title, song_url=song_url)
+
+    async def add_reaction(self, msg_id: str, reaction: str):
+        """
+        Adds a reaction to a message
+        :param msg_id: ID of msg to send reaction to.
+        :param reaction: Reaction to send.
+        :return:
+        """
+        return await self.journal.add_reaction(msg_id=msg_id, reaction=reaction)
+
+    async def remove_reaction(self, msg_id: str, reaction: str):
+        """
+        removes a reaction from a message
+        :param msg_id: ID of msg to remove reaction from.
+        :param reaction: Reaction to remove.
+        :return:
+        """
+        return await self.journal.remove_reaction(msg_id=msg_id, reaction=reaction)
+
+    async def send_comment(self, msg_id: str, text: str, comment_id: str | None = None):
+        """
+        Adds a comment to a post
+        :param comment_id: id of the comment, leave as None unless you know what you're doing
+        :param msg_id: id of the message
+        :param text: text to send in the comment
+        :return:
+        """
+        return await self.journal.create_comment(msg_id=msg_id, text=text, comment_id=comment_id)
+
+    async def delete_comment(self, msg_id: str, comment_id: str):
+        """
+        Deletes a comment from a lapsepy post
+        :param msg_id: ID of the post
+        :param comment_id: ID of the comment
+        :return:
+        """
+        return await self.journal.delete_comment(msg_id=msg_id, comment_id=comment_id)
+
+    async def search_for_user(self, term: str, first: int = 10):
+        """
+        Searches for a User using Lapse API
+        :param term: Term to search for
+        :param first: How many results to get at maximum (Not used)
+        :return:
+        """
+        return await self.journal.search_for_user(term=term, first=first)
+
+    def iter_search_users(self, term: str, page_size: int = 10, limit: int | None = None,
+                          prefetch: int = 0) -> AsyncIterator[SearchUser]:
+        """
+        Walks the search results for a term page by page, see Lapse.iter_search_users.
+        :return: Async generator of SearchUsers.
+        """
+        return self.journal.iter_search_users(term=term, page_size=page_size, limit=limit, prefetch=prefetch)
+
+    async def get_profile_by_username(self, username: str, album_limit: int = 6, friends_limit: int = 10) -> Profile:
+        """
+        Wrapper for AsyncLapse.search_for_user, returns a Profile object from a username.
+        :param username: Username to search for.
+        :param album_limit: Max amount of albums to get.
+        :param friends_limit: Max amount of friends to get.
+        :return:
+        """
+        search_results = await self.journal.search_for_user(term=username, first=10)
+
+        if search_results and search_results[0].username == username:
+            return await self.get_profile_by_id(user_id=search_results[0].user_id, album_limit=album_limit,
+                                                friends_limit=friends_limit)
+
+        raise UserNotFoundException(f"Could not find user with username: \"{username}\"")
+
+    async def block_profile(self, user: str | Profile):
+        """
+        Blocks a user from your Lapse account
+        :param user: ID / Object of user to block.
+        :return:
+        """
+        if isinstance(user, Profile):
+            user = user.user_id
+
+        return await self.journal.block_user(user_id=user)
+
+    async def unblock_profile(self, user: str | Profile):
+        """
+        Unblocks a user from your Lapse account
+        :param user: ID / Object of user to unblock.
+        :return:
+        """
+        if isinstance(user, Profile):
+            user = user.user_id
+
+        return await self.journal.unblock_user(user_id=user)
+
+    async def get_album_by_id(self, album_id: str, last: int, profile: str = "full"):
+        """
+        Gets an album by its ID.
+        :param album_id: ID of the album
+        :param last: How many items to query from the album.
+        :param profile: How much of each item to request, see Journal.get_album_by_id.
+        :return:
+        """
+        return await self.journal.get_album_by_id(album_id=album_id, last=last, profile=profile)
+
+    def iter_album_media(self, album_id: str, page_size: int = 20, limit: int | None = None, prefetch: int = 0,
+                         profile: str = "full") -> AsyncIterator[AlbumMedia]:
+        """
+        Walks an album's media page by page, see Lapse.iter_album_media.
+        :return: Async generator of AlbumMedia.
+        """
+        return self.journal.iter_album_media(album_id=album_id, page_size=page_size, limit=limit, prefetch=prefetch,
+                                             profile=profile)
+
+    def load_media(self, media: Iterable[Snap | AlbumMedia | DarkRoomMedia | Profile], quality: int = 65,
+                   fl_keep_iptc: bool = True, workers: int = 8, ordered: bool = False,
+                   output: str = "image") -> AsyncIterator[BulkResult]:
+        """
+        Downloads the images of many media at once, see Lapse.load_media.
+        :return: Async generator of BulkResults.
+        """
+        return self.journal.load_media(media=media, quality=quality, fl_keep_iptc=fl_keep_iptc, workers=workers,
+                                       ordered=ordered, output=output)
+
+    def upload_photos(self, images: Iterable[UploadSource], develop_in: int, workers: int = 8,
+                      encode_processes: int | None = None, ordered: bool = False, color_temperature: float = 6000,
+                      exposure_value: float = 9, flash: bool = False,
+                      timezone: str = "America/New_York") -> AsyncIterator[BulkResult]:
+        """
+        Uploads many images to your Lapse darkroom at once, see Lapse.upload_photos.
+        :return: Async generator of BulkResults.
+        """
+        return self.journal.upload_photos(images=images, develop_in=develop_in, workers=workers,
+                                          encode_processes=encode_processes, ordered=ordered,
+                                          color_temperature=color_temperature, exposure_value=exposure_value,
+                                          flash=flash, timezone=timezone)
+
+    def batch(self, max_operations: int = 25, raise_errors: bool = True) -> AsyncBatch:
+        """
+        Collects reactions, comments, kudos, and blocks and sends them together, see Lapse.batch.
+        :param max_operations: Maximum amount of operations merged into a single request.
+        :param raise_errors: Whether leaving the async with block raises a BatchError when any operation failed.
+        :return: AsyncBatch to use as an async context manager.
+        """
+        return self.journal.batch(max_operations=max_operations, raise_errors=raise_errors)
+
+    async def close(self):
+        """
+        Closes the connection pools used by this client, a transport that was passed in is left open.
+        :return: None
+        """
+        await self.journal.close()
+        self.lapse.close()
+        self.lapse.journal.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -2,36 +2,192 @@
 Author: Quintin Dunn
 Date: 10/22/23
 """
-from PIL.Image import Image
 from datetime import datetime
+from typing import Iterable, Iterator
 
-from lapsepy.auth.refresher import refresh
+import hashlib
+import threading
+import time
+import weakref
+
+from lapsepy.auth.refresher import refresh, get_token_expiry
+from lapsepy.auth.scheduler import RefreshScheduler, get_default_scheduler
+from lapsepy.auth.token_store import BaseTokenStore
 from lapsepy.journal.journal import Journal
+from lapsepy.journal.common.transport import Transport
+from lapsepy.journal.common.tracing import Tracer
+from lapsepy.journal.common.cache import ResponseCache
+from lapsepy.journal.common.codec import JSONCodec
+from lapsepy.journal.common.upload import UploadSource
 from lapsepy.journal.common.exceptions import UserNotFoundException
-from lapsepy.journal.structures import Profile, DarkRoomMedia, ReviewMediaPartition, BaseOptions
+from lapsepy.journal.common.bulk import BulkResult
+from lapsepy.journal.batch import Batch
+from lapsepy.journal.structures import Profile, DarkRoomMedia, ReviewMediaPartition, BaseOptions, Snap, AlbumMedia, \
+    FriendNode, SearchUser
 
 import logging
 
 logger = logging.getLogger("lapsepy.lapse.lapse.py")
 
 
+# How long to wait before retrying a failed background refresh.
+REFRESH_RETRY_DELAY = 10
+
+
 class Lapse:
-    def __init__(self, refresh_token, options: BaseOptions | None = None):
+    def __init__(self, refresh_token, options: BaseOptions | None = None, authenticate: bool = True,
+                 refresh_margin: float = 60, proactive_refresh: bool = True,
+                 scheduler: RefreshScheduler | None = None, token_store: BaseTokenStore | None = None,
+                 transport: Transport | None = None, tracer: Tracer | None = None,
+                 cache: ResponseCache | None = None, codec: JSONCodec | None = None,
+                 persisted_queries: bool = False, lazy_structures: bool = False):
+        """
+        :param refresh_token: Token gotten from Lapse to refresh your access token.
+        :param options: Options object with the headers to send to Lapse, leave as None to generate them.
+        :param authenticate: Whether to get an access token right away, when False the token has to be fetched with
+        Lapse._refresh_auth_token before making any calls.
+        :param refresh_margin: How many seconds before the access token expires to refresh it in the background.
+        :param proactive_refresh: Whether to refresh the access token in the background before it expires, when False
+        it's only refreshed once Lapse rejects it.
+        :param scheduler: RefreshScheduler to schedule the background refreshes on, leave as None to use the process
+        wide one.
+        :param token_store: Token store to share access tokens through, a still valid access token in it is used
+        instead of asking the auth server for a new one.
+        :param transport: Transport to send requests over, leave as None to create one from options. Pass the same one
+        to several clients to share their connections.
+        :param tracer: Tracer to report every GraphQL call to, leave as None to create one. Tracing is off until a hook
+        is added with lapse.journal.tracer.add_hook.
+        :param cache: ResponseCache to cache profile, search, album, and darkroom queries in, leave as None to not cache
+        anything.
+        :param codec: JSONCodec to serialize requests and parse responses with, leave as None to use orjson or msgspec
+        when installed and the standard library otherwise.
+        :param persisted_queries: Whether to send Apollo persisted query hashes instead of the full query documents,
+        falling back to the documents when the server doesn't know a hash.
+        :param lazy_structures: Whether to return feed, profile, and album media structures that wrap the response
+        dicts and only decode a field the first time it's read.
+        """
         self.refresh_token = refresh_token
         self.auth_token: str | None = None
-        self.journal = Journal(authorization=self.auth_token, refresher=self._refresh_auth_token, options=options)
-        self._refresh_auth_token()
+
+        self.refresh_margin = refresh_margin
+        self.proactive_refresh = proactive_refresh
+        self.scheduler = scheduler if scheduler is not None else get_default_scheduler()
+        self.token_store = token_store
+
+        self.refresh_count = 0
+
+        self._refresh_lock = threading.Lock()
+        self._scheduled_refresh = None
+
+        self.journal = Journal(authorization=self.auth_token, refresher=self._refresh_auth_token, options=options,
+                               transport=transport, tracer=tracer, cache=cache, codec=codec,
+                               persisted_queries=persisted_queries, lazy_structures=lazy_structures,
+                               account=hashlib.sha256(str(refresh_token).encode()).hexdigest())
+
+        if authenticate:
+            self._refresh_auth_token()
 
     def _refresh_auth_token(self) -> None:
         """
-        Refreshes auth token in all subclasses that use the auth token.
+        Refreshes auth token in all subclasses that use the auth token. Concurrent callers share a single refresh,
+        callers that were waiting on another thread's refresh return as soon as it's done.
         :return: None
         """
+        stale_token = self.auth_token
+
+        with self._refresh_lock:
+            if self.auth_token != stale_token:
+                logger.debug("Lapse authentication token was already refreshed by another thread.")
+                return
+
+            if self.token_store is None:
+                self.auth_token = self._refresh()
+            else:
+                self.auth_token = self._refresh_from_store(stale_token)
+
+            self.journal.refresh_authorization(self.auth_token)
+
+            self._schedule_refresh()
+
+    def _refresh(self) -> str:
+        """
+        Asks the auth server for a new access token.
+        :return: Access token.
+        """
         logger.debug("Refreshing lapse authentication token.")
-        self.auth_token = refresh(self.refresh_token)
-        self.journal.refresh_authorization(self.auth_token)
+        access_token = refresh(self.refresh_token, transport=self.journal.transport)
+        self.refresh_count += 1
+
+        return access_token
+
+    def _refresh_from_store(self, stale_token: str | None) -> str:
+        """
+        Gets an access token from the token store, only refreshing it when the stored one is the one being replaced or
+        is about to expire. The store stays locked meanwhile so other processes wait for this refresh and reuse it.
+        :param stale_token: Access token being replaced.
+        :return: Access token.
+        """
+        with self.token_store.lock():
+            stored_token = self.token_store.get_valid(self.refresh_token, margin=self.refresh_margin)
+
+            if stored_token is not None and stored_token != stale_token:
+                logger.debug("Using lapse authentication token from token store.")
+                return stored_token
+
+            access_token = self._refresh()
+            self.token_store.set(self.refresh_token, access_token)
+
+            return access_token
+
+    def _schedule_refresh(self, when: float | None = None) -> None:
+        """
+        Schedules the next background refresh, by default refresh_margin seconds before the access token expires.
+        :param when: Unix timestamp to refresh at instead.
+        :return: None
+        """
+        if self._scheduled_refresh is not None:
+            self._scheduled_refresh.cancel()
+            self._scheduled_refresh = None
+
+        if not self.proactive_refresh:
+            return
 
-    def upload_photo(self, im: Image,
+        if when is None:
+            expiry = get_token_expiry(self.auth_token)
+            if expiry is None:
+                logger.debug("Could not read access token expiry, not scheduling a background refresh.")
+                return
+
+            # Never refresh more often than every half of the token's remaining lifetime.
+            when = expiry - min(self.refresh_margin, max(expiry - time.time(), 0) / 2)
+
+        # Don't let the scheduler keep this object alive.
+        background_refresh = weakref.WeakMethod(self._background_refresh)
+
+        def callback():
+            method = background_refresh()
+            if method is not None:
+                method()
+
+        self._scheduled_refresh = self.scheduler.schedule(when, callback)
+
+    def _background_refresh(self) -> None:
+        try:
+            self._refresh_auth_token()
+        except Exception as e:
+            logger.error(f"Background refresh of lapse authentication token failed, retrying: {e!r}")
+            self._schedule_refresh(when=time.time() + REFRESH_RETRY_DELAY)
+
+    def close(self) -> None:
+        """
+        Stops refreshing the access token in the background.
+        :return: None
+        """
+        if self._scheduled_refresh is not None:
+            self._scheduled_refresh.cancel()
+            self._scheduled_refresh = None
+
+    def upload_photo(self, im: UploadSource,
                      develop_in: int,
                      file_uuid: str | None = None,
                      taken_at: datetime | None = None,
@@ -41,7 +197,8 @@ class Lapse:
                      timezone: str = "America/New_York") -> DarkRoomMedia:
         """
         Upload an image to your Lapse darkroom
-        :param im: Pillow object of the Image.
+        :param im: Pillow image, JPEG bytes, path to a JPEG file, or binary file object of one. Only Pillow images are
+        re-encoded, files are streamed from disk.
         :param develop_in: How many seconds until the Image should develop.
         :param file_uuid: UUID of the image for backend storage, leave at None unless you know what you're doing.
         :param taken_at: Datetime object of when the image was taken, can be left None to be set automatically to now.
@@ -79,11 +236,12 @@ class Lapse:
         """
         return self.journal.review_snaps(archived=archived, deleted=deleted, shared=shared)
 
-    def upload_instant(self, im: Image, user: str | Profile, file_uuid: str | None = None, im_id: str | None = None,
-                       caption: str | None = None, time_limit: int = 10):
+    def upload_instant(self, im: UploadSource, user: str | Profile, file_uuid: str | None = None,
+                       im_id: str | None = None, caption: str | None = None, time_limit: int = 10):
         """
         Uploads an instant to Lapse server and sends it to a profile.
-        :param im: Pillow Image object of the image.
+        :param im: Pillow image, JPEG bytes, path to a JPEG file, or binary file object of one. Only Pillow images are
+        re-encoded, use send_instants to send one image to several users with a single encoding and upload.
         :param user: ID / Object of user to send it to.
         :param file_uuid: UUID of the file, leave this to None unless you know what you're doing
         :param im_id: UUID of the instant, leave this to None unless you know what you're doing
@@ -98,6 +256,23 @@ class Lapse:
         return self.journal.upload_instant(im=im, user_id=user, file_uuid=file_uuid, im_id=im_id, caption=caption,
                                            time_limit=time_limit)
 
+    def send_instants(self, im: UploadSource, users: Iterable[str | Profile], file_uuid: str | None = None,
+                      caption: str | None = None, time_limit: int = 10, max_destinations: int = 25) -> dict[str, str]:
+        """
+        Uploads an instant to Lapse server once and sends it to many profiles.
+        :param im: Pillow image, JPEG bytes, path to a JPEG file, or binary file object of one.
+        :param users: IDs / Objects of the users to send it to.
+        :param file_uuid: UUID of the file, leave this to None unless you know what you're doing
+        :param caption: Caption of the instant
+        :param time_limit: How long they can view the instant for
+        :param max_destinations: Maximum amount of users sent to in a single call.
+        :return: dict of the ID of each user's instant, keyed by user ID.
+        """
+        user_ids = [user.user_id if isinstance(user, Profile) else user for user in users]
+
+        return self.journal.send_instants(im=im, user_ids=user_ids, file_uuid=file_uuid, caption=caption,
+                                          time_limit=time_limit, max_destinations=max_destinations)
+
     def create_status_update(self, text: str, msg_id: str | None = None):
         """
         Creates a status update on your Journal
@@ -127,23 +302,42 @@ class Lapse:
 
         self.journal.send_kudos(user)
 
-    def get_friends_feed(self, count: int = 10):
+    def get_friends_feed(self, count: int = 10, profile: str = "full"):
         """
         Gets your friend upload feed.
         :param count: How many collection to grab.
+        :param profile: How much of each feed item to request, "full", "media-only", or "ids-only", see
+        Journal.get_friends_feed.
         :return: A list of profiles
         """
-        return self.journal.get_friends_feed(count=count)
+        return self.journal.get_friends_feed(count=count, profile=profile)
 
-    def get_profile_by_id(self, user_id: str, album_limit: int = 6, friends_limit: int = 10) -> Profile:
+    def iter_friends_feed(self, page_size: int = 10, limit: int | None = None,
+                          prefetch: int = 0, profile: str = "full") -> Iterator[FriendNode]:
+        """
+        Walks your friends feed page by page, unless prefetch is set a page is only requested once the
+        previous one has been consumed.
+        :param page_size: How many feed items to request per page.
+        :param limit: Maximum amount of feed items to get, leave as None to walk the whole feed.
+        :param prefetch: How many pages to fetch ahead in the background while you process the current one.
+        :param profile: How much of each feed item to request, see get_friends_feed.
+        :return: Generator of FriendNodes.
+        """
+        return self.journal.iter_friends_feed(page_size=page_size, limit=limit, prefetch=prefetch, profile=profile)
+
+    def get_profile_by_id(self, user_id: str, album_limit: int = 6, friends_limit: int = 10,
+                          profile: str = "full") -> Profile:
         """
         Get a Profile object
         :param user_id: ID the user of the profile you want to query.
         :param album_limit: Max amount of albums to get.
         :param friends_limit: Max amount of friends to get.
+        :param profile: How much of the profile to request, "full", "media-only", or "ids-only", see
+        Journal.get_profile_by_id.
         :return:
         """
-        return self.journal.get_profile_by_id(user_id=user_id, album_limit=album_limit, friends_limit=friends_limit)
+        return self.journal.get_profile_by_id(user_id=user_id, album_limit=album_limit, friends_limit=friends_limit,
+                                              profile=profile)
 
     def get_current_user(self) -> Profile:
         """
@@ -251,6 +445,19 @@ class Lapse:
         """
         return self.journal.search_for_user(term=term, first=first)
 
+    def iter_search_users(self, term: str, page_size: int = 10, limit: int | None = None,
+                          prefetch: int = 0) -> Iterator[SearchUser]:
+        """
+        Walks the search results for a term page by page, unless prefetch is set a page is only requested once the
+        previous one has been consumed.
+        :param term: Term to search for
+        :param page_size: How many users to request per page.
+        :param limit: Maximum amount of users to get, leave as None to get every result.
+        :param prefetch: How many pages to fetch ahead in the background while you process the current one.
+        :return: Generator of SearchUsers.
+        """
+        return self.journal.iter_search_users(term=term, page_size=page_size, limit=limit, prefetch=prefetch)
+
     def get_profile_by_username(self, username: str, album_limit: int = 6, friends_limit: int = 10) -> Profile:
         """
         Wrapper for Lapse.search_for_user, returns a Profile object from a username.
@@ -288,11 +495,79 @@ class Lapse:
 
         return self.journal.unblock_user(user_id=user)
 
-    def get_album_by_id(self, album_id: str, last: int):
+    def get_album_by_id(self, album_id: str, last: int, profile: str = "full"):
         """
         Gets an album by its ID.
         :param album_id: ID of the album
         :param last: How many items to query from the album.
+        :param profile: How much of each item to request, "full", "media-only", or "ids-only", see
+        Journal.get_album_by_id.
         :return:
         """
-        return self.journal.get_album_by_id(album_id=album_id, last=last)
+        return self.journal.get_album_by_id(album_id=album_id, last=last, profile=profile)
+
+    def iter_album_media(self, album_id: str, page_size: int = 20, limit: int | None = None,
+                         prefetch: int = 0, profile: str = "full") -> Iterator[AlbumMedia]:
+        """
+        Walks an album's media page by page, unless prefetch is set a page is only requested once the
+        previous one has been consumed.
+        :param album_id: ID of the album
+        :param page_size: How many items to request per page.
+        :param limit: Maximum amount of items to get, leave as None to walk the whole album.
+        :param prefetch: How many pages to fetch ahead in the background while you process the current one.
+        :param profile: How much of each item to request, see get_album_by_id.
+        :return: Generator of AlbumMedia.
+        """
+        return self.journal.iter_album_media(album_id=album_id, page_size=page_size, limit=limit,
+                                             prefetch=prefetch, profile=profile)
+
+    def load_media(self, media: Iterable[Snap | AlbumMedia | DarkRoomMedia | Profile], quality: int = 65,
+                   fl_keep_iptc: bool = True, workers: int = 8, ordered: bool = False,
+                   output: str = "image") -> Iterator[BulkResult]:
+        """
+        Downloads the images of many Snaps, AlbumMedia, DarkRoomMedia, or Profiles (profile pictures) at once.
+        :param media: Media to load.
+        :param quality: Quality of the images (1-100)
+        :param fl_keep_iptc: Whether to keep copyright related material.
+        :param workers: How many images to download at once.
+        :param ordered: Whether to yield results in the same order as media, otherwise they're yielded as they finish.
+        :param output: "image" for Pillow images, "bytes" for the encoded JPEGs, "memoryview" for memoryviews over
+        them, or "lazy" for LazyImages that are only decoded when used as images.
+        :return: Generator of BulkResults, BulkResult.item is the media object and BulkResult.value its Pillow image.
+        """
+        return self.journal.load_media(media=media, quality=quality, fl_keep_iptc=fl_keep_iptc, workers=workers,
+                                       ordered=ordered, output=output)
+
+    def upload_photos(self, images: Iterable[UploadSource], develop_in: int, workers: int = 8,
+                      encode_processes: int | None = None, ordered: bool = False, color_temperature: float = 6000,
+                      exposure_value: float = 9, flash: bool = False,
+                      timezone: str = "America/New_York") -> Iterator[BulkResult]:
+        """
+        Uploads many images to your Lapse darkroom at once, overlapping the upload steps of different images.
+        :param images: Images to upload, anything upload_photo takes.
+        :param develop_in: How many seconds until the images should develop.
+        :param workers: How many images to upload at once.
+        :param encode_processes: How many processes encode Pillow images, None uses one per CPU and 0 encodes on the
+        upload threads.
+        :param ordered: Whether to yield results in the same order as images, otherwise they're yielded as they finish.
+        :param color_temperature: See upload_photo.
+        :param exposure_value: See upload_photo.
+        :param flash: See upload_photo.
+        :param timezone: See upload_photo.
+        :return: Generator of BulkResults, BulkResult.item is the image and BulkResult.value its DarkRoomMedia.
+        """
+        return self.journal.upload_photos(images=images, develop_in=develop_in, workers=workers,
+                                          encode_processes=encode_processes, ordered=ordered,
+                                          color_temperature=color_temperature, exposure_value=exposure_value,
+                                          flash=flash, timezone=timezone)
+
+    def batch(self, max_operations: int = 25, raise_errors: bool = True) -> Batch:
+        """
+        Collects reactions, comments, kudos, and blocks and sends them together in as few requests as possible.
+        Each queued operation returns a BatchResult which is filled in once the with block exits.
+        :param max_operations: Maximum amount of operations merged into a single request.
+        :param raise_errors: Whether leaving the with block raises a BatchError when any operation failed, the
+        BatchError holds the failed BatchResults.
+        :return: Batch to use as a context manager.
+        """
+        return self.journal.batch(max_operations=max_operations, raise_errors=raise_errors)
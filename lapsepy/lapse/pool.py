@@ -0,0 +1,189 @@
+import hashlib
+import threading
+import time
+
+from typing import Iterator
+
+from lapsepy.auth.refresher import get_token_expiry
+from lapsepy.auth.scheduler import RefreshScheduler
+from lapsepy.auth.token_store import BaseTokenStore
+from lapsepy.journal.common.transport import Transport
+from lapsepy.journal.common.tracing import Tracer
+from lapsepy.journal.common.metrics import render_prometheus
+from lapsepy.journal.common.cache import ResponseCache
+from lapsepy.journal.common.image_cache import DiskImageCache
+from lapsepy.journal.structures import BaseOptions, Options
+from lapsepy.lapse.lapse import Lapse
+
+import logging
+
+logger = logging.getLogger("lapsepy.lapse.pool.py")
+
+
+class LapsePool:
+    """
+    Manages many Lapse clients, one per account, in a single process. Every account keeps its own Options, so its own
+    headers and device ID, but they all share one connection pool and one background refresh thread, so the amount of
+    sockets and threads depends on how many requests are in flight rather than on how many accounts there are.
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 64, max_retries: int = 0,
+                 timeout: float | None = None, pool_block: bool = False, scheduler_workers: int = 4,
+                 refresh_margin: float = 60, token_store: BaseTokenStore | None = None,
+                 cache: ResponseCache | None = None, image_cache: DiskImageCache | None = None):
+        """
+        :param pool_connections: Amount of hosts to keep connection pools for.
+        :param pool_maxsize: Maximum amount of keep-alive connections to keep open per host, shared by every account.
+        :param max_retries: How many times to retry failed connections.
+        :param timeout: Default timeout in seconds for every request, None waits forever.
+        :param pool_block: Whether to wait for a free connection when the pool is exhausted instead of opening a
+        throwaway connection.
+        :param scheduler_workers: How many background token refreshes can run at once.
+        :param refresh_margin: How many seconds before an access token expires to refresh it in the background.
+        :param token_store: Token store every account shares its access tokens through.
+        :param cache: ResponseCache every account shares, entries are kept apart by a hash of each account's refresh
+        token.
+        :param image_cache: DiskImageCache every account's media loads go through.
+        """
+        # Cookies are never stored, so accounts can't leak them into each other's requests.
+        self.transport = Transport(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                   max_retries=max_retries, timeout=timeout, pool_block=pool_block,
+                                   store_cookies=False, image_cache=image_cache)
+        self.scheduler = RefreshScheduler(workers=scheduler_workers)
+
+        # Every account reports its calls to the same tracer, add hooks to it to trace the whole pool.
+        self.tracer = Tracer()
+
+        self.refresh_margin = refresh_margin
+        self.token_store = token_store
+        self.cache = cache
+
+        self._clients: dict[str, Lapse] = {}
+        self._lock = threading.Lock()
+
+    def add(self, refresh_token: str, options: BaseOptions | None = None, key: str | None = None,
+            authenticate: bool = True) -> Lapse:
+        """
+        Adds an account to the pool.
+        :param refresh_token: Token gotten from Lapse to refresh the account's access token.
+        :param options: Options object with the account's headers, leave as None to generate them, which gives the
+        account its own device ID.
+        :param key: Name to look the account up by, it's used in metrics and error messages. Leave as None to use the
+        first 16 characters of the sha256 of the refresh token, the same as lapse.journal.account[:16].
+        :param authenticate: Whether to get an access token right away.
+        :return: The account's Lapse client.
+        """
+        if key is None:
+            # Refresh tokens can't be revoked, so they never end up in metrics labels or exceptions.
+            key = hashlib.sha256(str(refresh_token).encode()).hexdigest()[:16]
+
+        if options is None:
+            options = Options()
+
+        with self._lock:
+            if key in self._clients:
+                raise KeyError(f"Account {key!r} is already in the pool.")
+
+            lapse = Lapse(refresh_token=refresh_token, options=options, authenticate=False,
+                          refresh_margin=self.refresh_margin, scheduler=self.scheduler, token_store=self.token_store,
+                          transport=self.transport, tracer=self.tracer, cache=self.cache)
+            self._clients[key] = lapse
+
+        if authenticate:
+            lapse._refresh_auth_token()
+
+        return lapse
+
+    def remove(self, key: str) -> Lapse:
+        """
+        Removes an account from the pool and stops refreshing its access token.
+        :param key: Key the account was added with.
+        :return: The account's Lapse client.
+        """
+        with self._lock:
+            lapse = self._clients.pop(key)
+
+        lapse.close()
+        return lapse
+
+    def get(self, key: str) -> Lapse:
+        """
+        :param key: Key the account was added with.
+        :return: The account's Lapse client.
+        """
+        return self._clients[key]
+
+    def __getitem__(self, key: str) -> Lapse:
+        return self.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._clients
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._clients))
+
+    def items(self) -> list[tuple[str, Lapse]]:
+        """
+        :return: List of (key, Lapse client) pairs.
+        """
+        with self._lock:
+            return list(self._clients.items())
+
+    def metrics(self) -> dict:
+        """
+        Gets the call counters of every account, plus their totals. See Journal.metrics for per operation metrics.
+        :return: dict with an "accounts" dict of per account metrics keyed by account key, and a "total" dict.
+        """
+        now = time.time()
+        accounts = {}
+
+        for key, lapse in self.items():
+            expiry = get_token_expiry(lapse.auth_token)
+            stats = lapse.journal.metrics.total()
+            accounts[key] = {
+                "calls": stats.count,
+                "errors": stats.errors,
+                "refreshes": lapse.refresh_count,
+                "token_expires_in": None if expiry is None else expiry - now
+            }
+
+        total = {
+            "accounts": len(accounts),
+            "calls": sum(account["calls"] for account in accounts.values()),
+            "errors": sum(account["errors"] for account in accounts.values()),
+            "refreshes": sum(account["refreshes"] for account in accounts.values()),
+            "scheduled_refreshes": len(self.scheduler)
+        }
+
+        return {"accounts": accounts, "total": total}
+
+    def to_prometheus(self, prefix: str = "lapsepy") -> str:
+        """
+        Renders every account's per operation metrics in the Prometheus text exposition format, labeled by account key.
+        :param prefix: Prefix of the metric names.
+        :return: The metrics as text.
+        """
+        return render_prometheus([({"account": key}, lapse.journal.metrics) for key, lapse in self.items()],
+                                 prefix=prefix)
+
+    def close(self) -> None:
+        """
+        Stops every account's background refreshes and closes the shared connection pool.
+        :return: None
+        """
+        with self._lock:
+            clients, self._clients = self._clients, {}
+
+        for lapse in clients.values():
+            lapse.close()
+
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -27,5 +27,8 @@ setup(name='lapsepy',
           'Operating System :: Microsoft :: Windows :: Windows 10',
           'Programming Language :: Python :: 3',
       ],
-      install_requires=requirements
+      install_requires=requirements,
+      extras_require={
+          "async": ["aiohttp"]
+      }
       )
@@ -0,0 +1,38 @@
+"""
+Compares how long large responses took to decode when _sync_journal_call parsed them twice with the standard library,
+with parsing them once with every installed codec.
+
+    python tests/benchmark_codec.py
+"""
+import json
+import time
+
+from tests_codec import feed_payload, profile_payload, _installed_codecs
+
+ROUNDS = 20
+
+
+def main():
+    payloads = {"FriendsFeedItemsGraphQLQuery": feed_payload(), "ProfileDetailsGraphQLQuery": profile_payload()}
+
+    for operation_name, payload in payloads.items():
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            # How _sync_journal_call parsed every response before, once for the errors and once to return it.
+            json.loads(payload).get("errors")
+            json.loads(payload)
+        twice = (time.perf_counter() - start) / ROUNDS
+
+        timings = []
+        for codec in _installed_codecs():
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                codec.loads(payload)
+            timings.append((codec.name, (time.perf_counter() - start) / ROUNDS))
+
+        print(f"{operation_name} ({len(payload) / 1024:.0f}KiB): stdlib twice {twice * 1e3:.2f}ms, " +
+              ", ".join(f"{name} once {timing * 1e3:.2f}ms" for name, timing in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Compares rendering the headers of a call by walking the Options' attributes every time with the compiled headers
+BaseOptions.to_headers uses.
+
+    python tests/benchmark_options.py
+"""
+import time
+
+from lapsepy.journal.structures import Options
+
+from tests_options import render_uncompiled
+
+CALLS = 20000
+
+
+def main():
+    options = Options()
+
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        render_uncompiled(options, "SendKudosGraphQLMutation", "token")
+    uncompiled = (time.perf_counter() - start) / CALLS
+
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        options.to_headers("SendKudosGraphQLMutation", "token")
+    compiled = (time.perf_counter() - start) / CALLS
+
+    print(f"Headers per call: uncompiled {uncompiled * 1e6:.2f}us, compiled {compiled * 1e6:.2f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Compares parsing a large friends feed eagerly with wrapping it in a LazyFriendsFeed.
+
+    python tests/benchmark_structures.py
+"""
+import time
+
+from lapsepy.journal import Journal
+from lapsepy.journal.structures import LazyFriendsFeed
+
+from tests_structures import _feed_edges
+
+ITEMS = 1000
+
+
+def main():
+    edges = _feed_edges(ITEMS)
+    journal = Journal(authorization="token", refresher=lambda: None)
+
+    start = time.perf_counter()
+    journal._parse_friend_nodes(edges)
+    eager = time.perf_counter() - start
+
+    start = time.perf_counter()
+    feed = LazyFriendsFeed(edges)
+    lazy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ids = [node.entries[0].id for node in feed]
+    touched = time.perf_counter() - start
+
+    print(f"Parsing a {len(ids)} item feed: eager {eager * 1000:.2f}ms, lazy {lazy * 1000:.3f}ms, lazy reading one "
+          f"snap ID per item {touched * 1000:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Compares requests.post, which opens a connection per call, with the pooled Transport against a local stub server.
+
+    python tests/benchmark_transport.py
+"""
+import time
+
+import requests
+
+from lapsepy.journal.common.transport import Transport
+
+from stub_server import StubServer
+
+REQUESTS = 100
+
+
+def main():
+    query = {"operationName": "StubQuery", "query": "query StubQuery { x }", "variables": None}
+
+    with StubServer() as server:
+        url = server.url + "/graphql"
+
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            requests.post(url, json=query)
+        unpooled = REQUESTS / (time.perf_counter() - start)
+        unpooled_connections = len(server.connections)
+
+        server.connections.clear()
+
+        transport = Transport()
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            transport.post(url, json=query)
+        pooled = REQUESTS / (time.perf_counter() - start)
+
+        print(f"requests.post: {unpooled:.0f} req/s over {unpooled_connections} connections")
+        print(f"Transport.post: {pooled:.0f} req/s over {len(server.connections)} connections")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+"""
+Unsigned JWTs for the tests that run without a refresh token, lapsepy only reads their claims.
+"""
+import base64
+import json
+
+
+def make_token(exp: float, subject: str = "user") -> str:
+    def encode(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    return f"{encode({'alg': 'HS256'})}.{encode({'sub': subject, 'exp': exp})}.signature"
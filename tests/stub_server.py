@@ -0,0 +1,85 @@
+"""
+Local stand-in for the Lapse HTTP services, used by the tests that can run without a refresh token.
+"""
+import json
+import threading
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class StubRequest:
+    def __init__(self, method: str, path: str, headers: dict, body: bytes, client_address: tuple):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+        self.client_address = client_address
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class StubServer:
+    """
+    Keep-alive HTTP/1.1 server on localhost, every request is recorded and answered by `responder`.
+
+    `responder` takes a StubRequest and returns either a JSON serializable object, bytes, or a tuple of
+    (status_code, body).
+    """
+
+    def __init__(self, responder=None):
+        self.responder = responder or (lambda request: {"data": {}})
+        self.requests: list[StubRequest] = []
+        self.connections: set[tuple] = set()
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length) if length else b""
+
+                request = StubRequest(self.command, self.path, dict(self.headers), body, self.client_address)
+                with stub._lock:
+                    stub.requests.append(request)
+                    stub.connections.add(self.client_address)
+
+                status, payload = 200, stub.responder(request)
+                if isinstance(payload, tuple):
+                    status, payload = payload
+                if not isinstance(payload, bytes):
+                    payload = json.dumps(payload).encode()
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = _handle
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
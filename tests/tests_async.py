@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import time
+
+from unittest import TestCase, mock, skipIf
+
+from PIL import Image
+
+from lapsepy import AsyncLapse
+from lapsepy.journal.common import async_transport
+from lapsepy.journal.common.async_transport import AsyncTransport
+from lapsepy.journal.structures import AlbumMedia
+
+from stub_server import StubServer
+
+CONCURRENT_CALLS = 40
+SERVER_DELAY = 0.05
+SEARCH_RESULTS = 5
+
+
+@skipIf(async_transport.aiohttp is None, "aiohttp isn't installed.")
+class TestAsyncLapse(TestCase):
+    def setUp(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+        def responder(request):
+            with self.lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            time.sleep(SERVER_DELAY)
+            with self.lock:
+                self.in_flight -= 1
+
+            if request.method == "PUT":
+                return b""
+            if request.method == "GET":
+                return b"jpeg" + request.path.encode()
+
+            body = request.json()
+            variables = body["variables"]
+            if body["operationName"] == "ImageUploadURLGraphQLQuery":
+                return {"data": {"imageUploadURL": self.server.url + "/aws"}}
+            if request.headers["authorization"] == "expired":
+                return {"errors": [{"message": "Token expired at 2023-11-01"}]}
+            if body["operationName"] == "SearchUsersGraphQLQuery":
+                start = int(variables.get("after") or 0)
+                end = min(start + variables["first"], SEARCH_RESULTS)
+                edges = [{"cursor": str(i + 1), "node": {"id": f"user{i}", "username": f"user{i}"}}
+                         for i in range(start, end)]
+                return {"data": {"searchUsers": {"edges": edges, "pageInfo": {"endCursor": str(end),
+                                                                              "hasNextPage": end < SEARCH_RESULTS}}}}
+            if body["operationName"] == "BatchMutation":
+                return {"data": {name.split("_")[0] + "_sendKudos": {"success": True} for name in variables}}
+            return {"data": {"sendKudos": {"success": True}}}
+
+        self.server = StubServer(responder).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _lapse(self, max_concurrency: int = 4, transport: AsyncTransport | None = None) -> AsyncLapse:
+        lapse = AsyncLapse("refresh", max_concurrency=max_concurrency, transport=transport)
+        lapse.lapse.journal.request_url = self.server.url + "/graphql"
+        return lapse
+
+    def test_lazy_authentication(self):
+        async def main():
+            async with self._lapse(max_concurrency=4) as lapse:
+                assert lapse.auth_token is None
+                await asyncio.gather(*[lapse.send_kudos("user") for _ in range(8)])
+                return lapse.auth_token
+
+        with mock.patch("lapsepy.lapse.lapse.refresh", return_value="access") as refresh:
+            assert asyncio.run(main()) == "access"
+
+        refresh.assert_called_once()
+        assert refresh.call_args.args == ("refresh",)
+        assert self.server.requests[0].headers["authorization"] == "access"
+
+    def test_concurrency_limit(self):
+        async def main():
+            async with self._lapse(max_concurrency=8) as lapse:
+                await asyncio.gather(*[lapse.send_kudos("user") for _ in range(CONCURRENT_CALLS)])
+
+        with mock.patch("lapsepy.lapse.lapse.refresh", return_value="access"):
+            start = time.perf_counter()
+            asyncio.run(main())
+            elapsed = time.perf_counter() - start
+
+        assert len(self.server.requests) == CONCURRENT_CALLS
+        assert 1 < self.max_in_flight <= 8
+        assert len(self.server.connections) <= 8
+        assert elapsed < CONCURRENT_CALLS * SERVER_DELAY
+
+    def test_batch_and_iterators(self):
+        async def main():
+            async with self._lapse(max_concurrency=4) as lapse:
+                async with lapse.batch() as batch:
+                    results = [batch.send_kudos(f"user{i}") for i in range(3)]
+
+                users = [user.user_id async for user in lapse.iter_search_users("user", page_size=2)]
+                return results, users
+
+        with mock.patch("lapsepy.lapse.lapse.refresh", return_value="access"):
+            results, users = asyncio.run(main())
+
+        assert all(result.ok for result in results)
+        assert users == [f"user{i}" for i in range(SEARCH_RESULTS)]
+        # One batched mutation, then three pages of search results.
+        assert len(self.server.requests) == 4
+
+    def test_requests_use_aiohttp(self):
+        async def main():
+            async with self._lapse() as lapse:
+                await lapse.send_kudos("user")
+                await lapse.upload_photo(Image.new("RGB", (8, 8)), develop_in=10)
+
+        # Nothing goes through the blocking requests transport.
+        with mock.patch("lapsepy.lapse.lapse.refresh", return_value="access"), \
+                mock.patch("lapsepy.journal.common.transport.Transport.request", side_effect=AssertionError):
+            asyncio.run(main())
+
+        assert [request.method for request in self.server.requests] == ["POST", "POST", "PUT", "POST"]
+        assert self.server.requests[2].body[:2] == b"\xff\xd8"
+
+    def test_shared_transport(self):
+        async def main():
+            transport = AsyncTransport(max_concurrency=3)
+            async with transport:
+                lapses = [self._lapse(transport=transport) for _ in range(3)]
+                await asyncio.gather(*[lapse.send_kudos("user") for lapse in lapses for _ in range(6)])
+
+                # Closing a client leaves the transport it was given open for the others.
+                await lapses[0].close()
+                await lapses[1].send_kudos("user")
+
+        with mock.patch("lapsepy.lapse.lapse.refresh", return_value="access"):
+            asyncio.run(main())
+
+        assert len(self.server.requests) == 19
+        assert self.max_in_flight <= 3
+        assert len(self.server.connections) <= 3
+
+    def test_expired_token_refreshed_once(self):
+        async def main():
+            async with self._lapse() as lapse:
+                lapse.lapse.journal.refresh_authorization("expired")
+                await asyncio.gather(*[lapse.send_kudos("user") for _ in range(4)])
+
+        with mock.patch("lapsepy.lapse.lapse.refresh", return_value="access") as refresh:
+            asyncio.run(main())
+
+        refresh.assert_called_once()
+        assert [request.headers["authorization"] for request in self.server.requests[-4:]] == ["access"] * 4
+
+    def test_load_media(self):
+        media = [AlbumMedia(media_id=f"media{i}", taken_at=None, added_at=None, capturer_id=None) for i in range(3)]
+
+        async def main():
+            async with self._lapse() as lapse:
+                return [result async for result in lapse.load_media(media + [12], ordered=True, output="bytes")]
+
+        with mock.patch.object(AlbumMedia, "BASE_URL", self.server.url + "/"):
+            results = asyncio.run(main())
+
+        assert [result.value for result in results[:3]] == [b"jpeg/q_65,fl_keep_itc/media%d.jpeg" % i for i in range(3)]
+        assert isinstance(results[3].error, TypeError)
+
+    def test_aiohttp_missing(self):
+        with mock.patch.object(async_transport, "aiohttp", None):
+            with self.assertRaises(ImportError):
+                AsyncLapse("refresh")
@@ -0,0 +1,171 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from unittest import TestCase, mock, skipIf
+
+from lapsepy import Lapse
+from lapsepy.auth.refresher import get_token_expiry
+from lapsepy.auth.scheduler import RefreshScheduler
+from lapsepy.auth.token_store import BaseTokenStore, FileTokenStore, SQLiteTokenStore
+
+from fake_tokens import make_token
+
+
+class TestTokenExpiry(TestCase):
+    def test_get_token_expiry(self):
+        assert get_token_expiry(make_token(1700000000)) == 1700000000
+
+    def test_get_token_expiry_invalid(self):
+        assert get_token_expiry(None) is None
+        assert get_token_expiry("not-a-jwt") is None
+        assert get_token_expiry("a.!!!.c") is None
+
+
+class TestRefreshScheduler(TestCase):
+    def test_runs_in_order(self):
+        scheduler = RefreshScheduler(workers=1)
+        ran = []
+        done = threading.Event()
+
+        scheduler.schedule(time.time() + 0.2, lambda: (ran.append(2), done.set()))
+        scheduler.schedule(time.time() + 0.1, lambda: ran.append(1))
+
+        assert done.wait(2)
+        assert ran == [1, 2]
+
+    def test_cancel(self):
+        scheduler = RefreshScheduler()
+        ran = []
+
+        scheduler.schedule(time.time() + 0.1, lambda: ran.append(1)).cancel()
+        time.sleep(0.3)
+
+        assert ran == []
+
+
+class TestProactiveRefresh(TestCase):
+    def test_refreshes_before_expiry(self):
+        tokens = []
+
+        def refresh(refresh_token, transport=None):
+            tokens.append(make_token(time.time() + 1))
+            return tokens[-1]
+
+        with mock.patch("lapsepy.lapse.lapse.refresh", side_effect=refresh):
+            lapse = Lapse("refresh", refresh_margin=0.5, scheduler=RefreshScheduler())
+            time.sleep(0.8)
+
+        lapse.close()
+
+        assert len(tokens) == 2
+        assert lapse.journal.auth_token == tokens[-1]
+
+    def test_concurrent_refreshes_are_single_flighted(self):
+        calls = []
+
+        def refresh(refresh_token, transport=None):
+            calls.append(refresh_token)
+            time.sleep(0.1)
+            return make_token(time.time() + 3600)
+
+        with mock.patch("lapsepy.lapse.lapse.refresh", side_effect=refresh):
+            lapse = Lapse("refresh", scheduler=RefreshScheduler())
+            threads = [threading.Thread(target=lapse._refresh_auth_token) for _ in range(10)]
+            [thread.start() for thread in threads]
+            [thread.join() for thread in threads]
+
+        lapse.close()
+
+        assert len(calls) == 2
+
+
+def _start_worker(store_path: str, calls_path: str):
+    def refresh(refresh_token, transport=None):
+        with open(calls_path, "a") as f:
+            f.write("refresh\n")
+        time.sleep(0.2)
+        return make_token(time.time() + 3600)
+
+    with mock.patch("lapsepy.lapse.lapse.refresh", side_effect=refresh):
+        Lapse("refresh", proactive_refresh=False, token_store=FileTokenStore(store_path))
+
+
+class TestTokenStore(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _stores(self):
+        return [FileTokenStore(os.path.join(self.directory.name, "tokens.json")),
+                SQLiteTokenStore(os.path.join(self.directory.name, "tokens.sqlite"))]
+
+    def test_round_trip(self):
+        for store in self._stores():
+            token = make_token(time.time() + 3600)
+
+            assert store.get("refresh") is None
+            store.set("refresh", token)
+            assert store.get("refresh") == token
+            assert store.get_valid("refresh", margin=60) == token
+            assert store.get_valid("refresh", margin=7200) is None
+
+    def test_incomplete_store(self):
+        class GetOnlyTokenStore(BaseTokenStore):
+            def get(self, refresh_token: str) -> str | None:
+                return None
+
+        with self.assertRaises(TypeError):
+            GetOnlyTokenStore()
+
+    @skipIf(os.name == "nt", "POSIX permissions")
+    def test_owner_only(self):
+        for store in self._stores():
+            store.set("refresh", make_token(time.time() + 3600))
+            assert os.stat(store.path).st_mode & 0o777 == 0o600
+
+    def test_refresh_token_not_stored(self):
+        for store in self._stores():
+            store.set("my-refresh-token", make_token(time.time() + 3600))
+
+            with open(store.path, "rb") as f:
+                assert b"my-refresh-token" not in f.read()
+
+    def test_cold_start_uses_stored_token(self):
+        for store in self._stores():
+            token = make_token(time.time() + 3600)
+            store.set("refresh", token)
+
+            with mock.patch("lapsepy.lapse.lapse.refresh") as refresh:
+                lapse = Lapse("refresh", proactive_refresh=False, token_store=store)
+
+            refresh.assert_not_called()
+            assert lapse.journal.auth_token == token
+
+    def test_expired_token_is_replaced(self):
+        for store in self._stores():
+            store.set("refresh", make_token(time.time() - 10))
+            new_token = make_token(time.time() + 3600)
+
+            with mock.patch("lapsepy.lapse.lapse.refresh", return_value=new_token):
+                lapse = Lapse("refresh", proactive_refresh=False, token_store=store)
+
+            assert lapse.auth_token == new_token
+            assert store.get("refresh") == new_token
+
+    @skipIf(os.name == "nt", "Needs fork.")
+    def test_workers_share_one_refresh(self):
+        store_path = os.path.join(self.directory.name, "tokens.json")
+        calls_path = os.path.join(self.directory.name, "calls")
+
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_start_worker, args=(store_path, calls_path)) for _ in range(4)]
+        [worker.start() for worker in workers]
+        [worker.join() for worker in workers]
+
+        with open(calls_path) as f:
+            assert len(f.readlines()) == 1
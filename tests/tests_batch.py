@@ -0,0 +1,116 @@
+import re
+
+from lapsepy.journal import Journal
+from lapsepy.journal.common.exceptions import BatchError
+from lapsepy.journal.factory.batch_factory import BatchGQL
+from lapsepy.journal.factory.media_factory import AddReactionGQL
+from lapsepy.journal.factory.profile_factory import CurrentUserGQL
+
+from unittest import TestCase
+
+from stub_server import StubServer
+
+MUTATIONS = 20
+
+
+def responder(request):
+    body = request.json()
+    variables = body["variables"]
+
+    # Lone operations aren't aliased.
+    if not body["operationName"].startswith("Batch"):
+        field = re.search(r"\{ (\w+)\(", body["query"]).group(1)
+        return {"data": {field: {"__typename": "Result", "success": True}}}
+
+    data = {}
+    errors = []
+    for alias, field in re.findall(r"(b\d+_\w+): (\w+)", body["query"]):
+        prefix = alias[:alias.index("_") + 1]
+        if variables[prefix + "input"]["id"] == "bad":
+            data[alias] = None
+            errors.append({"message": "Media not found", "path": [alias]})
+        elif variables[prefix + "input"]["id"] == "unsuccessful":
+            data[alias] = {"__typename": "Result", "success": False}
+        else:
+            data[alias] = {"__typename": "Result", "success": True}
+
+    return {"data": data, "errors": errors} if errors else {"data": data}
+
+
+class TestBatch(TestCase):
+    def setUp(self):
+        self.server = StubServer(responder).start()
+        self.journal = Journal(authorization="token", refresher=lambda: None)
+        self.journal.request_url = self.server.url + "/graphql"
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_mutations_share_one_request(self):
+        with self.journal.batch() as batch:
+            results = [batch.add_reaction(f"msg{i}", "👍") for i in range(MUTATIONS // 2)]
+            results += [batch.send_kudos(f"user{i}") for i in range(MUTATIONS // 2)]
+
+        assert len(self.server.requests) == 1
+        assert all(result.ok for result in results)
+        assert results[0].result()["data"]["addMediaReaction"]["success"]
+        assert results[-1].result()["data"]["sendKudos"]["success"]
+
+        variables = self.server.requests[0].json()["variables"]
+        assert len(variables) == MUTATIONS and variables["b3_input"]["id"] == "msg3"
+
+    def test_max_operations(self):
+        with self.journal.batch(max_operations=8) as batch:
+            for i in range(MUTATIONS):
+                batch.block_profile(f"user{i}")
+
+        assert len(self.server.requests) == 3
+
+    def test_errors_are_demultiplexed(self):
+        batch = self.journal.batch()
+        good = batch.add_reaction("msg", "👍")
+        bad = batch.add_reaction("bad", "👍")
+        unsuccessful = batch.send_kudos("unsuccessful")
+
+        self.assertRaises(BatchError, batch.__exit__, None, None, None)
+
+        assert len(self.server.requests) == 1
+        assert good.ok
+        assert str(bad.error) == "Unknown Error: Media not found"
+        assert str(unsuccessful.error).startswith("Error sending kudos")
+
+    def test_exception_discards_batch(self):
+        with self.assertRaises(RuntimeError):
+            with self.journal.batch() as batch:
+                batch.send_kudos("user")
+                raise RuntimeError
+
+        assert len(self.server.requests) == 0
+
+    def test_single_operation_is_not_rewritten(self):
+        with self.journal.batch() as batch:
+            result = batch.unblock_profile("user")
+
+        assert self.server.requests[0].json()["operationName"] == "UnblockProfileGraphQLMutation"
+        assert result.ok
+
+
+class TestBatchGQL(TestCase):
+    def test_merge(self):
+        merged = BatchGQL([AddReactionGQL("a", "👍"), AddReactionGQL("b", "👎")])
+
+        assert merged.query == ("mutation BatchMutation($b0_input: AddMediaReactionInput!, "
+                                "$b1_input: AddMediaReactionInput!) { "
+                                "b0_addMediaReaction: addMediaReaction(input: $b0_input) { __typename success } "
+                                "b1_addMediaReaction: addMediaReaction(input: $b1_input) { __typename success } }")
+        assert merged.variables == {"b0_input": {"id": "a", "reaction": "👍"},
+                                    "b1_input": {"id": "b", "reaction": "👎"}}
+
+    def test_fragments_are_deduplicated(self):
+        merged = BatchGQL([CurrentUserGQL(), CurrentUserGQL()])
+
+        assert merged.query.count("fragment UserDetails") == 1
+        assert "b1_user: user" in merged.query
+
+    def test_rejects_mixed_operation_types(self):
+        self.assertRaises(ValueError, BatchGQL, [AddReactionGQL("a", "👍"), CurrentUserGQL()])
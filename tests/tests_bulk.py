@@ -0,0 +1,76 @@
+import io
+import time
+
+from datetime import datetime
+
+from PIL import Image
+
+from lapsepy.journal import Journal
+from lapsepy.journal.structures import AlbumMedia
+
+from unittest import TestCase, mock
+
+from stub_server import StubServer
+
+ALBUM_SIZE = 30
+DELAY = 0.05
+
+
+def _jpeg() -> bytes:
+    bytes_io = io.BytesIO()
+    Image.new("RGB", (8, 8), color=(255, 0, 0)).save(bytes_io, format="jpeg")
+    return bytes_io.getvalue()
+
+
+class TestLoadMedia(TestCase):
+    def setUp(self):
+        jpeg = _jpeg()
+
+        def responder(request):
+            time.sleep(DELAY)
+            if "missing" in request.path:
+                return 404, {"error": "not found"}
+            return jpeg
+
+        self.server = StubServer(responder).start()
+
+        base_url = mock.patch.object(AlbumMedia, "BASE_URL", self.server.url + "/")
+        base_url.start()
+        self.addCleanup(base_url.stop)
+
+        self.journal = Journal(authorization="token", refresher=lambda: None)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _album_media(self, media_id: str) -> AlbumMedia:
+        return AlbumMedia(added_at=datetime.now(), media_id=media_id, taken_at=datetime.now(), capturer_id="user",
+                          transport=self.journal.transport)
+
+    def test_load_media_reports_failures(self):
+        media = [self._album_media(f"media{i}") for i in range(ALBUM_SIZE)]
+        media.insert(5, self._album_media("missing"))
+
+        results = list(self.journal.load_media(media, workers=8))
+
+        assert len(results) == ALBUM_SIZE + 1
+        failed = [result for result in results if not result.ok]
+        assert len(failed) == 1 and failed[0].item.id == "missing" and failed[0].index == 5
+        assert all(result.value.size == (8, 8) for result in results if result.ok)
+
+    def test_load_media_ordered(self):
+        media = [self._album_media(f"media{i}") for i in range(ALBUM_SIZE)]
+
+        results = list(self.journal.load_media(iter(media), workers=8, ordered=True))
+
+        assert [result.item for result in results] == media
+
+    def test_load_media_concurrent(self):
+        media = [self._album_media(f"media{i}") for i in range(ALBUM_SIZE)]
+
+        start = time.perf_counter()
+        list(self.journal.load_media(media, workers=10))
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < ALBUM_SIZE * DELAY
+        assert len(self.server.connections) <= 10
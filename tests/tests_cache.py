@@ -0,0 +1,143 @@
+import time
+
+import requests
+
+from lapsepy import Lapse
+from lapsepy.journal import Journal
+from lapsepy.journal.common.cache import ResponseCache
+from lapsepy.journal.factory.friends_factory import SearchUsersGQL
+from lapsepy.journal.structures import Options
+
+from unittest import TestCase, mock
+
+from stub_server import StubServer
+
+
+def responder(request):
+    body = request.json()
+
+    if body["operationName"] == "SearchUsersGraphQLQuery":
+        term = body["variables"]["searchTerm"]
+        return {"data": {"searchUsers": {"edges": [{"node": {"id": term, "username": term}}],
+                                         "pageInfo": {"hasNextPage": False}}}}
+    if body["operationName"] == "SaveBioGraphQLMutation":
+        return {"data": {"saveBio": {"__typename": "SaveBioPayload", "success": True}}}
+    if body["operationName"] == "ProfileDetailsGraphQLQuery":
+        # Everyone sees their own profile, to tell which account a cached response belonged to.
+        user = request.headers["authorization"]
+        return {"data": {"profile": {"id": user, "username": user}}}
+    if body["operationName"] == "AddReactionGraphQLMutation":
+        return {"data": {"addMediaReaction": {"__typename": "AddMediaReactionPayload", "success": True}}}
+
+    return {"errors": [{"message": "Internal server error"}]}
+
+
+class TestResponseCache(TestCase):
+    def setUp(self):
+        self.server = StubServer(responder).start()
+        self.cache = ResponseCache()
+        self.journal = self._journal()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _journal(self, authorization: str = "token") -> Journal:
+        journal = Journal(authorization=authorization, refresher=lambda: None, cache=self.cache)
+        journal.request_url = self.server.url + "/graphql"
+        return journal
+
+    def test_repeated_reads_are_cached(self):
+        for _ in range(5):
+            assert self.journal.search_for_user("alice")[0].username == "alice"
+        self.journal.search_for_user("bob")
+
+        assert len(self.server.requests) == 2
+        assert self.cache.hits == 4 and self.cache.misses == 2
+
+    def test_variables_are_normalized(self):
+        first = self.cache.make_key("account", {"operationName": "SearchUsersGraphQLQuery",
+                                                "variables": {"searchTerm": "a", "first": 10}})
+        second = self.cache.make_key("account", {"operationName": "SearchUsersGraphQLQuery",
+                                                 "variables": {"first": 10, "searchTerm": "a"}})
+        assert first == second
+
+    def test_accounts_are_kept_apart(self):
+        self.journal.search_for_user("alice")
+        self._journal(authorization="other token").search_for_user("alice")
+
+        assert len(self.server.requests) == 2
+
+    def test_shared_options(self):
+        options = Options()
+        clients = [Lapse(refresh_token, options=options, authenticate=False, proactive_refresh=False,
+                         cache=self.cache) for refresh_token in ("alice refresh", "bob refresh")]
+
+        for client, access_token in zip(clients, ("alice", "bob")):
+            client.journal.request_url = self.server.url + "/graphql"
+            client.journal.auth_token = access_token
+
+        # Same device ID, different accounts.
+        for _ in range(2):
+            assert [client.get_profile_by_id("me").user_id for client in clients] == ["alice", "bob"]
+        assert len(self.server.requests) == 2 and self.cache.hits == 2
+
+    def test_related_mutation_invalidates(self):
+        self.journal.search_for_user("alice")
+        self.journal.add_reaction("msg", "👍")
+        self.journal.search_for_user("alice")
+        assert len(self.server.requests) == 2
+
+        self.journal.modify_bio("new bio")
+        self.journal.search_for_user("alice")
+        assert len(self.server.requests) == 4
+
+    def test_raising_mutation_invalidates(self):
+        self.journal.search_for_user("alice")
+
+        with mock.patch.object(self.journal.transport, "post", side_effect=requests.exceptions.ConnectionError):
+            self.assertRaises(requests.exceptions.ConnectionError, self.journal.modify_bio, "new bio")
+
+        self.journal.search_for_user("alice")
+        assert len(self.server.requests) == 2
+
+    def test_unknown_mutation_invalidates_account(self):
+        self.journal.search_for_user("alice")
+
+        with self.journal.batch(raise_errors=False) as batch:
+            batch.add_reaction("msg", "👍")
+            batch.add_reaction("msg", "👎")
+
+        self.journal.search_for_user("alice")
+        assert len(self.server.requests) == 3
+
+    def test_errors_are_not_cached(self):
+        for _ in range(2):
+            self.assertRaises(Exception, self.journal.get_current_user)
+
+        assert len(self.server.requests) == 2
+
+    def test_ttl(self):
+        self.cache.ttls["SearchUsersGraphQLQuery"] = 0.05
+
+        self.journal.search_for_user("alice")
+        time.sleep(0.1)
+        self.journal.search_for_user("alice")
+
+        assert len(self.server.requests) == 2
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=3, max_bytes=100)
+
+        keys = [cache.make_key("account", SearchUsersGQL(term=str(i)).to_dict()) for i in range(4)]
+        for key in keys[:3]:
+            cache.set(key, b"x" * 10)
+
+        cache.get(keys[0])
+        cache.set(keys[3], b"x" * 10)
+        assert cache.get(keys[1]) is None and cache.get(keys[0]) is not None and len(cache) == 3
+
+        cache.set(keys[1], b"x" * 90)
+        assert len(cache) == 2 and cache.size == 100
+
+        cache.set(keys[2], b"x" * 101)
+        assert cache.get(keys[2]) is None
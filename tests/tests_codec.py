@@ -0,0 +1,103 @@
+import json
+
+from lapsepy.journal import Journal
+from lapsepy.journal.common import codec as codec_module
+from lapsepy.journal.common.codec import JSONCodec, CODECS, get_codec
+
+from unittest import TestCase
+
+from stub_server import StubServer
+
+ISO = {"isoString": "2023-11-01T12:00:00.000Z"}
+
+
+def _profile(i: int) -> dict:
+    return {"id": f"user{i}", "username": f"user{i}", "displayName": f"User {i}", "bio": "bio " * 20,
+            "profilePhotoName": f"photo{i}", "emojis": {"emojis": ["🙂", "📷"]}, "kudos": {"totalCount": i},
+            "friendStatus": "FRIENDS", "blockedMe": False, "isBlocked": False, "tags": [],
+            "hashedPhoneNumber": "0" * 64, "music": None}
+
+
+def feed_payload(items: int = 500) -> bytes:
+    edges = []
+    for i in range(items):
+        entries = [{"id": f"media{i}-{j}", "seen": False, "media": {"takenAt": ISO, "developsAt": ISO, "content": {
+            "filtered": f"media{i}-{j}/filtered_0", "original": f"media{i}-{j}/original_0"}}} for j in range(3)]
+        edges.append({"cursor": str(i), "node": {"id": f"item{i}", "user": _profile(i), "timestamp": ISO,
+                                                 "content": {"entries": entries}}})
+
+    return json.dumps({"data": {"friendsFeedItems": {"edges": edges, "pageInfo": {"endCursor": str(items),
+                                                                                  "hasNextPage": True}}}}).encode()
+
+
+def profile_payload(friends: int = 500, album_media: int = 200) -> bytes:
+    profile = _profile(0)
+    profile["albums"] = {"edges": [{"node": {
+        "id": "album", "name": "Album", "visibility": "PUBLIC", "createdAt": ISO, "updatedAt": ISO,
+        "media": {"edges": [{"node": {"addedAt": ISO, "media": {"id": f"media{i}"}}} for i in range(album_media)]}
+    }}]}
+    profile["friends"] = {"edges": [{"node": _profile(i)} for i in range(1, friends + 1)]}
+
+    return json.dumps({"data": {"profile": profile}}).encode()
+
+
+class CountingCodec(JSONCodec):
+    def __init__(self):
+        self.loads_calls = 0
+
+    def loads(self, data):
+        self.loads_calls += 1
+        return super().loads(data)
+
+
+def _installed_codecs() -> list[JSONCodec]:
+    codecs = []
+    for name in CODECS:
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            pass
+    return codecs
+
+
+class TestCodec(TestCase):
+    def test_round_trip(self):
+        document = {"operationName": "Query", "variables": {"text": "héllo 🙂", "count": 3, "flag": None},
+                    "query": "query Query { x }"}
+
+        for codec in _installed_codecs():
+            assert json.loads(codec.dumps(document)) == document, codec
+            assert codec.loads(json.dumps(document).encode()) == document, codec
+
+    def test_get_codec(self):
+        assert type(get_codec("json")) is JSONCodec
+        self.assertRaises(ValueError, get_codec, "yaml")
+
+        if codec_module.orjson is not None:
+            assert get_codec().name == "orjson"
+
+    def test_response_parsed_once(self):
+        with StubServer(lambda request: feed_payload(20)) as server:
+            codec = CountingCodec()
+            journal = Journal(authorization="token", refresher=lambda: None, codec=codec)
+            journal.request_url = server.url + "/graphql"
+
+            feed = journal.get_friends_feed(count=20)
+
+            assert codec.loads_calls == 1
+            assert len(feed.nodes) == 20
+
+            request = server.requests[0]
+            assert request.headers["content-type"] == "application/json"
+            assert request.json()["operationName"] == "FriendsFeedItemsGraphQLQuery"
+
+    def test_profile_parsed_once(self):
+        with StubServer(lambda request: profile_payload(friends=20, album_media=10)) as server:
+            codec = CountingCodec()
+            journal = Journal(authorization="token", refresher=lambda: None, codec=codec)
+            journal.request_url = server.url + "/graphql"
+
+            profile = journal.get_profile_by_id("user0")
+
+            assert codec.loads_calls == 1
+            assert len(profile.friends) == 20 and len(profile.albums[0].media) == 10
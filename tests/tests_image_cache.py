@@ -0,0 +1,113 @@
+import io
+import mmap
+import os
+import tempfile
+import time
+
+from datetime import datetime
+
+from PIL import Image
+
+from lapsepy.journal.common.image_cache import DiskImageCache, media_key
+from lapsepy.journal.common.transport import Transport
+from lapsepy.journal.structures import AlbumMedia
+
+from unittest import TestCase, mock
+
+from stub_server import StubServer
+
+
+def _jpeg() -> bytes:
+    bytes_io = io.BytesIO()
+    Image.new("RGB", (8, 8), color=(0, 0, 255)).save(bytes_io, format="jpeg")
+    return bytes_io.getvalue()
+
+
+class TestDiskImageCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+        jpeg = _jpeg()
+        self.server = StubServer(lambda request: jpeg).start()
+
+        base_url = mock.patch.object(AlbumMedia, "BASE_URL", self.server.url + "/")
+        base_url.start()
+        self.addCleanup(base_url.stop)
+
+    def tearDown(self):
+        self.server.stop()
+        self.directory.cleanup()
+
+    def _album_media(self, transport: Transport, media_id: str = "media") -> AlbumMedia:
+        return AlbumMedia(added_at=datetime.now(), media_id=media_id, taken_at=datetime.now(), capturer_id="user",
+                          transport=transport)
+
+    def test_repeat_loads_are_cached(self):
+        transport = Transport(image_cache=DiskImageCache(self.directory.name))
+
+        for _ in range(3):
+            assert self._album_media(transport).load().size == (8, 8)
+        assert len(self.server.requests) == 1
+
+        # Another transport, like one in another process, reads the same files.
+        other = Transport(image_cache=DiskImageCache(self.directory.name))
+        assert self._album_media(other).load().size == (8, 8)
+        assert len(self.server.requests) == 1
+
+    def test_transformation_is_part_of_key(self):
+        transport = Transport(image_cache=DiskImageCache(self.directory.name))
+
+        self._album_media(transport).load(quality=65)
+        self._album_media(transport).load(quality=90)
+        self._album_media(transport).load(quality=90, fl_keep_iptc=False)
+
+        assert len(self.server.requests) == 3
+        assert media_key("media", "q_65") != media_key("media", "q_90")
+
+    def test_reads_are_memory_mapped(self):
+        cache = DiskImageCache(self.directory.name)
+        key = media_key("media", "q_65")
+
+        assert cache.get(key) is None
+        cache.set(key, b"image")
+
+        data = cache.get(key)
+        assert isinstance(data, mmap.mmap) and data[:] == b"image"
+
+    def test_lru_eviction(self):
+        cache = DiskImageCache(self.directory.name, max_bytes=250)
+        keys = [media_key(f"media{i}", "q_65") for i in range(3)]
+
+        now = time.time()
+        for i, key in enumerate(keys[:2]):
+            cache.set(key, b"x" * 100)
+            os.utime(cache._path(key), (now - 100 + i, now - 100 + i))
+
+        # Reading the oldest image makes it the most recently used one.
+        cache.get(keys[0])
+        cache.set(keys[2], b"x" * 100)
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+        assert cache.size == 200
+
+    def test_overwrite_keeps_size(self):
+        cache = DiskImageCache(self.directory.name, max_bytes=250)
+        first, second = media_key("media0", "q_65"), media_key("media1", "q_65")
+
+        cache.set(first, b"x" * 100)
+        with mock.patch.object(cache, "_evict", wraps=cache._evict) as evict:
+            for _ in range(5):
+                cache.set(second, b"x" * 100)
+
+        # Rewriting the same image doesn't count it twice, so the cache never looks full.
+        assert cache._size == 200
+        assert evict.call_count == 0
+        assert cache.get(first) is not None
+
+    def test_no_partial_files(self):
+        cache = DiskImageCache(self.directory.name)
+        cache.set(media_key("media", "q_65"), b"x" * 1000)
+
+        names = [name for _, _, files in os.walk(self.directory.name) for name in files]
+        assert len(names) == 1 and not names[0].startswith(".tmp-")
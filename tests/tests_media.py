@@ -0,0 +1,167 @@
+import io
+import os
+import tempfile
+
+from datetime import datetime
+
+import requests
+
+from PIL import Image
+
+from lapsepy.journal import Journal
+from lapsepy.journal.common.image_cache import DiskImageCache, media_key
+from lapsepy.journal.common.media import LazyImage
+from lapsepy.journal.structures import AlbumMedia
+from lapsepy.journal.structures.profile import ProfileMusic
+
+from unittest import TestCase, mock
+
+from stub_server import StubServer
+
+
+def _jpeg() -> bytes:
+    bytes_io = io.BytesIO()
+    Image.new("RGB", (8, 8), color=(0, 255, 0)).save(bytes_io, format="jpeg")
+    return bytes_io.getvalue()
+
+
+JPEG = _jpeg()
+
+
+class TestMediaOutput(TestCase):
+    def setUp(self):
+        self.server = StubServer(lambda request: JPEG).start()
+
+        # AlbumMedia has __slots__, so BASE_URL can only be pointed at the stub server on the class.
+        base_url = mock.patch.object(AlbumMedia, "BASE_URL", self.server.url + "/")
+        base_url.start()
+        self.addCleanup(base_url.stop)
+
+        self.journal = Journal(authorization="token", refresher=lambda: None)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _album_media(self, media_id: str = "media") -> AlbumMedia:
+        return AlbumMedia(added_at=datetime.now(), media_id=media_id, taken_at=datetime.now(), capturer_id="user",
+                          transport=self.journal.transport)
+
+    def test_bytes_skip_pillow(self):
+        with mock.patch("lapsepy.journal.common.media.Image.open") as image_open:
+            assert self._album_media().load(output="bytes") == JPEG
+            view = self._album_media().load(output="memoryview")
+
+        image_open.assert_not_called()
+        assert isinstance(view, memoryview) and view.tobytes() == JPEG
+
+    def test_image(self):
+        image = self._album_media().load()
+        assert isinstance(image, Image.Image) and image.size == (8, 8)
+
+    def test_lazy_image(self):
+        lazy = self._album_media().load(output="lazy")
+
+        assert isinstance(lazy, LazyImage) and not lazy.decoded
+        assert bytes(lazy) == JPEG and len(lazy) == len(JPEG)
+
+        out = io.BytesIO()
+        lazy.save_raw(out)
+        assert out.getvalue() == JPEG and not lazy.decoded
+
+        assert lazy.size == (8, 8) and lazy.decoded
+        assert lazy.getpixel((0, 0))[1] > 200
+
+    def test_lazy_image_from_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.journal.transport.image_cache = DiskImageCache(directory)
+
+            self._album_media().load()
+            lazy = self._album_media().load(output="lazy")
+
+            assert len(self.server.requests) == 1
+            assert lazy.to_bytes() == JPEG and lazy.size == (8, 8)
+
+    def test_cached_bytes_close_map(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskImageCache(directory)
+            self.journal.transport.image_cache = cache
+            self._album_media().load(output="bytes")
+
+            mapped = cache.get(media_key("media", "q_65,fl_keep_itc"))
+            with mock.patch.object(cache, "get", return_value=mapped):
+                assert self._album_media().load(output="bytes") == JPEG
+
+            assert mapped.closed
+
+    def test_unknown_output(self):
+        self.assertRaises(ValueError, self._album_media().load, output="png")
+
+    def test_load_media_bytes(self):
+        media = [self._album_media(f"media{i}") for i in range(5)]
+
+        results = list(self.journal.load_media(media, output="bytes"))
+
+        assert all(result.value == JPEG for result in results)
+
+
+SONG = os.urandom(300 * 1024)
+
+
+class TestStream(TestCase):
+    def setUp(self):
+        self.server = StubServer(lambda request: (404, b"") if request.path == "/missing" else SONG).start()
+
+        base_url = mock.patch.object(AlbumMedia, "BASE_URL", self.server.url + "/")
+        base_url.start()
+        self.addCleanup(base_url.stop)
+
+        self.journal = Journal(authorization="token", refresher=lambda: None)
+        self.music = ProfileMusic(artist="artist", artwork_url="", duration=1, song_title="song",
+                                  song_url=self.server.url + "/song", transport=self.journal.transport)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_stream_to_callback(self):
+        chunks = []
+        written = self.music.stream_song(chunks.append, chunk_size=16 * 1024)
+
+        assert written == len(SONG) and b"".join(chunks) == SONG
+        assert max(len(chunk) for chunk in chunks) <= 16 * 1024
+
+    def test_stream_to_file(self):
+        out = io.BytesIO()
+        assert self.music.stream_song(out) == len(SONG)
+        assert out.getvalue() == SONG
+
+    def test_stream_to_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "song.mp3")
+            self.music.stream_song(path)
+
+            with open(path, "rb") as f:
+                assert f.read() == SONG
+
+    def test_failed_stream_leaves_no_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "song.mp3")
+
+            self.assertRaises(requests.HTTPError, self.journal.transport.stream, self.server.url + "/missing", path)
+            with mock.patch("lapsepy.journal.common.transport.os.replace", side_effect=OSError):
+                self.assertRaises(OSError, self.music.stream_song, path)
+
+            assert os.listdir(directory) == []
+
+    def test_stream_from_image_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.journal.transport.image_cache = DiskImageCache(directory)
+            self.journal.transport.image_cache.set(media_key("media", "q_65,fl_keep_itc"), JPEG)
+
+            media = AlbumMedia(added_at=datetime.now(), media_id="media", taken_at=datetime.now(),
+                               capturer_id="user", transport=self.journal.transport)
+
+            chunks = []
+            media.stream(chunks.append, chunk_size=100)
+
+            assert b"".join(chunks) == JPEG and max(map(len, chunks)) <= 100
+            assert len(self.server.requests) == 0
@@ -0,0 +1,87 @@
+from lapsepy.journal import Journal
+from lapsepy.journal.common.metrics import MetricsRegistry
+from lapsepy.journal.common.tracing import RequestTrace
+
+from unittest import TestCase
+
+from stub_server import StubServer
+
+
+def make_trace(operation_name: str, duration: float, error: Exception | None = None) -> RequestTrace:
+    trace = RequestTrace(operation_name=operation_name, url="https://example.com")
+    trace.duration = duration
+    trace.bytes_sent = 100
+    trace.bytes_received = 1000
+    trace.error = error
+    return trace
+
+
+def responder(request):
+    if request.json()["operationName"] == "SendKudosGraphQLMutation":
+        return {"data": {"sendKudos": {"__typename": "SendKudosPayload", "success": True}}}
+    return {"errors": [{"message": "Internal server error"}]}
+
+
+class TestMetricsRegistry(TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+        # 1ms to 1000ms, one of each.
+        for i in range(1, 1001):
+            self.registry.record(make_trace("Query", i / 1000, error=ValueError() if i % 10 == 0 else None))
+
+    def test_counts(self):
+        stats = self.registry.to_dict()["Query"]
+
+        assert stats["count"] == 1000 and stats["errors"] == 100
+        assert stats["bytes_sent"] == 100000 and stats["mean_bytes_received"] == 1000
+        assert stats["latency"]["max"] == 1
+
+    def test_quantiles(self):
+        latency = self.registry.to_dict()["Query"]["latency"]
+
+        # Estimates can't be more precise than the bucket they fall in.
+        assert 0.4 <= latency["p50"] <= 0.6
+        assert 0.9 <= latency["p95"] <= 1
+        assert 0.95 <= latency["p99"] <= 1
+
+    def test_prometheus(self):
+        self.registry.record(make_trace("Other", 100))
+        text = self.registry.to_prometheus(labels={"account": "a \"quoted\" name"})
+
+        assert text.count("# TYPE lapsepy_request_duration_seconds histogram") == 1
+        assert 'lapsepy_requests_total{account="a \\"quoted\\" name",operation="Query"} 1000' in text
+        assert 'lapsepy_request_errors_total{account="a \\"quoted\\" name",operation="Query"} 100' in text
+        assert 'lapsepy_request_duration_seconds_bucket{account="a \\"quoted\\" name",operation="Query",le="0.1"} ' \
+               '100' in text
+        assert 'lapsepy_request_duration_seconds_bucket{account="a \\"quoted\\" name",operation="Other",le="+Inf"} ' \
+               '1' in text
+        assert 'lapsepy_request_duration_seconds_bucket{account="a \\"quoted\\" name",operation="Other",le="60"} ' \
+               '0' in text
+
+
+class TestJournalMetrics(TestCase):
+    def setUp(self):
+        self.server = StubServer(responder).start()
+        self.journal = Journal(authorization="token", refresher=lambda: None)
+        self.journal.request_url = self.server.url + "/graphql"
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_operations_are_recorded(self):
+        for _ in range(3):
+            self.journal.send_kudos("user")
+        self.assertRaises(Exception, self.journal.get_current_user)
+
+        metrics = self.journal.metrics.to_dict()
+
+        assert metrics["SendKudosGraphQLMutation"]["count"] == 3
+        assert metrics["SendKudosGraphQLMutation"]["errors"] == 0
+        assert metrics["SendKudosGraphQLMutation"]["bytes_sent"] == sum(len(r.body) for r in self.server.requests[:3])
+        assert metrics["CurrentUserGraphQLQuery"] == {**metrics["CurrentUserGraphQLQuery"], "count": 1, "errors": 1}
+        assert self.journal.metrics.total().count == 4
+
+    def test_metrics_can_be_turned_off(self):
+        self.journal.metrics = None
+        self.journal.send_kudos("user")
@@ -0,0 +1,54 @@
+from lapsepy.journal.structures import Options
+
+from unittest import TestCase, mock
+
+
+def render_uncompiled(options: Options, operation_name: str, authorization_token: str) -> dict:
+    # How BaseOptions.to_headers rendered the headers before they were compiled.
+    attrs = list(filter(lambda x: x.startswith("HEADER_"), dir(options)))
+    headers = {options.format_header(attr): str(options.__getattribute__(attr)) for attr in attrs}
+    headers.update({
+        "x-apollo-operation-name": operation_name,
+        "x-emb-path": f"/graphql/{operation_name}",
+        "authorization": authorization_token
+    })
+    return headers
+
+
+class TestHeaders(TestCase):
+    def setUp(self):
+        self.options = Options()
+
+    def test_headers_unchanged(self):
+        assert self.options.to_headers("SendKudosGraphQLMutation", "token") == \
+               render_uncompiled(self.options, "SendKudosGraphQLMutation", "token")
+
+    def test_recompiled_on_change(self):
+        self.options.to_headers("Operation", "token")
+
+        self.options.HEADER_x_timezone = "Europe/London"
+        self.options.HEADER_x_custom__header = 1
+
+        headers = self.options.to_headers("Operation", "token")
+        assert headers["x-timezone"] == "Europe/London"
+        assert headers["x-custom_header"] == "1"
+
+        del self.options.HEADER_x_custom__header
+        assert "x-custom_header" not in self.options.to_headers("Operation", "token")
+
+    def test_static_headers_are_immutable(self):
+        self.options.to_headers("Operation", "token")["x-timezone"] = "Europe/London"
+
+        with self.assertRaises(TypeError):
+            self.options.static_headers["x-timezone"] = "Europe/London"
+        assert self.options.to_headers("Operation", "token")["x-timezone"] == "America/New_York"
+
+    def test_headers_compiled_once(self):
+        with mock.patch("lapsepy.journal.structures.options.dir", wraps=dir, create=True) as walk:
+            for _ in range(100):
+                self.options.to_headers("SendKudosGraphQLMutation", "token")
+            assert walk.call_count == 1
+
+            self.options.HEADER_x_timezone = "Europe/London"
+            self.options.to_headers("SendKudosGraphQLMutation", "token")
+            assert walk.call_count == 2
@@ -0,0 +1,159 @@
+import time
+
+from lapsepy.journal import Journal
+from lapsepy.journal.common.pagination import walk_pages
+
+from unittest import TestCase
+
+from stub_server import StubServer
+
+ISO = {"isoString": "2023-11-01T12:00:00.000Z"}
+TOTAL_ITEMS = 45
+
+
+def _album_node(i: int) -> dict:
+    return {"addedAt": ISO, "media": {"id": f"media{i}", "takenAt": ISO, "takenBy": {"id": "user"}}}
+
+
+def _feed_node(i: int) -> dict:
+    profile = {"id": f"user{i}", "username": f"user{i}", "emojis": {"emojis": []}, "kudos": {"totalCount": 0}}
+
+    # Every third item is a status update, which has no entries.
+    if i % 3 == 0:
+        content = {"body": {"text": "thought"}}
+    else:
+        content = {"entries": [{"seen": False, "media": {"takenAt": ISO, "developsAt": ISO,
+                                                         "content": {"filtered": f"media{i}/filtered_0"}}}]}
+
+    return {"user": profile, "timestamp": ISO, "content": content}
+
+
+def _search_node(i: int) -> dict:
+    return {"id": f"user{i}", "username": f"user{i}", "displayName": "User"}
+
+
+def _connection(variables: dict, node_factory) -> dict:
+    start = int(variables.get("after") or 0)
+    end = min(start + variables["first"], TOTAL_ITEMS)
+
+    return {
+        "edges": [{"cursor": str(i + 1), "node": node_factory(i)} for i in range(start, end)],
+        "pageInfo": {"endCursor": str(end), "hasNextPage": end < TOTAL_ITEMS}
+    }
+
+
+def responder(request):
+    body = request.json()
+    variables = body["variables"]
+
+    if body["operationName"] == "AlbumMediaGraphQLQuery":
+        return {"data": {"album": {"id": variables["id"], "media": _connection(variables, _album_node)}}}
+    if body["operationName"] == "FriendsFeedItemsGraphQLQuery":
+        return {"data": {"friendsFeedItems": _connection(variables, _feed_node)}}
+    if body["operationName"] == "SearchUsersGraphQLQuery":
+        return {"data": {"searchUsers": _connection(variables, _search_node)}}
+
+    return {"data": {}}
+
+
+class TestPagination(TestCase):
+    def setUp(self):
+        self.server = StubServer(responder).start()
+        self.journal = Journal(authorization="token", refresher=lambda: None)
+        self.journal.request_url = self.server.url + "/graphql"
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_iter_album_media(self):
+        media = list(self.journal.iter_album_media("album", page_size=10))
+
+        assert [m.id for m in media] == [f"media{i}" for i in range(TOTAL_ITEMS)]
+        assert len(self.server.requests) == 5
+
+    def test_iter_is_lazy(self):
+        iterator = self.journal.iter_album_media("album", page_size=10)
+
+        assert len(self.server.requests) == 0
+        for _ in range(10):
+            next(iterator)
+        assert len(self.server.requests) == 1
+        next(iterator)
+        assert len(self.server.requests) == 2
+
+    def test_limit_does_not_over_fetch(self):
+        media = list(self.journal.iter_album_media("album", page_size=10, limit=25))
+
+        assert len(media) == 25
+        assert [r.json()["variables"]["first"] for r in self.server.requests] == [10, 10, 5]
+
+    def test_iter_friends_feed(self):
+        nodes = list(self.journal.iter_friends_feed(page_size=20))
+
+        assert len(nodes) == TOTAL_ITEMS
+        assert sum(len(node.entries) for node in nodes) == TOTAL_ITEMS - 15
+
+    def test_iter_search_users(self):
+        users = list(self.journal.iter_search_users("user", page_size=50))
+
+        assert len(users) == TOTAL_ITEMS
+        assert len(self.server.requests) == 1
+
+
+class TestPrefetch(TestCase):
+    PAGES = 8
+    DELAY = 0.04
+
+    def _fetcher(self, fetched: list):
+        def fetch_page(first, after):
+            time.sleep(self.DELAY)
+            page = int(after or 0)
+            fetched.append(page)
+            return [page] * first, {"endCursor": str(page + 1), "hasNextPage": page + 1 < self.PAGES}
+
+        return fetch_page
+
+    def test_prefetch_overlaps_processing(self):
+        def consume(prefetch):
+            start = time.perf_counter()
+            for _ in walk_pages(self._fetcher([]), page_size=1, prefetch=prefetch):
+                time.sleep(self.DELAY)
+            return time.perf_counter() - start
+
+        sequential = consume(prefetch=0)
+        prefetched = consume(prefetch=2)
+
+        assert prefetched < sequential * 0.75
+
+    def test_prefetch_back_pressure(self):
+        fetched = []
+        pages = walk_pages(self._fetcher(fetched), page_size=1, prefetch=2)
+
+        assert next(pages) == [0]
+        time.sleep(self.DELAY * 5)
+
+        # Page 0 was handed out, so at most 2 more pages may have been fetched ahead.
+        assert fetched == [0, 1, 2]
+        assert list(pages) == [[i] for i in range(1, self.PAGES)]
+
+    def test_prefetch_propagates_errors(self):
+        def fetch_page(first, after):
+            if after:
+                raise RuntimeError("boom")
+            return [0], {"endCursor": "1", "hasNextPage": True}
+
+        pages = walk_pages(fetch_page, page_size=1, prefetch=1)
+
+        assert next(pages) == [0]
+        self.assertRaises(RuntimeError, next, pages)
+
+    def test_journal_prefetch(self):
+        server = StubServer(responder).start()
+        try:
+            journal = Journal(authorization="token", refresher=lambda: None)
+            journal.request_url = server.url + "/graphql"
+
+            media = list(journal.iter_album_media("album", page_size=10, prefetch=2))
+            assert [m.id for m in media] == [f"media{i}" for i in range(TOTAL_ITEMS)]
+        finally:
+            server.stop()
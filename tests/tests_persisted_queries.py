@@ -0,0 +1,124 @@
+import hashlib
+
+from lapsepy.journal import Journal
+from lapsepy.journal.common.exceptions import PersistedQueryNotFound, sync_journal_exception_router
+from lapsepy.journal.factory.batch_factory import BatchGQL
+from lapsepy.journal.factory.factory import BaseGQL, query_hash
+from lapsepy.journal.factory.friends_factory import FriendsFeedItemsGQL, ProfileDetailsGQL
+
+from unittest import TestCase, mock
+
+from stub_server import StubServer
+
+CALLS = 20
+
+
+class PersistedQueryServer(StubServer):
+    """
+    Stub server speaking Apollo's automatic persisted queries protocol.
+    """
+
+    def __init__(self, supported: bool = True):
+        super().__init__(self.respond)
+        self.supported = supported
+        self.documents: dict[str, str] = {}
+
+    def respond(self, request):
+        body = request.json()
+        persisted = (body.get("extensions") or {}).get("persistedQuery")
+
+        if persisted is not None:
+            if not self.supported:
+                return {"errors": [{"message": "PersistedQueryNotSupported"}]}
+
+            sha256 = persisted["sha256Hash"]
+            if "query" in body:
+                assert hashlib.sha256(body["query"].encode()).hexdigest() == sha256
+                self.documents[sha256] = body["query"]
+            elif sha256 not in self.documents:
+                return {"errors": [{"message": "PersistedQueryNotFound",
+                                    "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"}}]}
+
+        return {"data": {"operation": body["operationName"]}}
+
+    def bytes_received(self) -> int:
+        return sum(len(request.body) for request in self.requests)
+
+
+def _queries() -> list[dict]:
+    return [FriendsFeedItemsGQL(last=10).to_dict(), ProfileDetailsGQL(user_id="user").to_dict()]
+
+
+class TestPersistedQueries(TestCase):
+    def _journal(self, server: StubServer, persisted_queries: bool = True) -> Journal:
+        journal = Journal(authorization="token", refresher=lambda: None, persisted_queries=persisted_queries)
+        journal.request_url = server.url + "/graphql"
+        return journal
+
+    def test_negotiation(self):
+        with PersistedQueryServer() as server:
+            journal = self._journal(server)
+            query = FriendsFeedItemsGQL(last=10).to_dict()
+
+            assert journal._sync_journal_call(query)["data"]["operation"] == "FriendsFeedItemsGraphQLQuery"
+
+            # The hash alone is rejected, then the document is sent along to register it.
+            first, second = [request.json() for request in server.requests]
+            assert "query" not in first and second["query"] == query["query"]
+            assert first["extensions"]["persistedQuery"]["sha256Hash"] == query_hash(query["query"])
+
+            journal._sync_journal_call(query)
+
+            assert len(server.requests) == 3
+            assert "query" not in server.requests[2].json()
+
+    def test_saved_bytes(self):
+        with PersistedQueryServer() as server:
+            journal = self._journal(server, persisted_queries=False)
+            for _ in range(CALLS):
+                for query in _queries():
+                    journal._sync_journal_call(query)
+            full = server.bytes_received()
+
+        with PersistedQueryServer() as server:
+            journal = self._journal(server)
+            for _ in range(CALLS):
+                for query in _queries():
+                    journal._sync_journal_call(query)
+            persisted = server.bytes_received()
+
+        assert persisted * 3 < full
+
+    def test_not_supported(self):
+        with PersistedQueryServer(supported=False) as server:
+            journal = self._journal(server)
+
+            for query in _queries():
+                assert journal._sync_journal_call(query)["data"]
+
+            assert not journal.persisted_queries
+            assert [("query" in request.json()) for request in server.requests] == [False, True, True]
+
+    def test_hash_computed_once(self):
+        query = ProfileDetailsGQL(user_id="user")
+        sha256 = query.query_hash
+        assert sha256 == hashlib.sha256(query.query.encode()).hexdigest()
+
+        with mock.patch("lapsepy.journal.factory.factory.hashlib.sha256", wraps=hashlib.sha256) as hashed:
+            assert ProfileDetailsGQL(user_id="other").query_hash == sha256
+            assert query_hash(query.query) == sha256
+
+            # Batches are one-off documents, their hashes aren't kept.
+            batch = BatchGQL([ProfileDetailsGQL(user_id="a"), ProfileDetailsGQL(user_id="b")])
+            assert batch.query not in BaseGQL.query_hashes
+            batch_hash = batch.query_hash
+
+        assert hashed.call_count == 1
+        assert batch_hash == hashlib.sha256(batch.query.encode()).hexdigest()
+
+        persisted = query.to_persisted_dict()
+        assert "query" not in persisted and persisted["variables"] == query.variables
+
+    def test_router(self):
+        error = sync_journal_exception_router({"message": "PersistedQueryNotFound"})
+        assert isinstance(error, PersistedQueryNotFound)
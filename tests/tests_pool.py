@@ -0,0 +1,84 @@
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase, mock
+
+from lapsepy.lapse import LapsePool
+
+from fake_tokens import make_token
+from stub_server import StubServer
+
+ACCOUNTS = 40
+WORKERS = 8
+
+
+def responder(request):
+    return {"data": {"sendKudos": {"__typename": "SendKudosPayload", "success": True}}}
+
+
+class TestLapsePool(TestCase):
+    def setUp(self):
+        self.server = StubServer(responder).start()
+
+        def refresh(refresh_token, transport=None):
+            return make_token(time.time() + 3600, subject=refresh_token)
+
+        with mock.patch("lapsepy.lapse.lapse.refresh", side_effect=refresh):
+            self.pool = LapsePool(pool_maxsize=WORKERS)
+            for i in range(ACCOUNTS):
+                lapse = self.pool.add(f"refresh{i}", key=f"account{i}")
+                lapse.journal.request_url = self.server.url + "/graphql"
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.stop()
+
+    def _send_kudos(self):
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            list(executor.map(lambda key: self.pool[key].send_kudos("user"), self.pool))
+
+    def test_accounts_share_connections(self):
+        self._send_kudos()
+        self._send_kudos()
+
+        assert len(self.server.requests) == ACCOUNTS * 2
+        assert len(self.server.connections) <= WORKERS
+
+    def test_accounts_keep_their_headers(self):
+        self._send_kudos()
+
+        device_ids = {request.headers["x-device-id"] for request in self.server.requests}
+        tokens = {request.headers["authorization"] for request in self.server.requests}
+
+        assert len(device_ids) == ACCOUNTS
+        assert len(tokens) == ACCOUNTS
+        assert len({id(lapse.journal.transport) for _, lapse in self.pool.items()}) == 1
+
+    def test_metrics(self):
+        self._send_kudos()
+
+        metrics = self.pool.metrics()
+
+        assert metrics["total"] == {"accounts": ACCOUNTS, "calls": ACCOUNTS, "errors": 0, "refreshes": ACCOUNTS,
+                                    "scheduled_refreshes": ACCOUNTS}
+        assert metrics["accounts"]["account0"]["calls"] == 1
+        assert metrics["accounts"]["account0"]["token_expires_in"] > 3000
+
+    def test_remove(self):
+        lapse = self.pool.remove("account0")
+
+        assert "account0" not in self.pool and len(self.pool) == ACCOUNTS - 1
+        assert lapse._scheduled_refresh is None
+        self.assertRaises(KeyError, self.pool.add, "refresh1", key="account1", authenticate=False)
+
+    def test_default_key_hides_token(self):
+        lapse = self.pool.add("secret refresh token", authenticate=False)
+        key = lapse.journal.account[:16]
+
+        assert self.pool[key] is lapse
+        assert "secret refresh token" not in self.pool.metrics()["accounts"]
+        assert "secret refresh token" not in self.pool.to_prometheus()
+
+        with self.assertRaises(KeyError) as error:
+            self.pool.add("secret refresh token", authenticate=False)
+        assert "secret refresh token" not in str(error.exception)
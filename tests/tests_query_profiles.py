@@ -0,0 +1,125 @@
+from lapsepy.journal import Journal
+from lapsepy.journal.common.cache import ResponseCache
+from lapsepy.journal.factory.album_factory import AlbumMediaGQL
+from lapsepy.journal.factory.factory import QUERY_PROFILES
+from lapsepy.journal.factory.friends_factory import FriendsFeedItemsGQL, ProfileDetailsGQL
+
+from unittest import TestCase
+
+from stub_server import StubServer
+
+FEED_ITEM = {
+    "cursor": "cursor-1",
+    "node": {
+        "id": "item-1",
+        "user": {"id": "friend", "username": "friend_username"},
+        "timestamp": {"isoString": "2023-11-08T12:00:00.000Z"},
+        "content": {
+            "entries": [{
+                "seen": False,
+                "media": {
+                    "takenAt": {"isoString": "2023-11-08T11:00:00.000Z"},
+                    "developsAt": {"isoString": "2023-11-08T12:00:00.000Z"},
+                    "content": {"filtered": "filtered-id", "original": "original-id"}
+                }
+            }]
+        }
+    }
+}
+
+PROFILE = {
+    "id": "user",
+    "username": "username",
+    "friends": {"edges": [{"node": {"id": "friend", "username": "friend_username"}}]},
+    "albums": {"edges": [{"node": {
+        "id": "album",
+        "createdAt": {"isoString": "2023-11-08T11:00:00.000Z"},
+        "updatedAt": {"isoString": "2023-11-08T12:00:00.000Z"},
+        "media": {"edges": [{"node": {"addedAt": {"isoString": "2023-11-08T12:00:00.000Z"}, "media": {"id": "m"}}}]}
+    }}]}
+}
+
+ALBUM_ITEM = {
+    "cursor": "cursor-1",
+    "node": {"addedAt": {"isoString": "2023-11-08T12:00:00.000Z"},
+             "media": {"id": "m", "takenAt": {"isoString": "2023-11-08T11:00:00.000Z"}}}
+}
+
+
+def respond(request):
+    if request.json()["operationName"] == "ProfileDetailsGraphQLQuery":
+        return {"data": {"profile": PROFILE}}
+
+    if request.json()["operationName"] == "AlbumMediaGraphQLQuery":
+        media = {"edges": [ALBUM_ITEM], "pageInfo": {"hasNextPage": False}}
+        return {"data": {"album": {"id": "album", "media": media}}}
+
+    return {"data": {"friendsFeedItems": {"edges": [FEED_ITEM], "pageInfo": {"endCursor": "cursor-1",
+                                                                             "hasNextPage": False}}}}
+
+
+class TestQueryProfiles(TestCase):
+    def _journal(self, server: StubServer, cache: ResponseCache | None = None) -> Journal:
+        journal = Journal(authorization="token", refresher=lambda: None, cache=cache)
+        journal.request_url = server.url + "/graphql"
+        return journal
+
+    def test_documents(self):
+        for factory in (FriendsFeedItemsGQL(), ProfileDetailsGQL(user_id="user"), AlbumMediaGQL("album", last=10)):
+            assert set(factory.QUERIES) == set(QUERY_PROFILES)
+
+            full = len(factory.QUERIES["full"])
+            media = len(factory.QUERIES["media-only"])
+            ids = len(factory.QUERIES["ids-only"])
+            assert ids < media < full
+
+        assert FriendsFeedItemsGQL(profile="ids-only").variables == FriendsFeedItemsGQL().variables
+
+        with self.assertRaises(ValueError):
+            FriendsFeedItemsGQL(profile="everything")
+
+    def test_profile_variables(self):
+        # Every variable sent has to be declared by the document.
+        for profile in QUERY_PROFILES:
+            query = ProfileDetailsGQL(user_id="user", profile=profile)
+            for name in query.variables:
+                assert f"${name}:" in query.query
+
+        assert set(ProfileDetailsGQL(user_id="user", profile="ids-only").variables) == {"albumsLimit",
+                                                                                        "friendsLimit", "id"}
+
+    def test_minimal_responses(self):
+        with StubServer(respond) as server:
+            journal = self._journal(server)
+
+            node, = journal.get_friends_feed(profile="ids-only")
+            assert node.profile.username == "friend_username"
+            assert node.entries[0].filtered_id == "filtered-id"
+
+            assert len(list(journal.iter_friends_feed(profile="media-only"))) == 1
+
+            profile = journal.get_profile_by_id("user", profile="ids-only")
+            assert profile.friends[0].user_id == "friend"
+            assert profile.albums[0].media[0].id == "m"
+
+            album = journal.get_album_by_id("album", last=10, profile="ids-only")
+            assert album.media[0].id == "m" and album.media[0].capturer_id == ""
+            assert [media.id for media in journal.iter_album_media("album", profile="media-only")] == ["m"]
+
+            sent = [request.json() for request in server.requests]
+            assert sent[0]["query"] == FriendsFeedItemsGQL(profile="ids-only").query
+            assert "friendsFeedItems" in sent[1]["query"]
+            assert "mutualLimit" not in sent[2]["variables"]
+            assert sent[3]["query"] == AlbumMediaGQL(album_id="album", last=10, profile="ids-only").query
+            assert sent[4]["query"] == AlbumMediaGQL(album_id="album", last=None, profile="media-only").query
+
+    def test_cache_per_document(self):
+        with StubServer(respond) as server:
+            journal = self._journal(server, cache=ResponseCache())
+
+            journal.get_profile_by_id("user", profile="ids-only")
+            journal.get_profile_by_id("user", profile="ids-only")
+            journal.get_profile_by_id("user", profile="full")
+
+            # The full profile isn't answered with the cached ids-only response.
+            assert len(server.requests) == 2
@@ -0,0 +1,251 @@
+import pickle
+import tracemalloc
+
+from datetime import datetime, timedelta, timezone
+
+from lapsepy.journal import Journal
+from lapsepy.journal.common.utils import pack_time, unpack_time
+from lapsepy.journal.structures import AlbumMedia, FriendNode, Profile, SearchUser, Snap, LazyFriendsFeed, \
+    LazyProfile, LazySnap
+
+from unittest import TestCase, mock
+
+from stub_server import StubServer
+
+OBJECTS = 20000
+ISO = {"isoString": "2023-11-01T12:00:00.000Z"}
+
+
+def _profile(i: int) -> dict:
+    return {"id": f"user{i}", "username": f"user{i}", "displayName": f"User {i}", "bio": f"bio {i}",
+            "profilePhotoName": f"photo{i}", "emojis": {"emojis": ["🙂", "📷"]}, "kudos": {"totalCount": i},
+            "friendStatus": "FRIENDS", "blockedMe": False, "isBlocked": False, "tags": [],
+            "hashedPhoneNumber": "0" * 64, "music": None}
+
+
+def _snap_data(i: int) -> dict:
+    return {"seen": False, "media": {"takenAt": ISO, "developsAt": ISO, "content": {
+        "filtered": f"media{i}/filtered_0", "original": f"media{i}/original_0"}}}
+
+
+class LegacySnap:
+    """
+    Snap's layout before __slots__, kept to measure against.
+    """
+
+    def __init__(self, seen, taken_at, develops_at, filtered_id, original_id, transport=None):
+        self.id = filtered_id.split("/filtered_0")[0]
+        self.seen = seen
+        self.taken_at = taken_at
+        self.develops_at = develops_at
+        self.filtered_id = filtered_id
+        self.original_id = original_id
+        self.transport = transport
+        self.filtered = None
+        self.original = None
+
+
+class LegacyProfile:
+    """
+    Profile's layout before __slots__, kept to measure against.
+    """
+
+    def __init__(self, pd: dict):
+        self.bio = pd.get("bio")
+        self.blocked_me = pd.get("blockedMe")
+        self.user_display_name = pd.get("displayName")
+        self.emojis = pd.get("emojis", {}).get("emojis")
+        self.is_friends = pd.get("friendStatus") == "FRIENDS"
+        self.kudos = pd.get("kudos", {}).get("totalCount", -1)
+        self.profile_photo_name = pd.get("profilePhotoName")
+        self.tags = pd.get("tags")
+        self.hashed_phone_number = pd.get("hashedPhoneNumber")
+        self.user_id = pd.get("id")
+        self.username = pd.get("username")
+        self.media = []
+        self.is_blocked = False
+        self.albums = None
+        self.friends = []
+        self.profile_music = None
+        self.transport = None
+        self.profile_picture = None
+
+
+def _bytes_per_object(make, items: list) -> float:
+    tracemalloc.start()
+    try:
+        objects = [make(item) for item in items]
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert len(objects) == len(items)
+    return size / len(items)
+
+
+class TestCompactStructures(TestCase):
+    def test_round_trip(self):
+        naive = datetime(2023, 11, 1, 12, 0, 0, 123456)
+        utc = datetime.fromisoformat("2023-11-01T12:00:00.000Z")
+
+        for dt in (naive, utc, datetime(1960, 1, 1)):
+            packed = pack_time(dt)
+            assert type(packed) is int
+            assert unpack_time(packed) == dt
+            assert unpack_time(packed).tzinfo is dt.tzinfo
+
+        # Timezones other than UTC are kept as they are.
+        offset = datetime(2023, 11, 1, tzinfo=timezone(timedelta(hours=-5)))
+        assert pack_time(offset) is offset
+        assert pack_time(None) is None
+
+    def test_structures(self):
+        snap = Snap.from_dict(_snap_data(0))
+        assert snap.taken_at == datetime(2023, 11, 1, 12, tzinfo=timezone.utc)
+        assert type(snap._taken_at) is int
+
+        snap.develops_at = datetime(2023, 11, 2)
+        assert snap.develops_at == datetime(2023, 11, 2)
+
+        node = FriendNode(profile=Profile.from_dict(_profile(0)), iso_string=ISO["isoString"], entries=[snap])
+        assert node.timestamp == snap.taken_at
+
+        copy = pickle.loads(pickle.dumps(snap))
+        assert copy.id == snap.id and copy.taken_at == snap.taken_at
+
+        media = AlbumMedia(added_at=datetime(2023, 11, 1), media_id="media", taken_at=datetime(2023, 11, 1),
+                           capturer_id="user")
+        search_user = SearchUser(user_id="user", display_name="User", profile_photo_name="photo", username="user",
+                                 friend_status="FRIENDS", blocked_me=False, is_blocked=False)
+
+        for obj in (snap, node, media, search_user, node.profile):
+            assert not hasattr(obj, "__dict__")
+
+    def test_lazy_lists(self):
+        profile = Profile.from_dict(_profile(0))
+        assert profile._media is None and profile._friends is None
+
+        profile.media.append("snap")
+        assert profile.media == ["snap"]
+        assert Profile.from_dict(_profile(1)).media == []
+
+        friends = [Profile.from_dict(_profile(2))]
+        assert Profile.from_dict(_profile(3)).friends is not friends
+        profile.friends = friends
+        assert profile.friends is friends
+
+    def test_memory(self):
+        snaps = [_snap_data(i) for i in range(OBJECTS)]
+        profiles = [_profile(i) for i in range(OBJECTS)]
+
+        legacy_snap = _bytes_per_object(lambda data: LegacySnap(
+            seen=data["seen"],
+            taken_at=datetime.fromisoformat(data["media"]["takenAt"]["isoString"]),
+            develops_at=datetime.fromisoformat(data["media"]["developsAt"]["isoString"]),
+            filtered_id=data["media"]["content"]["filtered"],
+            original_id=data["media"]["content"]["original"]
+        ), snaps)
+        snap = _bytes_per_object(Snap.from_dict, snaps)
+
+        legacy_profile = _bytes_per_object(LegacyProfile, profiles)
+        profile = _bytes_per_object(Profile.from_dict, profiles)
+
+        assert snap < legacy_snap * 0.85
+        assert profile < legacy_profile * 0.75
+
+
+def _feed_edges(items: int) -> list[dict]:
+    return [{"cursor": str(i), "node": {"id": f"item{i}", "user": _profile(i), "timestamp": ISO,
+                                        "content": {"entries": [_snap_data(i * 3 + j) for j in range(3)]}}}
+            for i in range(items)]
+
+
+def _profile_details() -> dict:
+    profile = _profile(0)
+    profile["music"] = {"artist": "artist", "artworkUrl": "", "duration": 1, "songTitle": "song", "songUrl": ""}
+    profile["friends"] = {"edges": [{"node": _profile(i)} for i in range(1, 4)]}
+    profile["albums"] = {"edges": [{"node": {
+        "id": "album", "name": "Album", "visibility": "PUBLIC", "createdAt": ISO, "updatedAt": ISO,
+        "media": {"edges": [{"node": {"addedAt": ISO, "media": {"id": f"media{i}"}}} for i in range(3)]}
+    }}]}
+    return profile
+
+
+class TestLazyStructures(TestCase):
+    def _journal(self, server: StubServer, lazy_structures: bool) -> Journal:
+        journal = Journal(authorization="token", refresher=lambda: None, lazy_structures=lazy_structures)
+        journal.request_url = server.url + "/graphql"
+        return journal
+
+    def test_snap(self):
+        data = _snap_data(0)
+        eager, lazy = Snap.from_dict(data), Snap.from_dict(data, lazy=True)
+        assert isinstance(lazy, LazySnap)
+
+        # Nothing is decoded until it's read, then it's kept.
+        with self.assertRaises(AttributeError):
+            lazy._taken_at
+
+        for field in ("id", "seen", "taken_at", "develops_at", "filtered_id", "original_id"):
+            assert getattr(lazy, field) == getattr(eager, field)
+
+        lazy._data = None
+        assert lazy.taken_at == eager.taken_at
+
+        lazy.seen = True
+        assert lazy.seen
+
+    def test_album_media(self):
+        data = {"addedAt": ISO, "media": {"id": "media", "takenAt": ISO, "takenBy": {"id": "user"}}}
+        eager, lazy = AlbumMedia.from_dict(data), AlbumMedia.from_dict(data, lazy=True)
+
+        for field in ("id", "added_at", "taken_at", "capturer_id"):
+            assert getattr(lazy, field) == getattr(eager, field)
+
+    def test_responses(self):
+        def respond(request):
+            if request.json()["operationName"] == "ProfileDetailsGraphQLQuery":
+                return {"data": {"profile": _profile_details()}}
+            return {"data": {"friendsFeedItems": {"edges": _feed_edges(5), "pageInfo": {"hasNextPage": False}}}}
+
+        with StubServer(respond) as server:
+            eager_journal, lazy_journal = self._journal(server, False), self._journal(server, True)
+
+            feed = lazy_journal.get_friends_feed()
+            assert isinstance(feed, LazyFriendsFeed) and len(feed) == 5
+
+            for eager, lazy in zip(eager_journal.get_friends_feed(), feed):
+                assert lazy.timestamp == eager.timestamp
+                assert lazy.profile.username == eager.profile.username
+                assert [snap.id for snap in lazy.profile.media] == [snap.id for snap in eager.profile.media]
+                assert lazy.entries[0].develops_at == eager.entries[0].develops_at
+
+            assert len(list(lazy_journal.iter_friends_feed())) == 5
+
+            eager = eager_journal.get_profile_by_id("user0")
+            lazy = lazy_journal.get_profile_by_id("user0")
+            assert isinstance(lazy, LazyProfile)
+
+            assert lazy.kudos == eager.kudos and lazy.emojis == eager.emojis
+            assert lazy.profile_music.song_title == eager.profile_music.song_title
+            assert [friend.username for friend in lazy.friends] == [friend.username for friend in eager.friends]
+
+            album, = lazy.albums
+            assert album.owner is lazy and album.created_at == eager.albums[0].created_at
+            assert [media.capturer_id for media in album.media] == ["user0"] * 3
+
+    def test_feed_decoded_on_read(self):
+        feed = LazyFriendsFeed(_feed_edges(1000))
+
+        with mock.patch.object(Snap, "from_dict", wraps=Snap.from_dict) as snaps, \
+                mock.patch.object(Profile, "from_dict", wraps=Profile.from_dict) as profiles, \
+                mock.patch("lapsepy.journal.structures.friendsfeed._dt_from_iso") as timestamps:
+            assert len(feed) == 1000
+            assert snaps.call_count == profiles.call_count == 0
+
+            node = feed.nodes[500]
+            assert snaps.call_count == profiles.call_count == 0
+
+            assert node.entries[0].id == "media1500"
+            assert snaps.call_count == 3 and profiles.call_count == 0
+            timestamps.assert_not_called()
@@ -0,0 +1,92 @@
+import contextlib
+import io
+
+import requests
+
+from lapsepy.journal import Journal
+from lapsepy.journal.common.exceptions import AuthTokenExpired
+from lapsepy.journal.common.tracing import Tracer
+
+from unittest import TestCase
+
+from stub_server import StubServer
+
+KUDOS = {"data": {"sendKudos": {"__typename": "SendKudosPayload", "success": True}}}
+
+
+class TestTracing(TestCase):
+    def setUp(self):
+        self.responses = []
+        self.server = StubServer(lambda request: self.responses.pop(0) if self.responses else KUDOS).start()
+
+        self.traces = []
+        self.journal = Journal(authorization="token", refresher=lambda: None)
+        self.journal.request_url = self.server.url + "/graphql"
+        self.journal.tracer.add_hook(self.traces.append)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_trace(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            self.journal.send_kudos("user")
+
+        # Nothing, least of all the auth token, is printed anymore.
+        assert stdout.getvalue() == ""
+
+        trace, = self.traces
+        assert trace.operation_name == "SendKudosGraphQLMutation"
+        assert trace.status == 200 and trace.ok and trace.retries == 0
+        assert trace.bytes_sent == len(self.server.requests[0].body)
+        assert trace.bytes_received > 0
+        assert trace.duration > 0
+        assert "token" not in str(trace.to_dict())
+
+    def test_retry_is_traced(self):
+        refreshed = []
+        self.journal.refresher = lambda: refreshed.append(True)
+        self.responses.append({"errors": [{"message": "Token expired at 2023-11-01"}]})
+
+        self.journal.send_kudos("user")
+
+        assert len(refreshed) == 1
+        assert [trace.retries for trace in self.traces] == [0, 1]
+        assert isinstance(self.traces[0].error, AuthTokenExpired)
+        assert self.traces[1].ok
+
+    def test_http_error_is_traced(self):
+        self.responses.append((500, {"error": "internal"}))
+
+        self.assertRaises(requests.exceptions.HTTPError, self.journal.send_kudos, "user")
+
+        assert self.traces[0].status == 500
+        assert isinstance(self.traces[0].error, requests.exceptions.HTTPError)
+
+    def test_sampling(self):
+        self.journal.tracer.sample_rate = 0
+
+        for _ in range(10):
+            self.journal.send_kudos("user")
+
+        assert self.traces == []
+
+    def test_failing_hook_is_ignored(self):
+        def hook(trace):
+            raise RuntimeError
+
+        self.journal.tracer.add_hook(hook)
+        self.journal.send_kudos("user")
+
+        assert len(self.traces) == 1
+
+    def test_off_without_hooks(self):
+        tracer = Tracer()
+        assert not tracer.sample()
+
+        hook = self.traces.append
+        tracer.add_hook(hook)
+        assert tracer.sample()
+
+        tracer.remove_hook(hook)
+        assert tracer.hooks == ()
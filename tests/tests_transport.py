@@ -0,0 +1,32 @@
+from lapsepy.journal import Journal
+from lapsepy.journal.common.transport import Transport
+from lapsepy.journal.structures import Options
+
+from unittest import TestCase
+
+from stub_server import StubServer
+
+
+class TestTransport(TestCase):
+    def setUp(self):
+        self.server = StubServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_options_size_pool(self):
+        transport = Transport.from_options(Options(pool_maxsize=32, timeout=5))
+        adapter = transport.session.get_adapter("https://")
+
+        assert adapter._pool_maxsize == 32
+        assert transport.timeout == 5
+
+    def test_journal_reuses_connection(self):
+        journal = Journal(authorization="token", refresher=lambda: None)
+        journal.request_url = self.server.url + "/graphql"
+
+        for _ in range(10):
+            journal._sync_journal_call({"operationName": "StubQuery", "query": "query StubQuery { x }"})
+
+        assert len(self.server.requests) == 10
+        assert len(self.server.connections) == 1
@@ -0,0 +1,235 @@
+import io
+import os
+import tempfile
+
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from lapsepy.journal import Journal, UploadQueue
+from lapsepy.journal.common.upload import EncodePool, encode_jpeg, open_upload
+from lapsepy.journal.upload_queue import STAGE_URL_ISSUED, STAGE_UPLOADED, STAGE_REGISTERED
+
+from unittest import TestCase, mock
+
+from stub_server import StubServer
+
+JPEG = os.urandom(200 * 1024)
+
+
+class UploadStub:
+    def setUp(self):
+        self.failing_puts = 0
+        self.server = StubServer(self.respond).start()
+        self.journal = Journal(authorization="token", refresher=lambda: None)
+        self.journal.request_url = self.server.url + "/graphql"
+
+    def tearDown(self):
+        self.server.stop()
+
+    def respond(self, request):
+        if request.method == "PUT":
+            if self.failing_puts:
+                self.failing_puts -= 1
+                return 500, b""
+            return b""
+
+        if request.json()["operationName"] == "ImageUploadURLGraphQLQuery":
+            return {"data": {"imageUploadURL": self.server.url + "/aws"}}
+        return {"data": {"createMedia": {"success": True}, "sendInstants": {"success": True}}}
+
+    def _uploads(self):
+        return [request for request in self.server.requests if request.method == "PUT"]
+
+    def _calls(self, operation_name: str):
+        return [request for request in self.server.requests
+                if request.method == "POST" and request.json()["operationName"] == operation_name]
+
+
+class TestUpload(UploadStub, TestCase):
+
+    def test_upload_bytes(self):
+        self.journal.upload_photo(JPEG, develop_in=10)
+
+        (put,) = self._uploads()
+        assert put.body == JPEG
+
+    def test_upload_path_is_streamed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "image.jpg")
+            with open(path, "wb") as f:
+                f.write(JPEG)
+
+            with mock.patch("lapsepy.journal.common.upload.Image.Image.save") as save:
+                self.journal.upload_instant(path, user_id="user")
+
+            save.assert_not_called()
+
+        (put,) = self._uploads()
+        assert put.body == JPEG
+        assert int(put.headers["Content-Length"]) == len(JPEG)
+
+    def test_upload_file_object(self):
+        f = io.BytesIO(JPEG)
+        self.journal.upload_instant(f, user_id="user")
+
+        assert self._uploads()[0].body == JPEG
+        assert not f.closed
+
+    def test_image_encoded_once(self):
+        im = Image.new("RGB", (32, 32), color=(255, 0, 0))
+
+        with mock.patch.object(Image.Image, "save", wraps=im.save) as save:
+            self.journal.send_instants(im, user_ids=["a", "b", "c"])
+
+        assert save.call_count == 1
+        bodies = {put.body for put in self._uploads()}
+        assert len(bodies) == 1 and Image.open(io.BytesIO(bodies.pop())).format == "JPEG"
+
+    def test_unknown_source(self):
+        with self.assertRaises(TypeError):
+            with open_upload(12):
+                pass
+
+    def test_upload_photos(self):
+        images = [JPEG, Image.new("RGB", (16, 16)), io.BytesIO(JPEG), 12, Image.new("RGB", (16, 16), color=(0, 0, 255))]
+
+        results = list(self.journal.upload_photos(images, develop_in=10, workers=3, encode_processes=1))
+
+        assert sorted(result.index for result in results) == list(range(5))
+
+        failed = [result for result in results if not result.ok]
+        assert len(failed) == 1 and failed[0].item == 12 and isinstance(failed[0].error, TypeError)
+
+        uuids = {result.value.media_id for result in results if result.ok}
+        assert len(uuids) == 4
+        assert len(self._uploads()) == 4
+
+        registered = [request.json()["variables"]["input"]["content"][0]["filtered"].split("/")[0]
+                      for request in self._calls("CreateMediaGraphQLMutation")]
+        assert set(registered) == uuids
+
+    def test_encode_pool_does_not_fork(self):
+        im = Image.new("RGB", (16, 16))
+
+        with EncodePool(processes=1) as pool:
+            # Started from a worker thread, like upload_photos does.
+            with ThreadPoolExecutor(max_workers=1) as threads:
+                encoded = threads.submit(lambda: pool.submit(im).result()).result()
+
+            assert pool._executor._mp_context.get_start_method() != "fork"
+
+        assert encoded == encode_jpeg(im)
+
+    def test_upload_photos_encodes_once(self):
+        im = Image.new("RGB", (16, 16))
+
+        with mock.patch.object(Image.Image, "save", wraps=im.save) as save:
+            results = list(self.journal.upload_photos([im], develop_in=10, encode_processes=0, ordered=True))
+
+        assert results[0].ok
+        assert save.call_count == 1
+        assert self._uploads()[0].body == encode_jpeg(im)
+
+    def _sent_instants(self):
+        return [request.json()["variables"]["input"]["instants"]
+                for request in self._calls("SendInstantsGraphQLMutation")]
+
+    def test_send_instants(self):
+        user_ids = [f"user{i}" for i in range(60)]
+
+        sent = self.journal.send_instants(JPEG, user_ids=user_ids + ["user0"], max_destinations=25)
+
+        assert len(self._uploads()) == 1
+        calls = self._sent_instants()
+        assert [len(instants) for instants in calls] == [25, 25, 10]
+
+        instants = [instant for instants in calls for instant in instants]
+        assert [instant["destination"]["profile"]["userId"] for instant in instants] == user_ids
+        assert len({instant["filename"] for instant in instants}) == 1
+        assert {instant["id"] for instant in instants} == set(sent.values()) and len(sent) == 60
+
+    def test_send_instants_duplicate_ids(self):
+        sent = self.journal.send_instants(JPEG, user_ids=["a", "b", "a"], im_ids=["1", "2", "3"])
+
+        assert sent == {"a": "1", "b": "2"}
+        (instants,) = self._sent_instants()
+        assert [instant["id"] for instant in instants] == ["1", "2"]
+
+        with self.assertRaises(ValueError):
+            self.journal.send_instants(JPEG, user_ids=["a", "b", "a"], im_ids=["1", "2"])
+
+    def test_upload_instant_sends_once(self):
+        self.journal.upload_instant(JPEG, user_id="user", im_id="instant")
+
+        (instants,) = self._sent_instants()
+        assert instants[0]["id"] == "instant" and instants[0]["destination"]["profile"]["userId"] == "user"
+
+
+class TestUploadQueue(UploadStub, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.queue = UploadQueue(os.path.join(self.directory.name, "uploads.db"))
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+
+    def test_run(self):
+        path = os.path.join(self.directory.name, "image.jpg")
+        with open(path, "wb") as f:
+            f.write(JPEG)
+
+        file_uuids = {self.queue.add(path, develop_in=10), self.queue.add(Image.new("RGB", (8, 8)), develop_in=10)}
+        assert len(self.queue) == 2
+
+        results = list(self.queue.run(self.journal))
+
+        assert all(result.ok for result in results)
+        assert {result.value.media_id for result in results} == file_uuids
+        assert JPEG in {put.body for put in self._uploads()}
+        assert len(self.queue) == 0 and self.queue.counts()[STAGE_REGISTERED] == 2
+
+    def test_resume_after_put(self):
+        file_uuid = self.queue.add(JPEG, develop_in=10)
+
+        with mock.patch.object(self.journal, "_register_photo", side_effect=ConnectionError):
+            (result,) = self.queue.run(self.journal)
+
+        assert isinstance(result.error, ConnectionError)
+        upload = self.queue.get(file_uuid)
+        assert upload.stage == STAGE_UPLOADED and upload.attempts == 1 and "ConnectionError" in upload.error
+
+        # A new worker picks up where the last one died, the image isn't uploaded again.
+        (result,) = UploadQueue(self.queue.path).run(self.journal)
+
+        assert result.ok and result.value.media_id == file_uuid
+        assert len(self._uploads()) == 1
+        assert len(self._calls("ImageUploadURLGraphQLQuery")) == 1
+        assert len(self._calls("CreateMediaGraphQLMutation")) == 1
+        assert self.queue.get(file_uuid).stage == STAGE_REGISTERED and self.queue.get(file_uuid).data is None
+
+    def test_resume_failed_put(self):
+        file_uuid = self.queue.add(JPEG, develop_in=10)
+        self.failing_puts = 1
+
+        (result,) = self.queue.run(self.journal)
+        assert not result.ok and self.queue.get(file_uuid).stage == STAGE_URL_ISSUED
+
+        (result,) = self.queue.run(self.journal)
+        assert result.ok
+        # The upload url was still fresh so it's reused.
+        assert len(self._calls("ImageUploadURLGraphQLQuery")) == 1
+        assert len(self._uploads()) == 2
+
+    def test_expired_url_is_reissued(self):
+        self.queue.url_max_age = 0
+        self.queue.add(JPEG, develop_in=10)
+        self.failing_puts = 1
+
+        list(self.queue.run(self.journal))
+        list(self.queue.run(self.journal))
+
+        assert len(self._calls("ImageUploadURLGraphQLQuery")) == 2
+        assert self.queue.counts()[STAGE_REGISTERED] == 1